@@ -0,0 +1,110 @@
+"""Per-category inter-model agreement, used to shrink the review panel.
+
+For each change category (mode, file extension, top-level directory) the
+store keeps a rolling window of round-0 agree/disagree outcomes per model
+pair and a latency average per model. Once every pair in the panel has
+agreed at or above adaptive_agreement_threshold over at least
+adaptive_min_samples reviews, the category is served by the fastest model
+alone, with a full-panel audit every adaptive_audit_every reviews so drift
+shows up in the window again.
+"""
+import os
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Any, ContextManager, Dict, List, Tuple
+
+from core.config import get_state_dir
+from core.state import locked_json
+
+STATS_FILE = "agreement.json"
+STATS_VERSION = 1
+LATENCY_WEIGHT = 0.2
+
+
+@dataclass
+class PanelDecision:
+    models: List[str]
+    reason: str = ""
+    audit: bool = False
+
+    def describe(self) -> str:
+        label = "full panel" if self.audit else ", ".join(self.models)
+        return f"{label} ({self.reason})" if self.reason else label
+
+
+def category_for(mode: str, file_path: str) -> str:
+    if mode == "changeset" or not file_path:
+        return f"{mode}|*|*"
+    root = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
+    if os.path.isabs(file_path) and file_path.startswith(root + os.sep):
+        file_path = os.path.relpath(file_path, root)
+    parts = os.path.normpath(file_path).strip(os.sep).split(os.sep)
+    top = parts[0] if len(parts) > 1 else "."
+    return f"{mode}|{os.path.splitext(file_path)[1] or '-'}|{top}"
+
+
+def _pair_key(a: str, b: str) -> str:
+    return "+".join(sorted((a, b)))
+
+
+def locked_stats(config: Dict[str, Any]) -> ContextManager[Dict[str, Any]]:
+    path = os.path.join(get_state_dir(config), STATS_FILE)
+    return locked_json(path, lambda: {"categories": {}}, STATS_VERSION)
+
+
+def pair_agreement(entry: Dict[str, Any], a: str, b: str) -> Tuple[float, int]:
+    """Return (rate, samples) for a model pair within one category entry."""
+    window = entry.get("pairs", {}).get(_pair_key(a, b), "")
+    if not window:
+        return 0.0, 0
+    return window.count("1") / len(window), len(window)
+
+
+def choose_panel(
+    stats: Dict[str, Any], category: str, models: List[str], config: Dict[str, Any]
+) -> PanelDecision:
+    if len(models) < 2:
+        return PanelDecision(models)
+    entry = stats["categories"].setdefault(category, {})
+    threshold = config.get("adaptive_agreement_threshold", 0.95)
+    min_samples = config.get("adaptive_min_samples", 20)
+    weakest = None
+    for a, b in combinations(models, 2):
+        rate, samples = pair_agreement(entry, a, b)
+        if samples < min_samples or rate < threshold:
+            return PanelDecision(models)
+        if weakest is None or rate < weakest[0]:
+            weakest = (rate, samples)
+    rate, samples = weakest
+    reason = f"agreement {rate:.0%} over {samples} {category} reviews"
+
+    entry["since_audit"] = entry.get("since_audit", 0) + 1
+    if entry["since_audit"] >= config.get("adaptive_audit_every", 10):
+        entry["since_audit"] = 0
+        return PanelDecision(models, f"audit; {reason}", audit=True)
+    latency = entry.get("latency", {})
+    fastest = min(models, key=lambda m: latency.get(m, float("inf")))
+    return PanelDecision([fastest], reason)
+
+
+def record_round(
+    stats: Dict[str, Any],
+    category: str,
+    verdicts: Dict[str, str],
+    latencies: Dict[str, int],
+    config: Dict[str, Any],
+) -> None:
+    """Fold one round-0 outcome (verdicts of models that answered) into the category."""
+    entry = stats["categories"].setdefault(category, {})
+    window_size = config.get("adaptive_window", 50)
+    pairs = entry.setdefault("pairs", {})
+    for a, b in combinations(sorted(verdicts), 2):
+        key = _pair_key(a, b)
+        outcome = "1" if verdicts[a] == verdicts[b] else "0"
+        pairs[key] = (pairs.get(key, "") + outcome)[-window_size:]
+    latency = entry.setdefault("latency", {})
+    for model, ms in latencies.items():
+        previous = latency.get(model)
+        latency[model] = ms if previous is None else round(
+            previous + LATENCY_WEIGHT * (ms - previous), 1
+        )
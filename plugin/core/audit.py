@@ -0,0 +1,262 @@
+"""Bulk review outside the hooks: ``concensus audit``.
+
+Targets are files, directory trees, or the files changed in a git diff range
+(reviewed as their diff). Items pass through the usual ``skip_paths`` and
+``min_change_lines`` filters and run through ``run_consensus`` on a bounded
+pool of ``--jobs`` workers. Every finished item is appended to a JSONL
+checkpoint keyed by path and content hash, so an interrupted audit resumes
+where it stopped. With ``--budget``, no new item starts once the wall-clock
+budget is spent; the rest are reported as not reviewed.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+import subprocess
+from dataclasses import asdict, dataclass, field
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from core.config import get_state_dir, should_skip_change, should_skip_path
+from core.symbol_index import SKIP_DIRS
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_LEVELS = {"FULL_CONSENSUS": "error", "MAJORITY_AGREE": "warning", "NO_CONSENSUS": "warning"}
+
+
+@dataclass
+class AuditItem:
+    path: str
+    context: str
+    # Set when the item could not be read; it is reported as ERROR, not reviewed.
+    error: str = ""
+
+    @property
+    def key(self) -> str:
+        digest = hashlib.sha256(self.context.encode("utf-8", errors="replace")).hexdigest()
+        return f"{self.path}:{digest[:20]}"
+
+
+@dataclass
+class AuditResult:
+    path: str
+    key: str
+    status: str
+    round: int = 0
+    verdicts: Dict[str, str] = field(default_factory=dict)
+    concerns: Dict[str, str] = field(default_factory=dict)
+    recommendation: str = ""
+    duration_ms: int = 0
+    resumed: bool = False
+
+
+def _read_text(path: str, max_bytes: int) -> Optional[str]:
+    try:
+        if os.path.getsize(path) > max_bytes:
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if b"\0" in data[:8192]:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+def walk_files(targets: Iterable[str]) -> Iterator[str]:
+    for target in targets:
+        if os.path.isfile(target):
+            yield os.path.normpath(target)
+            continue
+        for dirpath, dirnames, filenames in os.walk(target):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+            for name in sorted(filenames):
+                yield os.path.normpath(os.path.join(dirpath, name))
+
+
+def file_items(paths: Iterable[str], config: Dict[str, Any], max_bytes: int) -> List[AuditItem]:
+    items = []
+    for path in paths:
+        if should_skip_path(path, config):
+            continue
+        text = _read_text(path, max_bytes)
+        if text is None or should_skip_change(text, config):
+            continue
+        items.append(AuditItem(path, text))
+    return items
+
+
+def diff_items(diff_range: str, config: Dict[str, Any], max_bytes: int) -> List[AuditItem]:
+    """One item per changed file in ``diff_range``, reviewed as its unified diff."""
+    # -z: paths are NUL-separated and never C-quoted, so spaces and non-ASCII survive.
+    names = subprocess.run(
+        ["git", "diff", "-z", "--name-only", "--diff-filter=d", diff_range],
+        capture_output=True, encoding="utf-8", errors="surrogateescape", check=True,
+    ).stdout.split("\0")
+    items = []
+    for path in filter(None, names):
+        if should_skip_path(path, config):
+            continue
+        try:
+            diff = subprocess.run(
+                ["git", "diff", diff_range, "--", path],
+                capture_output=True, encoding="utf-8", errors="replace", check=True,
+            ).stdout
+        except subprocess.CalledProcessError as e:
+            items.append(AuditItem(path, "", error=f"git diff failed: {(e.stderr or '').strip()}"))
+            continue
+        if not diff or len(diff.encode()) > max_bytes or should_skip_change(diff, config):
+            continue
+        items.append(AuditItem(path, diff))
+    return items
+
+
+def load_checkpoint(path: str) -> Dict[str, AuditResult]:
+    done: Dict[str, AuditResult] = {}
+    if not path or not os.path.exists(path):
+        return done
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                result = AuditResult(**json.loads(line))
+            except (ValueError, TypeError):
+                continue
+            result.resumed = True
+            done[result.key] = result
+    return done
+
+
+def _review(item: AuditItem, config: Dict[str, Any]) -> AuditResult:
+    from core.consensus_engine import _extract_verdict, run_consensus
+
+    started = time.monotonic()
+    result = run_consensus(mode="code", context=item.context, file_path=item.path, config=config)
+    verdicts = {
+        model: ("ERROR" if text.startswith("[Error") else _extract_verdict(text))
+        for model, text in result.responses.items()
+        if model != "claude"
+    }
+    return AuditResult(
+        path=item.path,
+        key=item.key,
+        status=result.status.value,
+        round=result.round,
+        verdicts=verdicts,
+        concerns={m: result.responses[m] for m, v in verdicts.items() if v == "CONCERNS"},
+        recommendation=result.recommendation,
+        duration_ms=int((time.monotonic() - started) * 1000),
+    )
+
+
+def run_audit(
+    items: List[AuditItem],
+    config: Dict[str, Any],
+    jobs: int = 4,
+    budget: float = 0,
+    checkpoint: str = "",
+    progress=None,
+) -> List[AuditResult]:
+    """Review ``items``; results come back in item order."""
+    progress = progress or (lambda msg: print(msg, file=sys.stderr, flush=True))
+    done = load_checkpoint(checkpoint)
+    results: Dict[str, AuditResult] = {i.key: done[i.key] for i in items if i.key in done}
+    if results:
+        progress(f"Resuming: {len(results)} of {len(items)} item(s) already reviewed")
+    for item in items:
+        if item.error:
+            # Not checkpointed, so a resumed audit tries the item again.
+            results[item.key] = AuditResult(item.path, item.key, "ERROR", recommendation=item.error)
+            progress(f"{item.path} → ERROR ({item.error})")
+    pending = [i for i in items if i.key not in results]
+    deadline = time.monotonic() + budget if budget > 0 else None
+    lock = threading.Lock()
+    total = len(items)
+
+    def finish(result: AuditResult) -> None:
+        with lock:
+            results[result.key] = result
+            if checkpoint:
+                with open(checkpoint, "a") as f:
+                    f.write(json.dumps(asdict(result)) + "\n")
+            progress(
+                f"[{len(results)}/{total}] {result.path} → {result.status} "
+                f"({result.duration_ms / 1000:.1f}s)"
+            )
+
+    queue = iter(pending)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        in_flight = set()
+        while True:
+            while len(in_flight) < max(1, jobs) and (deadline is None or time.monotonic() < deadline):
+                item = next(queue, None)
+                if item is None:
+                    break
+                in_flight.add(executor.submit(_review, item, config))
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                finish(future.result())
+
+    for item in items:
+        if item.key not in results:
+            results[item.key] = AuditResult(item.path, item.key, "NOT_REVIEWED",
+                                            recommendation="Audit time budget exhausted.")
+    return [results[i.key] for i in items]
+
+
+def summarize(results: List[AuditResult]) -> Dict[str, int]:
+    counts: Dict[str, int] = {"items": len(results), "with_concerns": 0}
+    for r in results:
+        counts[r.status] = counts.get(r.status, 0) + 1
+        if r.concerns:
+            counts["with_concerns"] += 1
+    return counts
+
+
+def json_report(results: List[AuditResult]) -> Dict[str, Any]:
+    return {
+        "tool": "concensus",
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "summary": summarize(results),
+        "results": [asdict(r) for r in results],
+    }
+
+
+def sarif_report(results: List[AuditResult]) -> Dict[str, Any]:
+    """SARIF 2.1.0: one result per file that any model raised concerns about."""
+    sarif_results = []
+    for r in results:
+        if not r.concerns:
+            continue
+        text = "; ".join(f"[{model}] {concern[:500]}" for model, concern in r.concerns.items())
+        sarif_results.append({
+            "ruleId": "consensus-concerns",
+            "level": SARIF_LEVELS.get(r.status, "note"),
+            "message": {"text": f"{r.status}: {text}"},
+            "locations": [{"physicalLocation": {"artifactLocation": {"uri": r.path.replace(os.sep, "/")}}}],
+            "properties": {"verdicts": r.verdicts, "round": r.round},
+        })
+    return {
+        "$schema": SARIF_SCHEMA,
+        "version": "2.1.0",
+        "runs": [{
+            "tool": {"driver": {
+                "name": "concensus",
+                "informationUri": "https://github.com/jaehoonkim822/concensus",
+                "rules": [{
+                    "id": "consensus-concerns",
+                    "shortDescription": {"text": "Reviewing models raised concerns about this file"},
+                }],
+            }},
+            "results": sarif_results,
+        }],
+    }
+
+
+def default_checkpoint(config: Dict[str, Any], items: List[AuditItem]) -> str:
+    """Checkpoint path derived from the item set, so rerunning the same audit resumes it."""
+    digest = hashlib.sha256("\n".join(sorted(i.key for i in items)).encode()).hexdigest()[:16]
+    return os.path.join(get_state_dir(config, "audit"), f"{digest}.jsonl")
@@ -0,0 +1,113 @@
+"""Reference server for the shared review cache (see core/review_cache.py).
+
+Keeps entries in memory, or one JSON file per key with ``--dir``. TTLs from
+``X-Cache-TTL`` are capped at ``--max-ttl``; expired entries answer 404.
+
+    plugin/bin/concensus cache serve --port 8787 --dir ~/.cache/concensus-server
+"""
+import os
+import re
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+KEY_PATH = re.compile(r"^/v1/reviews/([0-9a-f]{64})$")
+MAX_BODY_BYTES = 2 * 1024 * 1024
+
+
+class CacheStore:
+    def __init__(self, directory: str = "", max_ttl: int = 7 * 86400):
+        self.directory = directory
+        self.max_ttl = max_ttl
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Tuple[float, bytes]] = {}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            item = self.entries.get(key)
+        if item is None and self.directory:
+            try:
+                with open(os.path.join(self.directory, f"{key}.json"), "rb") as f:
+                    item = json.loads(f.readline()), f.read()
+            except (OSError, ValueError):
+                item = None
+        if item is None or item[0] < time.time():
+            return None
+        return item[1]
+
+    def put(self, key: str, body: bytes, ttl: int) -> None:
+        expires = time.time() + max(1, min(ttl, self.max_ttl))
+        if not self.directory:
+            with self.lock:
+                self.entries[key] = (expires, body)
+            return
+        path = os.path.join(self.directory, f"{key}.json")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(f"{expires}\n".encode() + body)
+        os.replace(tmp_path, path)
+
+
+def make_handler(store: CacheStore, token: str = ""):
+    class Handler(BaseHTTPRequestHandler):
+        def _key(self) -> Optional[str]:
+            if token and self.headers.get("Authorization") != f"Bearer {token}":
+                self.send_error(401)
+                return None
+            match = KEY_PATH.match(self.path)
+            if not match:
+                self.send_error(404)
+                return None
+            return match.group(1)
+
+        def do_GET(self):
+            key = self._key()
+            if key is None:
+                return
+            body = store.get(key)
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_PUT(self):
+            key = self._key()
+            if key is None:
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                # A negative length would make rfile.read wait for the client to close.
+                if length < 0:
+                    raise ValueError("negative Content-Length")
+                if length > MAX_BODY_BYTES:
+                    self.send_error(413)
+                    return
+                body = self.rfile.read(length)
+                json.loads(body)
+                ttl = int(self.headers.get("X-Cache-TTL", store.max_ttl))
+            except ValueError:
+                self.send_error(400)
+                return
+            store.put(key, body, ttl)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def make_server(
+    host: str = "127.0.0.1", port: int = 8787, directory: str = "", max_ttl: int = 7 * 86400,
+    token: str = "",
+) -> ThreadingHTTPServer:
+    return ThreadingHTTPServer((host, port), make_handler(CacheStore(directory, max_ttl), token))
@@ -0,0 +1,98 @@
+"""Record/replay of model CLI invocations.
+
+In record mode every CLI call appends one JSON line to the cassette: model,
+argv (prompt replaced by ``{prompt}``), prompt hash, the collected stdout and
+stderr, exit code and timing. In replay mode calls are answered from the
+cassette by (model, prompt hash) without spawning anything; repeated prompts
+are served in recorded order. Replay can sleep for the recorded duration
+scaled by ``cassette_latency`` (0 = instant, 1 = original speed).
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+PROMPT_PLACEHOLDER = "{prompt}"
+
+_LOCK = threading.Lock()
+_CASSETTES: Dict[str, "Cassette"] = {}
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8", errors="replace")).hexdigest()
+
+
+def cassette_path(config: Dict[str, Any]) -> str:
+    """``cassette`` is a path if it contains a separator, else a name under state_dir/cassettes."""
+    name = config.get("cassette", "default")
+    if os.sep in name:
+        return name
+    from core.config import get_state_dir
+
+    return os.path.join(get_state_dir(config, "cassettes"), f"{name}.jsonl")
+
+
+class Cassette:
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[Tuple[str, str], List[dict]] = {}
+        self.served: Dict[Tuple[str, str], int] = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    key = (entry["model"], entry["prompt_sha256"])
+                    self.entries.setdefault(key, []).append(entry)
+
+    def next_entry(self, model: str, prompt: str) -> Optional[dict]:
+        key = (model, prompt_hash(prompt))
+        with _LOCK:
+            entries = self.entries.get(key)
+            if not entries:
+                return None
+            index = self.served.get(key, 0)
+            self.served[key] = index + 1
+        return entries[min(index, len(entries) - 1)]
+
+    def append(self, entry: dict) -> None:
+        with _LOCK:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            self.entries.setdefault((entry["model"], entry["prompt_sha256"]), []).append(entry)
+
+
+def load_cassette(path: str) -> Cassette:
+    with _LOCK:
+        cassette = _CASSETTES.get(path)
+    if cassette is None:
+        cassette = Cassette(path)
+        with _LOCK:
+            cassette = _CASSETTES.setdefault(path, cassette)
+    return cassette
+
+
+def record_call(
+    path: str, model: str, argv: List[str], prompt: str, output: Dict[str, Any], duration_ms: int
+) -> None:
+    load_cassette(path).append({
+        "model": model,
+        "argv": [PROMPT_PLACEHOLDER if arg == prompt else arg for arg in argv],
+        "prompt_sha256": prompt_hash(prompt),
+        "prompt_chars": len(prompt),
+        "duration_ms": duration_ms,
+        "recorded_at": time.time(),
+        **output,
+    })
+
+
+def replay_call(path: str, model: str, prompt: str, latency_scale: float) -> Optional[dict]:
+    entry = load_cassette(path).next_entry(model, prompt)
+    if entry is not None and latency_scale > 0:
+        time.sleep(entry.get("duration_ms", 0) / 1000 * latency_scale)
+    return entry
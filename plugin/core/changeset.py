@@ -0,0 +1,96 @@
+import os
+import re
+import json
+import time
+from typing import Any, Dict, List
+
+from core.config import get_state_dir
+
+FILE_VERDICT_REGEX = re.compile(
+    r"FILE:\s*`?([^\s`]+?)`?:?\s[^\n]*?\b(APPROVE|CONCERNS)\b", re.IGNORECASE
+)
+
+
+def _journal_path(config: Dict[str, Any], session_id: str) -> str:
+    safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id or "default")
+    return os.path.join(get_state_dir(config, "changesets"), f"{safe_id}.jsonl")
+
+
+def record_edit(config: Dict[str, Any], session_id: str, input_data: dict) -> None:
+    tool_input = input_data.get("tool_input", {})
+    entry = {
+        "ts": time.time(),
+        "tool_name": input_data.get("tool_name", ""),
+        "file_path": tool_input.get("file_path", ""),
+        "content": tool_input.get("content", ""),
+        "old_string": tool_input.get("old_string", ""),
+        "new_string": tool_input.get("new_string", ""),
+    }
+    with open(_journal_path(config, session_id), "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def load_changeset(config: Dict[str, Any], session_id: str) -> Dict[str, List[dict]]:
+    """Return journaled edits grouped by file, in first-touched order."""
+    path = _journal_path(config, session_id)
+    changeset: Dict[str, List[dict]] = {}
+    if not os.path.exists(path):
+        return changeset
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            changeset.setdefault(entry.get("file_path", ""), []).append(entry)
+    return changeset
+
+
+def clear_changeset(config: Dict[str, Any], session_id: str) -> None:
+    path = _journal_path(config, session_id)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def build_changeset_context(changeset: Dict[str, List[dict]], max_file_chars: int = 4000) -> str:
+    sections = ["Files changed in this turn:"]
+    sections.extend(f"- {path} ({len(edits)} edit(s))" for path, edits in changeset.items())
+    for path, edits in changeset.items():
+        body = []
+        for edit in edits:
+            if edit.get("tool_name") == "Write":
+                body = [f"[Write: full file]\n{edit.get('content', '')}"]
+            else:
+                body.append(
+                    f"[Edit]\n--- replaced:\n{edit.get('old_string', '')}\n"
+                    f"+++ with:\n{edit.get('new_string', '')}"
+                )
+        text = "\n\n".join(body)
+        if len(text) > max_file_chars:
+            text = text[:max_file_chars] + "\n... (truncated)"
+        sections.append(f"\n### FILE: {path}\n{text}")
+    return "\n".join(sections)
+
+
+def extract_file_verdicts(text: str, file_paths: List[str]) -> Dict[str, str]:
+    by_name = {os.path.basename(p): p for p in file_paths}
+    verdicts = {}
+    for match in FILE_VERDICT_REGEX.finditer(text):
+        named = match.group(1)
+        path = named if named in file_paths else by_name.get(os.path.basename(named))
+        if path:
+            verdicts[path] = match.group(2).upper()
+    return verdicts
+
+
+def format_file_results(responses: Dict[str, str], file_paths: List[str]) -> str:
+    per_model = {
+        model: extract_file_verdicts(text, file_paths)
+        for model, text in responses.items()
+        if not text.startswith("[Error") and model != "claude"
+    }
+    lines = ["Per-file results:"]
+    for path in file_paths:
+        parts = [f"{model} {verdicts.get(path, '?')}" for model, verdicts in per_model.items()]
+        lines.append(f"  {path}: {', '.join(parts) if parts else 'no verdicts'}")
+    return "\n".join(lines)
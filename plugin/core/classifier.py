@@ -0,0 +1,166 @@
+"""Single-pass text classifier shared by the Stop, SubagentStop and
+UserPromptSubmit hooks.
+
+Every category is a named group in one alternation, so the text is scanned
+once regardless of how many categories are checked. Intent verbs (signal and
+action words) share one group and are sorted into categories by set lookup,
+since the same word can belong to both.
+"""
+from __future__ import annotations
+
+import re
+import functools
+from dataclasses import dataclass, field
+
+from core.config import parse_mapping
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, Optional
+
+CONTENT_PATTERNS = {
+    "plan": [
+        r"\bstep\s+[1-9]\b",
+        r"\bphase\s+[1-9]\b",
+        r"\bimplementation\s+plan\b",
+        r"\bmilestone\s+\d+\b",
+    ],
+    "research": [
+        r"\bfindings?\b",
+        r"\bevidence\s+suggests?\b",
+        r"\bcomparison\s+of\b",
+        r"\bbenchmarks?\b",
+        r"\banalysis\s+(?:shows?|indicates?|reveals?)\b",
+        r"\bour\s+investigation\b",
+    ],
+    "design": [
+        r"\b(?:architect(?:ure|ural))\b",
+        r"\b(?:design pattern|observer|singleton|factory|strategy)\b",
+        r"\b(?:microservice|monolith|event[- ]driven|serverless)\b",
+        r"\b(?:trade[- ]?off|pros?\s+and\s+cons?)\b",
+        r"\b(?:I (?:recommend|suggest|propose)\s+(?:we|to)\s+(?:use|implement|adopt))\b",
+        r"\b(?:(?:two|three|multiple)\s+(?:options?|approaches?|alternatives?))\b",
+        r"\b(?:database\s+(?:schema|design|model))\b",
+        r"\b(?:API\s+(?:design|structure|contract))\b",
+        r"\b(?:state\s+management|caching\s+strategy|auth(?:entication)?\s+(?:flow|method))\b",
+    ],
+}
+
+SIGNAL_WORDS = {
+    "implement", "design", "architect", "build", "create", "migrate", "refactor",
+    "restructure", "overhaul", "integrate", "deploy", "introduce", "establish",
+    "replace", "rewrite", "convert",
+}
+ACTION_WORDS = {
+    "implement", "build", "create", "make", "add", "set up", "deploy", "migrate", "refactor",
+}
+QUESTION_WORDS = (
+    "what", "how", "why", "where", "when", "who", "which", "can", "could", "is", "are", "do", "does",
+)
+
+# Numbered list items; three on consecutive (non-blank) lines count as a plan.
+LIST_ITEM = r"^[ \t]*\d+\.(?=[ \t]+\S)"
+MIN_LIST_RUN = 3
+
+DEFAULT_THRESHOLDS = {"plan": 1, "research": 1, "design": 1, "signal": 2}
+LONG_PROMPT_CHARS = 200
+
+
+@dataclass
+class Classification:
+    counts: Dict[str, int] = field(default_factory=dict)
+    score: int = 0
+    question: bool = False
+    length: int = 0
+
+    def count(self, category: str) -> int:
+        return self.counts.get(category, 0)
+
+    def content_type(self, thresholds: Optional[Dict[str, int]] = None) -> Optional[str]:
+        """Highest-priority content category at or over its threshold: plan > research > design."""
+        thresholds = thresholds or DEFAULT_THRESHOLDS
+        for category in CONTENT_PATTERNS:
+            if self.count(category) >= thresholds.get(category, 1):
+                return category
+        return None
+
+    @property
+    def pure_question(self) -> bool:
+        return self.question and self.count("action") == 0
+
+
+def _words_pattern(words) -> str:
+    ordered = sorted(words, key=len, reverse=True)
+    return r"\b(?:" + "|".join(w.replace(" ", r"\s+") for w in ordered) + r")\b"
+
+
+@functools.lru_cache(maxsize=None)
+def _scanner() -> re.Pattern:
+    groups = [
+        f"(?P<{category}>" + "|".join(patterns) + ")"
+        for category, patterns in CONTENT_PATTERNS.items()
+    ]
+    groups.append(f"(?P<list_item>{LIST_ITEM})")
+    groups.append(f"(?P<verb>{_words_pattern(SIGNAL_WORDS | ACTION_WORDS)})")
+    return re.compile("|".join(groups), re.IGNORECASE | re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=None)
+def _verbs() -> re.Pattern:
+    return re.compile(_words_pattern(SIGNAL_WORDS | ACTION_WORDS), re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def _question_start() -> re.Pattern:
+    return re.compile(r"\s*(?:" + "|".join(QUESTION_WORDS) + r")\b", re.IGNORECASE)
+
+
+def _count_verb(counts: Dict[str, int], word: str) -> None:
+    word = " ".join(word.lower().split())
+    if word in SIGNAL_WORDS:
+        counts["signal"] += 1
+    if word in ACTION_WORDS:
+        counts["action"] += 1
+
+
+def classify(text: str) -> Classification:
+    counts = {category: 0 for category in CONTENT_PATTERNS}
+    counts.update(signal=0, action=0)
+    run_length = 0
+    run_end = -1
+    for match in _scanner().finditer(text):
+        kind = match.lastgroup
+        if kind == "verb":
+            _count_verb(counts, match.group())
+        elif kind == "list_item":
+            # Consecutive if only whitespace separates this item from the previous line's end.
+            if run_length and not text[run_end:match.start()].strip():
+                run_length += 1
+            else:
+                run_length = 1
+            newline = text.find("\n", match.end())
+            run_end = len(text) if newline == -1 else newline
+            if run_length == MIN_LIST_RUN:
+                counts["plan"] += 1
+        else:
+            counts[kind] += 1
+            # A phrase can swallow an intent verb ("database design"); count those too.
+            for verb in _verbs().finditer(match.group()):
+                _count_verb(counts, verb.group())
+    score = counts["signal"] + (1 if len(text) >= LONG_PROMPT_CHARS else 0)
+    return Classification(
+        counts=counts,
+        score=score,
+        question=bool(_question_start().match(text)),
+        length=len(text),
+    )
+
+
+def thresholds_from_config(config: dict) -> Dict[str, int]:
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    for category, value in parse_mapping(config.get("classifier_thresholds", [])):
+        try:
+            thresholds[category] = int(value)
+        except ValueError:
+            continue
+    return thresholds
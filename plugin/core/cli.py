@@ -0,0 +1,240 @@
+"""``concensus`` command line: query local review state."""
+import sys
+import json
+import argparse
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from core.config import load_config
+
+
+def _print_table(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    if not rows:
+        print("(no data)")
+        return
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
+
+
+def _emit(rows: List[Dict[str, Any]], columns: List[str], as_json: bool) -> None:
+    if as_json:
+        print(json.dumps(rows, indent=2))
+    else:
+        _print_table(rows, columns)
+
+
+def cmd_history(args: argparse.Namespace, config: Dict[str, Any]) -> int:
+    from core import history
+
+    if args.query == "compact":
+        deleted = history.compact(config)
+        print(f"Pruned {deleted} review(s); database vacuumed.")
+        return 0
+    conn = history.connect(config)
+    try:
+        if args.query == "latency":
+            rows = history.latency_by_model(conn, args.days)
+            columns = ["model", "calls", "failures", "mean_ms", "p50_ms", "p95_ms",
+                       "input_tokens", "output_tokens"]
+        elif args.query == "debates":
+            rows = history.debate_rate_by_mode(conn, args.days)
+            columns = ["mode", "reviews", "debated", "debate_rate", "consensus"]
+        elif args.query == "files":
+            rows = history.top_files(conn, args.limit, args.days)
+            columns = ["path", "reviews", "contested"]
+        else:
+            rows = history.recent_reviews(conn, args.limit)
+            for row in rows:
+                row["time"] = datetime.fromtimestamp(row["ts"]).strftime("%Y-%m-%d %H:%M:%S")
+            columns = ["time", "mode", "tier", "status", "rounds", "duration_ms", "path", "verdicts"]
+    finally:
+        conn.close()
+    _emit(rows, columns, args.json)
+    return 0
+
+
+def cmd_usage(args: argparse.Namespace, config: Dict[str, Any]) -> int:
+    from core.usage import usage_report
+
+    _emit(usage_report(config), ["window", "tokens"], args.json)
+    return 0
+
+
+def cmd_profile(args: argparse.Namespace, config: Dict[str, Any]) -> int:
+    from core.profiling import profile_dir, report
+
+    result = report(args.dir or profile_dir("", config), args.limit, args.event)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+    print(f"{result['invocations']} invocation(s); times and sizes are per invocation")
+    print()
+    _print_table(result["functions"], ["function", "calls", "tottime_ms", "cumtime_ms"])
+    print()
+    _print_table(result["allocations"], ["site", "kib", "blocks"])
+    return 0
+
+
+def cmd_audit(args: argparse.Namespace, config: Dict[str, Any]) -> int:
+    from core import audit
+
+    max_bytes = args.max_bytes or config.get("audit_max_file_bytes", 200_000)
+    if args.diff:
+        items = audit.diff_items(args.diff, config, max_bytes)
+    else:
+        paths = list(args.targets)
+        if args.files_from:
+            source = sys.stdin if args.files_from == "-" else open(args.files_from)
+            with source:
+                paths += [line.strip() for line in source if line.strip()]
+        items = audit.file_items(audit.walk_files(paths or ["."]), config, max_bytes)
+    checkpoint = "" if args.no_checkpoint else (
+        args.checkpoint or audit.default_checkpoint(config, items)
+    )
+    print(f"Auditing {len(items)} item(s) with {args.jobs} worker(s)", file=sys.stderr)
+    results = audit.run_audit(
+        items, config, jobs=args.jobs, budget=args.budget, checkpoint=checkpoint
+    )
+    report = audit.sarif_report(results) if args.format == "sarif" else audit.json_report(results)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    summary = audit.summarize(results)
+    print(", ".join(f"{k}: {v}" for k, v in summary.items()), file=sys.stderr)
+    return 1 if args.fail_on_concerns and summary["with_concerns"] else 0
+
+
+def cmd_prescreen(args: argparse.Namespace, config: Dict[str, Any]) -> int:
+    from core import prescreen
+
+    if args.action == "train":
+        try:
+            model = prescreen.train_from_history(config, args.holdout, args.days, args.epochs)
+        except ValueError as e:
+            print(f"Not trained: {e}", file=sys.stderr)
+            return 1
+    else:
+        model = prescreen.load_model(config)
+        if model is None:
+            print("No pre-screen model; run 'concensus prescreen train' first.", file=sys.stderr)
+            return 1
+    metrics = model.metrics
+    if args.json:
+        print(json.dumps({"samples": model.samples, "features": len(model.weights), **metrics}, indent=2))
+        return 0
+    print(f"Trained on {model.samples} reviews ({metrics.get('positives', 0)} with concerns), "
+          f"{len(model.weights)} features")
+    print(f"Held-out ({metrics['holdout']} most recent reviews) at P(concerns) < {metrics['threshold']}:")
+    print(f"  precision {metrics['precision']:.3f}  recall {metrics['recall']:.3f}")
+    print(f"  would skip {metrics['skip_rate']:.1%}, of which {metrics['missed_concern_rate']:.1%} had concerns")
+    top = sorted(model.weights.items(), key=lambda kv: kv[1], reverse=True)
+    print("  strongest concern signals: " + ", ".join(f"{k} {v:+.2f}" for k, v in top[:5]))
+    return 0
+
+
+def cmd_sampling(args: argparse.Namespace, config: Dict[str, Any]) -> int:
+    from core.sampling import sampling_report
+
+    _emit(sampling_report(config), ["session", "changes", "reviewed", "sampled_out", "files"], args.json)
+    return 0
+
+
+def cmd_cache(args: argparse.Namespace, config: Dict[str, Any]) -> int:
+    if args.action == "clear":
+        from core.review_cache import clear_local
+
+        print(f"Removed {clear_local(config)} local cache entries.")
+        return 0
+    from core.cache_server import make_server
+
+    server = make_server(args.host, args.port, args.dir, args.max_ttl, args.token)
+    print(f"Serving review cache on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="concensus", description="Concensus review tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    history = commands.add_parser("history", help="Query the local review history")
+    history.add_argument(
+        "query",
+        choices=["latency", "debates", "files", "recent", "compact"],
+        help="latency: p50/p95 per model; debates: debate rate per mode; "
+        "files: most-reviewed files; recent: latest reviews; compact: prune and vacuum",
+    )
+    history.add_argument("--days", type=float, default=None, help="Only include the last N days")
+    history.add_argument("--limit", type=int, default=20)
+    history.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    history.set_defaults(func=cmd_history)
+
+    usage = commands.add_parser("usage", help="Token usage per day, hour and session")
+    usage.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    usage.set_defaults(func=cmd_usage)
+
+    audit = commands.add_parser("audit", help="Review files, directory trees or a git diff in bulk")
+    audit.add_argument("targets", nargs="*", help="Files or directories (default: .)")
+    audit.add_argument("--diff", default="", help="Review the files changed in a git range, e.g. main...HEAD")
+    audit.add_argument("--files-from", default="", help="Read file paths from this file ('-' = stdin)")
+    audit.add_argument("--jobs", type=int, default=4, help="Items reviewed in parallel")
+    audit.add_argument("--budget", type=float, default=0, help="Wall-clock budget in seconds (0 = none)")
+    audit.add_argument("--max-bytes", type=int, default=0, help="Skip larger files (default: audit_max_file_bytes)")
+    audit.add_argument("--checkpoint", default="", help="Checkpoint file (default: state_dir/audit/<hash>.jsonl)")
+    audit.add_argument("--no-checkpoint", action="store_true")
+    audit.add_argument("--format", choices=["json", "sarif"], default="json")
+    audit.add_argument("--output", default="", help="Write the report here instead of stdout")
+    audit.add_argument("--fail-on-concerns", action="store_true", help="Exit 1 if any item has concerns")
+    audit.set_defaults(func=cmd_audit)
+
+    prescreen = commands.add_parser("prescreen", help="Train or inspect the review pre-screen model")
+    prescreen.add_argument("action", choices=["train", "show"],
+                           help="train: fit on review history and report held-out metrics; "
+                           "show: metrics of the saved model")
+    prescreen.add_argument("--holdout", type=float, default=0.2, help="Most recent fraction held out")
+    prescreen.add_argument("--days", type=float, default=None, help="Only train on the last N days")
+    prescreen.add_argument("--epochs", type=int, default=200)
+    prescreen.add_argument("--json", action="store_true", help="Print JSON instead of text")
+    prescreen.set_defaults(func=cmd_prescreen)
+
+    sampling = commands.add_parser("sampling", help="Reviewed and sampled-out changes per session")
+    sampling.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    sampling.set_defaults(func=cmd_sampling)
+
+    cache = commands.add_parser("cache", help="Shared review cache server and local cache")
+    cache.add_argument("action", choices=["serve", "clear"],
+                       help="serve: run the reference cache server; clear: empty the local cache")
+    cache.add_argument("--host", default="127.0.0.1")
+    cache.add_argument("--port", type=int, default=8787)
+    cache.add_argument("--dir", default="", help="Persist entries here (default: in memory)")
+    cache.add_argument("--max-ttl", type=int, default=7 * 86400, help="Cap on entry TTL in seconds")
+    cache.add_argument("--token", default="", help="Require this bearer token")
+    cache.set_defaults(func=cmd_cache)
+
+    profile = commands.add_parser("profile", help="Aggregate CONCENSUS_PROFILE captures")
+    profile.add_argument("query", choices=["report"])
+    profile.add_argument("--dir", default="", help="Capture directory (default: profile_dir)")
+    profile.add_argument("--event", default="", help="Only include one hook event, e.g. Stop")
+    profile.add_argument("--limit", type=int, default=20)
+    profile.add_argument("--json", action="store_true", help="Print JSON instead of tables")
+    profile.set_defaults(func=cmd_profile)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args, load_config())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
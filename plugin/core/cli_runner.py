@@ -1,9 +1,24 @@
+import os
+import sys
+import time
+import errno
+import atexit
+import shutil
+import signal
+import tempfile
 import subprocess
+import threading
 import json
-from dataclasses import dataclass
-from typing import List, Optional
+import shlex
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from core.config import get_state_dir
+
+# Values that switch a model_profiles setting off (core/model_profiles.py).
+OFF_VALUES = ("off", "false", "no", "none", "0")
+
 
 @dataclass
 class CLIResult:
@@ -11,80 +26,651 @@ class CLIResult:
     output: str
     success: bool
     error: Optional[str]
+    truncated: bool = False
+    peak_buffer_bytes: int = 0
+    peak_rss_kb: int = 0
+    reaped: str = ""
+    warm: bool = False
+    duration_ms: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+
+
+@dataclass
+class RunOptions:
+    max_stdout_bytes: int = 1_048_576
+    max_stderr_bytes: int = 65_536
+    chunk_size: int = 65_536
+    nice: int = 0
+    rlimit_as_mb: int = 0
+    rlimit_cpu_seconds: int = 0
+    isolated_cwd: bool = False
+    kill_grace: float = 2.0
+    # Prompts larger than this (UTF-8 bytes) go over stdin; Linux caps a
+    # single argv element at 128 KiB (MAX_ARG_STRLEN).
+    argv_prompt_max_bytes: int = 65_536
+    pool_socket: str = ""
+    pool_size: int = 1
+    pool_idle_timeout: int = 300
+    pool_max_requests: int = 100
+    pool_shutdown_after: int = 900
+    structured_output: bool = False
+    cassette_mode: str = ""
+    cassette_path: str = ""
+    cassette_latency: float = 0.0
+    # Resolved model_profiles settings per model (core/model_profiles.py).
+    profiles: Dict[str, Dict[str, str]] = field(default_factory=dict)
+
+
+@dataclass
+class _ProcessOutput:
+    returncode: int
+    stdout: str
+    stderr: str
+    truncated: bool
+    peak_buffer_bytes: int
+    peak_rss_kb: int
+    timed_out: bool = False
+    reaped: str = ""
+
+
+def run_options_from_config(config: Dict[str, Any]) -> RunOptions:
+    defaults = RunOptions()
+    return RunOptions(
+        max_stdout_bytes=config.get("cli_max_stdout_bytes", defaults.max_stdout_bytes),
+        max_stderr_bytes=config.get("cli_max_stderr_bytes", defaults.max_stderr_bytes),
+        chunk_size=defaults.chunk_size,
+        nice=config.get("cli_nice", defaults.nice),
+        rlimit_as_mb=config.get("cli_rlimit_as_mb", defaults.rlimit_as_mb),
+        rlimit_cpu_seconds=config.get("cli_rlimit_cpu_seconds", defaults.rlimit_cpu_seconds),
+        isolated_cwd=config.get("cli_isolated_cwd", defaults.isolated_cwd),
+        kill_grace=config.get("cli_kill_grace", defaults.kill_grace),
+        argv_prompt_max_bytes=config.get("cli_prompt_argv_max_bytes", defaults.argv_prompt_max_bytes),
+        pool_socket=(
+            os.path.join(get_state_dir(config), "pool.sock")
+            if config.get("worker_pool_enabled", False) else ""
+        ),
+        pool_size=config.get("worker_pool_size", defaults.pool_size),
+        pool_idle_timeout=config.get("worker_pool_idle_timeout", defaults.pool_idle_timeout),
+        pool_max_requests=config.get("worker_pool_max_requests", defaults.pool_max_requests),
+        pool_shutdown_after=config.get("worker_pool_shutdown_after", defaults.pool_shutdown_after),
+        structured_output=config.get("token_accounting_enabled", defaults.structured_output),
+        cassette_mode=_cassette_mode(config),
+        cassette_path=_cassette_path(config),
+        cassette_latency=float(config.get("cassette_latency", defaults.cassette_latency)),
+    )
+
+
+def _cassette_mode(config: Dict[str, Any]) -> str:
+    mode = config.get("cassette_mode", "off")
+    return mode if mode in ("record", "replay") else ""
+
+
+def _cassette_path(config: Dict[str, Any]) -> str:
+    if not _cassette_mode(config):
+        return ""
+    from core.cassette import cassette_path
+
+    return cassette_path(config)
 
 
-def run_gemini(prompt: str, timeout: int = 45) -> CLIResult:
+_LIVE_GROUPS: Dict[int, subprocess.Popen] = {}
+_LIVE_GROUPS_LOCK = threading.Lock()
+
+
+def _group_alive(pgid: int) -> bool:
     try:
-        proc = subprocess.run(
-            ["gemini", "-p", prompt],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
-        if proc.returncode == 0:
-            return CLIResult(
-                model="gemini",
-                output=proc.stdout.strip(),
-                success=True,
-                error=None,
-            )
-        return CLIResult(
-            model="gemini",
-            output="",
-            success=False,
-            error=proc.stderr.strip() or f"Exit code {proc.returncode}",
-        )
-    except subprocess.TimeoutExpired:
-        return CLIResult(model="gemini", output="", success=False, error="Timeout")
-    except FileNotFoundError:
-        return CLIResult(
-            model="gemini", output="", success=False, error="gemini CLI not found"
-        )
+        os.killpg(pgid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def _wait_group(proc: subprocess.Popen, pgid: int, grace: float) -> bool:
+    deadline = time.monotonic() + grace
+    while True:
+        proc.poll()
+        if proc.returncode is not None and not _group_alive(pgid):
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.02)
+
+
+def _terminate_group(proc: subprocess.Popen, grace: float) -> str:
+    """SIGTERM the whole process group, then SIGKILL whatever survives the grace period."""
+    pgid = proc.pid
+    if proc.returncode is not None and not _group_alive(pgid):
+        return ""
+    sent = []
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(pgid, sig)
+        except ProcessLookupError:
+            break
+        sent.append(sig.name)
+        if _wait_group(proc, pgid, grace):
+            break
+    if proc.returncode is None:
+        proc.wait()
+    return f"pgid {pgid}: {', '.join(sent)}" if sent else ""
+
+
+@atexit.register
+def reap_live_groups() -> None:
+    """Terminate every model process group still running (also runs at exit)."""
+    with _LIVE_GROUPS_LOCK:
+        procs = list(_LIVE_GROUPS.values())
+        _LIVE_GROUPS.clear()
+    for proc in procs:
+        _terminate_group(proc, 0.5)
 
 
-def run_codex(prompt: str, timeout: int = 45) -> CLIResult:
+# Applies nice/rlimits in a fresh single-threaded interpreter, then execs the
+# CLI in place (same pid, so the process group and RSS accounting still hold).
+# A preexec_fn would do this between fork and exec, which can deadlock when
+# run_models_parallel spawns from several threads.
+_LIMITS_SHIM = (
+    "import os, sys, resource\n"
+    "nice, as_mb, cpu = (int(v) for v in sys.argv[1:4])\n"
+    "if nice:\n"
+    "    os.nice(nice)\n"
+    "if as_mb:\n"
+    "    resource.setrlimit(resource.RLIMIT_AS, (as_mb << 20, as_mb << 20))\n"
+    "if cpu:\n"
+    "    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 5))\n"
+    "os.execv(sys.argv[4], sys.argv[4:])\n"
+)
+
+
+def _with_limits(argv: List[str], options: RunOptions) -> List[str]:
+    if not (options.nice or options.rlimit_as_mb or options.rlimit_cpu_seconds):
+        return argv
+    executable = shutil.which(argv[0])
+    if executable is None:
+        raise FileNotFoundError(errno.ENOENT, "No such file or directory", argv[0])
+    return [
+        sys.executable, "-S", "-c", _LIMITS_SHIM,
+        str(options.nice), str(options.rlimit_as_mb), str(options.rlimit_cpu_seconds),
+        executable, *argv[1:],
+    ]
+
+
+class _BufferGauge:
+    """Tracks bytes held by all readers of one call, and the peak."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def add(self, n: int) -> None:
+        with self._lock:
+            self.current += n
+            self.peak = max(self.peak, self.current)
+
+
+class _BoundedReader(threading.Thread):
+    def __init__(
+        self,
+        fd: int,
+        max_bytes: int,
+        chunk_size: int,
+        gauge: _BufferGauge,
+        line_filter: Optional[Callable[[bytes], bool]] = None,
+    ):
+        super().__init__(daemon=True)
+        self.fd = fd
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.gauge = gauge
+        self.line_filter = line_filter
+        self.chunks: List[bytes] = []
+        self.kept = 0
+        self.truncated = False
+        self._partial = b""
+
+    def _keep(self, data: bytes) -> None:
+        room = self.max_bytes - self.kept
+        if room <= 0:
+            self.truncated = True
+            return
+        if len(data) > room:
+            data = data[:room]
+            self.truncated = True
+        self.chunks.append(data)
+        self.kept += len(data)
+        self.gauge.add(len(data))
+
+    def _feed_lines(self, chunk: bytes) -> None:
+        buffered = len(self._partial)
+        lines = (self._partial + chunk).split(b"\n")
+        self._partial = lines.pop()
+        if len(self._partial) > self.max_bytes:
+            self._partial = b""
+            self.truncated = True
+        self.gauge.add(len(self._partial) - buffered)
+        for line in lines:
+            if line.strip() and self.line_filter(line):
+                self._keep(line + b"\n")
+
+    def run(self) -> None:
+        while True:
+            try:
+                chunk = os.read(self.fd, self.chunk_size)
+            except OSError:
+                break
+            if not chunk:
+                break
+            if self.line_filter is None:
+                self._keep(chunk)
+            else:
+                self._feed_lines(chunk)
+        if self.line_filter is not None and self._partial.strip():
+            if self.line_filter(self._partial):
+                self._keep(self._partial)
+        self._partial = b""
+
+    def text(self) -> str:
+        return b"".join(self.chunks).decode("utf-8", errors="replace")
+
+
+def _reap(proc: subprocess.Popen, deadline: float) -> Optional[int]:
+    """Wait for the child and return its peak RSS in KiB, or None on timeout."""
+    while True:
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+        if pid:
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            rss = usage.ru_maxrss
+            return rss // 1024 if sys.platform == "darwin" else rss
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(0.01)
+
+
+@dataclass
+class SpawnedProcess:
+    proc: subprocess.Popen
+    workdir: Optional[str]
+    argv: List[str]
+
+
+def spawn_process(argv: List[str], options: RunOptions, stdin_pipe: bool = False) -> SpawnedProcess:
+    workdir = tempfile.mkdtemp(prefix="concensus-") if options.isolated_cwd else None
+    env = {**os.environ, "TMPDIR": workdir} if workdir else None
     try:
-        proc = subprocess.run(
-            ["codex", "exec", "--json", prompt],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
-        if proc.returncode == 0:
-            text = _extract_codex_text(proc.stdout)
-            return CLIResult(model="codex", output=text, success=True, error=None)
-        return CLIResult(
-            model="codex",
-            output="",
-            success=False,
-            error=proc.stderr.strip() or f"Exit code {proc.returncode}",
-        )
-    except subprocess.TimeoutExpired:
-        return CLIResult(model="codex", output="", success=False, error="Timeout")
-    except FileNotFoundError:
-        return CLIResult(
-            model="codex", output="", success=False, error="codex CLI not found"
+        proc = subprocess.Popen(
+            _with_limits(argv, options),
+            stdin=subprocess.PIPE if stdin_pipe else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+            cwd=workdir,
+            env=env,
         )
+    except BaseException:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+        raise
+    with _LIVE_GROUPS_LOCK:
+        _LIVE_GROUPS[proc.pid] = proc
+    return SpawnedProcess(proc=proc, workdir=workdir, argv=argv)
 
 
-def _extract_codex_text(jsonl_output: str) -> str:
-    texts = []
+def _write_stdin(proc: subprocess.Popen, data: bytes) -> None:
+    try:
+        proc.stdin.write(data)
+        proc.stdin.close()
+    except (BrokenPipeError, OSError, ValueError):
+        pass
+
+
+def discard_process(spawned: SpawnedProcess) -> str:
+    """Terminate a spawned process that will never be collected."""
+    proc = spawned.proc
+    reaped = _terminate_group(proc, 0.5)
+    with _LIVE_GROUPS_LOCK:
+        _LIVE_GROUPS.pop(proc.pid, None)
+    for stream in (proc.stdin, proc.stdout, proc.stderr):
+        if stream:
+            stream.close()
+    if spawned.workdir:
+        shutil.rmtree(spawned.workdir, ignore_errors=True)
+    return reaped
+
+
+def _collect(
+    spawned: SpawnedProcess,
+    timeout: int,
+    options: RunOptions,
+    line_filter: Optional[Callable[[bytes], bool]] = None,
+    stdin_data: Optional[bytes] = None,
+) -> _ProcessOutput:
+    proc = spawned.proc
+    deadline = time.monotonic() + timeout
+    gauge = _BufferGauge()
+    stdout_reader = _BoundedReader(
+        proc.stdout.fileno(), options.max_stdout_bytes, options.chunk_size, gauge, line_filter
+    )
+    stderr_reader = _BoundedReader(
+        proc.stderr.fileno(), options.max_stderr_bytes, options.chunk_size, gauge
+    )
+    stdout_reader.start()
+    stderr_reader.start()
+    if stdin_data is not None:
+        threading.Thread(target=_write_stdin, args=(proc, stdin_data), daemon=True).start()
+    peak_rss_kb = None
+    reaped = ""
+    try:
+        peak_rss_kb = _reap(proc, deadline)
+    finally:
+        # Runs on timeout, normal exit with lingering grandchildren, and cancellation.
+        reaped = _terminate_group(proc, options.kill_grace)
+        with _LIVE_GROUPS_LOCK:
+            _LIVE_GROUPS.pop(proc.pid, None)
+        for reader in (stdout_reader, stderr_reader):
+            reader.join(max(0.1, deadline - time.monotonic()))
+        proc.stdout.close()
+        proc.stderr.close()
+        if spawned.workdir:
+            shutil.rmtree(spawned.workdir, ignore_errors=True)
+    return _ProcessOutput(
+        returncode=proc.returncode,
+        stdout=stdout_reader.text(),
+        stderr=stderr_reader.text(),
+        truncated=stdout_reader.truncated or stderr_reader.truncated,
+        peak_buffer_bytes=gauge.peak,
+        peak_rss_kb=peak_rss_kb or 0,
+        timed_out=peak_rss_kb is None,
+        reaped=reaped,
+    )
+
+
+def _run_process(
+    argv: List[str],
+    timeout: int,
+    options: RunOptions,
+    line_filter: Optional[Callable[[bytes], bool]] = None,
+) -> _ProcessOutput:
+    return _collect(spawn_process(argv, options), timeout, options, line_filter)
+
+
+def _cli_result(model: str, proc: _ProcessOutput, output: str, warm: bool = False) -> CLIResult:
+    success = proc.returncode == 0 and not proc.timed_out
+    if proc.timed_out:
+        error = "Timeout"
+    elif not success:
+        error = proc.stderr.strip() or f"Exit code {proc.returncode}"
+    else:
+        error = None
+    return CLIResult(
+        model=model,
+        output=output if success else "",
+        success=success,
+        error=error,
+        truncated=proc.truncated,
+        peak_buffer_bytes=proc.peak_buffer_bytes,
+        peak_rss_kb=proc.peak_rss_kb,
+        reaped=proc.reaped,
+        warm=warm,
+    )
+
+
+def _is_codex_kept_event(line: bytes) -> bool:
+    """Keep only the JSONL events the codex parsers read; drop tool-call noise."""
+    if b'"agent_message"' not in line and b'"turn.completed"' not in line:
+        return False
+    try:
+        event = json.loads(line)
+    except json.JSONDecodeError:
+        return False
+    if event.get("type") == "turn.completed":
+        return True
+    return (
+        event.get("type") == "item.completed"
+        and event.get("item", {}).get("type") == "agent_message"
+    )
+
+
+def _codex_events(jsonl_output: str):
     for line in jsonl_output.strip().split("\n"):
         if not line.strip():
             continue
         try:
-            event = json.loads(line)
-            if event.get("type") == "item.completed":
-                item = event.get("item", {})
-                if item.get("type") == "agent_message":
-                    texts.append(item.get("text", ""))
+            yield json.loads(line)
         except json.JSONDecodeError:
             continue
+
+
+def _extract_codex_text(jsonl_output: str) -> str:
+    texts = []
+    for event in _codex_events(jsonl_output):
+        if event.get("type") == "item.completed":
+            item = event.get("item", {})
+            if item.get("type") == "agent_message":
+                texts.append(item.get("text", ""))
     return "\n".join(texts).strip()
 
 
+def _extract_codex_usage(jsonl_output: str) -> Dict[str, int]:
+    usage = {"input_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+    for event in _codex_events(jsonl_output):
+        if event.get("type") == "turn.completed":
+            counts = event.get("usage") or {}
+            usage["input_tokens"] += counts.get("input_tokens", 0)
+            usage["cached_tokens"] += counts.get("cached_input_tokens", 0)
+            usage["output_tokens"] += counts.get("output_tokens", 0)
+    return usage
+
+
+def _gemini_json(stdout: str) -> Optional[Dict[str, Any]]:
+    """Parse ``gemini --output-format json``; None for plain-text output."""
+    if not stdout.lstrip().startswith("{"):
+        return None
+    try:
+        data = json.loads(stdout)
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) and "response" in data else None
+
+
+def _extract_gemini_text(stdout: str) -> str:
+    data = _gemini_json(stdout)
+    return (data.get("response") or "").strip() if data else stdout.strip()
+
+
+def _extract_gemini_usage(stdout: str) -> Dict[str, int]:
+    usage = {"input_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+    data = _gemini_json(stdout) or {}
+    for model_stats in (data.get("stats", {}).get("models") or {}).values():
+        tokens = model_stats.get("tokens", {})
+        usage["input_tokens"] += tokens.get("prompt", 0)
+        usage["cached_tokens"] += tokens.get("cached", 0)
+        usage["output_tokens"] += tokens.get("candidates", 0) + tokens.get("thoughts", 0)
+    return usage
+
+
+@dataclass
+class ModelSpec:
+    argv: Callable[[str], List[str]]
+    stdin_argv: List[str]
+    parse: Callable[[str], str]
+    usage: Callable[[str], Dict[str, int]]
+    line_filter: Optional[Callable[[bytes], bool]] = None
+    # Extra flags for machine-readable output with token stats (token accounting).
+    structured_args: List[str] = field(default_factory=list)
+    # model_profiles setting -> CLI flags; settings a CLI has no flag for are ignored.
+    profile_flags: Dict[str, Callable[[str], List[str]]] = field(default_factory=dict)
+    # Where profile flags go in argv (after any subcommand).
+    flag_index: int = 1
+
+
+def _gemini_sandbox(value: str) -> List[str]:
+    # "read-only": tool calls needing approval are refused in headless mode.
+    # "default" is the CLI default; passing it overrides an approval mode set
+    # in the user's settings.json.
+    if value == "read-only":
+        return ["--approval-mode", "default"]
+    return ["--sandbox"] if value == "container" else []
+
+
+MODEL_SPECS: Dict[str, ModelSpec] = {
+    "gemini": ModelSpec(
+        argv=lambda prompt: ["gemini", "-p", prompt],
+        stdin_argv=["gemini"],
+        parse=_extract_gemini_text,
+        usage=_extract_gemini_usage,
+        structured_args=["--output-format", "json"],
+        profile_flags={"model": lambda v: ["-m", v], "sandbox": _gemini_sandbox},
+    ),
+    "codex": ModelSpec(
+        argv=lambda prompt: ["codex", "exec", "--json", prompt],
+        stdin_argv=["codex", "exec", "--json", "-"],
+        parse=_extract_codex_text,
+        usage=_extract_codex_usage,
+        line_filter=_is_codex_kept_event,
+        profile_flags={
+            "model": lambda v: ["-m", v],
+            "effort": lambda v: ["-c", f"model_reasoning_effort={v}"],
+            "max_output": lambda v: ["-c", f"model_max_output_tokens={v}"],
+            "sandbox": lambda v: ["--sandbox", v],
+        },
+        flag_index=2,
+    ),
+}
+
+
+def model_argv(model: str, options: RunOptions, prompt: Optional[str] = None) -> List[str]:
+    """argv for a model; without a prompt, the prompt-over-stdin form."""
+    spec = MODEL_SPECS[model]
+    argv = spec.argv(prompt) if prompt is not None else list(spec.stdin_argv)
+    if options.structured_output:
+        argv[1:1] = spec.structured_args
+    argv[spec.flag_index:spec.flag_index] = profile_args(model, options.profiles.get(model, {}))
+    return argv
+
+
+def profile_args(model: str, profile: Dict[str, str]) -> List[str]:
+    flags = MODEL_SPECS[model].profile_flags
+    args = []
+    for key, value in profile.items():
+        if key in flags and value:
+            args.extend(flags[key](value))
+    return args + shlex.split(profile.get("args", ""))
+
+
+def unmapped_settings(model: str, profile: Dict[str, str]) -> List[str]:
+    """Profile settings this CLI has no flag for (``isolated`` and ``args`` apply to every CLI)."""
+    flags = MODEL_SPECS[model].profile_flags
+    return [key for key in profile if key not in flags and key not in ("isolated", "args")]
+
+
+def _model_options(model: str, options: RunOptions) -> RunOptions:
+    isolated = options.profiles.get(model, {}).get("isolated")
+    if isolated is None:
+        return options
+    return replace(options, isolated_cwd=isolated.lower() not in OFF_VALUES)
+
+
+def collect_model(
+    model: str,
+    spawned: SpawnedProcess,
+    timeout: int,
+    options: RunOptions,
+    stdin_data: Optional[bytes] = None,
+    warm: bool = False,
+) -> CLIResult:
+    proc = _collect(spawned, timeout, options, MODEL_SPECS[model].line_filter, stdin_data)
+    return _model_result(model, proc, warm)
+
+
+def _model_result(model: str, proc: _ProcessOutput, warm: bool = False) -> CLIResult:
+    spec = MODEL_SPECS[model]
+    result = _cli_result(model, proc, spec.parse(proc.stdout), warm=warm)
+    for key, value in spec.usage(proc.stdout).items():
+        setattr(result, key, value)
+    return result
+
+
+# _ProcessOutput fields stored in cassettes; the rest are host-specific.
+CASSETTE_FIELDS = ("returncode", "stdout", "stderr", "truncated", "timed_out")
+
+
+def _replay_model(model: str, prompt: str, options: RunOptions) -> CLIResult:
+    from core.cassette import prompt_hash, replay_call
+
+    entry = replay_call(options.cassette_path, model, prompt, options.cassette_latency)
+    if entry is None:
+        return CLIResult(
+            model=model, output="", success=False,
+            error=f"No cassette entry for {model} prompt {prompt_hash(prompt)[:12]}",
+        )
+    proc = _ProcessOutput(
+        **{name: entry[name] for name in CASSETTE_FIELDS}, peak_buffer_bytes=0, peak_rss_kb=0
+    )
+    result = _model_result(model, proc)
+    result.duration_ms = entry.get("duration_ms", 0)
+    return result
+
+
+def _run_model(model: str, prompt: str, timeout: int, options: Optional[RunOptions]) -> CLIResult:
+    options = _model_options(model, options or RunOptions())
+    if options.cassette_mode == "replay":
+        return _replay_model(model, prompt, options)
+    started = time.monotonic()
+    result = None
+    # Recording captures real CLI invocations, and warm workers run without
+    # profile flags, so both bypass the pool.
+    if options.pool_socket and options.cassette_mode != "record" and not options.profiles.get(model):
+        from core.worker_pool import request_from_pool
+
+        result = request_from_pool(replace(options, profiles={}), model, prompt, timeout)
+    if result is None:
+        encoded = prompt.encode("utf-8", errors="replace")
+        stdin_data = encoded if len(encoded) > options.argv_prompt_max_bytes else None
+        spawned = None
+        try:
+            try:
+                argv = model_argv(model, options, None if stdin_data else prompt)
+                spawned = spawn_process(argv, options, stdin_pipe=stdin_data is not None)
+            except OSError as e:
+                if e.errno != errno.E2BIG or stdin_data is not None:
+                    raise
+                stdin_data = encoded
+                argv = model_argv(model, options)
+                spawned = spawn_process(argv, options, stdin_pipe=True)
+        except FileNotFoundError:
+            result = CLIResult(
+                model=model, output="", success=False, error=f"{model} CLI not found"
+            )
+        if spawned is not None:
+            proc = _collect(spawned, timeout, options, MODEL_SPECS[model].line_filter, stdin_data)
+            if options.cassette_mode == "record":
+                from core.cassette import record_call
+
+                record_call(
+                    options.cassette_path, model, argv, prompt,
+                    {name: getattr(proc, name) for name in CASSETTE_FIELDS},
+                    int((time.monotonic() - started) * 1000),
+                )
+            result = _model_result(model, proc)
+    result.duration_ms = int((time.monotonic() - started) * 1000)
+    return result
+
+
+def run_gemini(prompt: str, timeout: int = 45, options: Optional[RunOptions] = None) -> CLIResult:
+    return _run_model("gemini", prompt, timeout, options)
+
+
+def run_codex(prompt: str, timeout: int = 45, options: Optional[RunOptions] = None) -> CLIResult:
+    return _run_model("codex", prompt, timeout, options)
+
+
 def run_models_parallel(
-    prompt: str, models: List[str], timeout: int = 45
+    prompt: str, models: List[str], timeout: int = 45, options: Optional[RunOptions] = None
 ) -> List[CLIResult]:
     runners = {"gemini": run_gemini, "codex": run_codex}
     results = []
@@ -92,7 +678,7 @@ def run_models_parallel(
         futures = {}
         for model in models:
             if model in runners:
-                futures[executor.submit(runners[model], prompt, timeout)] = model
+                futures[executor.submit(runners[model], prompt, timeout, options)] = model
         for future in as_completed(futures):
             results.append(future.result())
     return results
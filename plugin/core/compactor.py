@@ -0,0 +1,310 @@
+"""Token-budgeted context compaction.
+
+Token counts are estimated locally (word and punctuation pieces, about four
+characters per token). When a review context exceeds its mode's budget
+(``prompt_token_budgets``), compaction steps run in order until it fits:
+
+1. trim trailing whitespace and collapse blank-line runs
+2. strip full-line comments (code modes, using the file extension's comment
+   syntax; files of unknown type keep every line)
+3. collapse repeated lines and blocks
+4. elide the middle of long function bodies (code modes), progressively
+5. keep headings, numbered steps and list items; elide other prose lines
+6. keep the head and tail on line boundaries with an elision marker
+
+Elided spans are replaced with ``[… N lines elided …]`` markers so the
+reviewers know text is missing.
+"""
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from core.config import parse_mapping
+
+CODE_MODES = ("code", "changeset")
+TOKEN_PIECE = re.compile(r"\w+|[^\w\s]")
+# Comment syntax per extension: (full-line markers, has /* ... */ blocks).
+# "#" is never a comment marker in C-family files (preprocessor lines).
+_C_FAMILY = (
+    ".c", ".h", ".cc", ".cpp", ".cxx", ".hpp", ".hh", ".cs", ".java", ".js", ".jsx", ".mjs",
+    ".ts", ".tsx", ".go", ".rs", ".swift", ".kt", ".kts", ".scala", ".dart", ".m", ".mm",
+)
+_HASH = (".py", ".pyi", ".rb", ".sh", ".bash", ".zsh", ".pl", ".r", ".toml", ".yaml", ".yml", ".cfg")
+_DASH = (".sql", ".lua", ".hs")
+COMMENT_SYNTAX: Dict[str, Tuple[Tuple[str, ...], bool]] = {
+    **{ext: (("//",), True) for ext in _C_FAMILY},
+    **{ext: (("#",), False) for ext in _HASH},
+    **{ext: (("--",), ext == ".sql") for ext in _DASH},
+    ".php": (("//", "#"), True),
+    ".css": ((), True),
+    ".scss": (("//",), True),
+}
+CHANGESET_FILE = "### FILE: "
+BLOCK_START = re.compile(
+    r"^(\s*)(async\s+def|def|function|func|fn|(public|private|protected|static)\b.*\()"
+    r"|^(\s*).*\)\s*(\{|=>\s*\{)\s*$"
+)
+# Classes and other containers: their bodies hold the method signatures, so
+# only the functions inside them are elided.
+CONTAINER_START = re.compile(
+    r"^\s*(export\s+)?((public|private|protected|internal|abstract|final|sealed|data|open|static|pub)\s+)*"
+    r"(class|interface|trait|impl|mod|module|namespace|object|struct|enum|extension|protocol)\b"
+)
+STRUCTURAL_LINE = re.compile(r"^\s*(#{1,6}\s|\d+[.)]\s|[-*+]\s|\*\*|[A-Z][\w ]{0,40}:\s*$)")
+# Body lines kept at each end of a function, tried in order.
+FUNCTION_KEEP = (12, 6, 3, 1)
+REPEAT_MIN = 3
+
+
+def estimate_tokens(text: str) -> int:
+    return sum((len(piece) + 3) // 4 for piece in TOKEN_PIECE.findall(text))
+
+
+def _marker(indent: str, count: int, what: str = "lines") -> str:
+    return f"{indent}[… {count} {what} elided …]"
+
+
+@dataclass
+class Compaction:
+    text: str
+    original_tokens: int
+    tokens: int
+    steps: List[str] = field(default_factory=list)
+
+    @property
+    def compacted(self) -> bool:
+        return self.tokens < self.original_tokens
+
+    def describe(self) -> str:
+        return (
+            f"{self.original_tokens} → {self.tokens} tokens (est.)"
+            f" via {', '.join(self.steps)}"
+        )
+
+
+def _normalize_blank_runs(lines: List[str]) -> List[str]:
+    out: List[str] = []
+    for line in lines:
+        line = line.rstrip()
+        if line or (out and out[-1]):
+            out.append(line)
+    while out and not out[-1]:
+        out.pop()
+    return out
+
+
+def comment_syntax(file_path: str) -> Tuple[Tuple[str, ...], bool]:
+    return COMMENT_SYNTAX.get(os.path.splitext(file_path)[1].lower(), ((), False))
+
+
+def _strip_comments(lines: List[str], file_path: str, sections: bool = False) -> List[str]:
+    """Drop full-line comments; with ``sections``, each changeset file uses its own syntax."""
+    markers, blocks = comment_syntax(file_path)
+    in_block = False
+    out: List[str] = []
+    for line in lines:
+        stripped = line.strip()
+        if sections and line.startswith(CHANGESET_FILE):
+            markers, blocks = comment_syntax(line[len(CHANGESET_FILE):].strip())
+            in_block = False
+            out.append(line)
+            continue
+        if in_block:
+            end = stripped.find("*/")
+            if end >= 0:
+                in_block = False
+                if stripped[end + 2:].strip():
+                    out.append(line)
+            continue
+        if blocks and stripped.startswith("/*"):
+            end = stripped.find("*/", 2)
+            if end < 0:
+                in_block = True
+            elif stripped[end + 2:].strip():
+                out.append(line)
+            continue
+        if stripped.startswith(markers) and not stripped.startswith("#!"):
+            continue
+        out.append(line)
+    return out
+
+
+def _collapse_repeats(lines: List[str]) -> List[str]:
+    out: List[str] = []
+    i = 0
+    while i < len(lines):
+        j = i
+        while j + 1 < len(lines) and lines[j + 1] == lines[i]:
+            j += 1
+        run = j - i + 1
+        if run >= REPEAT_MIN and lines[i].strip():
+            indent = lines[i][: len(lines[i]) - len(lines[i].lstrip())]
+            out += [lines[i], _marker(indent, run - 1, "identical lines")]
+        else:
+            out += lines[i : j + 1]
+        i = j + 1
+
+    # Whole paragraphs seen before (e.g. a quoted block pasted twice).
+    seen = set()
+    result: List[str] = []
+    block: List[str] = []
+    for line in out + [""]:
+        if line.strip():
+            block.append(line)
+            continue
+        key = "\n".join(block)
+        if len(block) >= 2 and key in seen:
+            result.append(_marker("", len(block), "repeated lines"))
+        else:
+            result += block
+            seen.add(key)
+        block = []
+        result.append(line)
+    return result[:-1]
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def _elide_functions(lines: List[str], keep: int) -> List[str]:
+    out: List[str] = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        out.append(line)
+        i += 1
+        if not BLOCK_START.match(line) or CONTAINER_START.match(line):
+            continue
+        base = _indent(line)
+        j = i
+        while j < len(lines) and (not lines[j].strip() or _indent(lines[j]) > base):
+            j += 1
+        while j > i and not lines[j - 1].strip():
+            j -= 1
+        body = lines[i:j]
+        if len(body) > 2 * keep + 1:
+            indent = " " * (_indent(body[0]) if body[0].strip() else base + 4)
+            out += body[:keep] + [_marker(indent, len(body) - 2 * keep)] + body[-keep:]
+            i = j
+    return out
+
+
+def _keep_structure(lines: List[str], budget: int) -> List[str]:
+    """Keep structural lines; fill the rest of the budget from both ends."""
+    kept = [bool(STRUCTURAL_LINE.match(line)) for line in lines]
+    gaps = sum(1 for i, k in enumerate(kept) if not k and (i == 0 or kept[i - 1]))
+    remaining = (
+        budget
+        - sum(estimate_tokens(l) + 1 for l, k in zip(lines, kept) if k)
+        - gaps * (estimate_tokens(_marker("", len(lines))) + 1)
+    )
+    lo, hi = 0, len(lines) - 1
+    front = True
+    while lo <= hi and remaining > 0:
+        index = lo if front else hi
+        if not kept[index]:
+            cost = estimate_tokens(lines[index]) + 1
+            if cost > remaining:
+                break
+            kept[index] = True
+            remaining -= cost
+        if front:
+            lo += 1
+        else:
+            hi -= 1
+        front = not front
+    out: List[str] = []
+    dropped = 0
+    for line, keep in zip(lines, kept):
+        if keep:
+            if dropped:
+                out.append(_marker("", dropped))
+                dropped = 0
+            out.append(line)
+        elif line.strip():
+            dropped += 1
+    if dropped:
+        out.append(_marker("", dropped))
+    return out
+
+
+def _head_tail(lines: List[str], budget: int) -> List[str]:
+    head: List[str] = []
+    tail: List[str] = []
+    remaining = budget - estimate_tokens(_marker("", len(lines)))
+    lo, hi = 0, len(lines) - 1
+    while lo <= hi:
+        target, index = (head, lo) if len(head) <= len(tail) else (tail, hi)
+        cost = estimate_tokens(lines[index]) + 1
+        if cost > remaining:
+            break
+        remaining -= cost
+        target.append(lines[index])
+        if target is head:
+            lo += 1
+        else:
+            hi -= 1
+    elided = hi - lo + 1
+    if elided <= 0:
+        return lines
+    return head + [_marker("", elided)] + tail[::-1]
+
+
+def _tokens(lines: List[str]) -> int:
+    return estimate_tokens("\n".join(lines))
+
+
+def compact(
+    text: str, budget: int, code: bool = False, file_path: str = "", sections: bool = False
+) -> Compaction:
+    original = estimate_tokens(text)
+    if budget <= 0 or original <= budget:
+        return Compaction(text, original, original)
+    lines = text.split("\n")
+    steps: List[str] = []
+
+    def apply(name: str, new_lines: List[str]) -> bool:
+        nonlocal lines
+        if new_lines != lines:
+            lines = new_lines
+            steps.append(name)
+        return _tokens(lines) <= budget
+
+    done = apply("whitespace", _normalize_blank_runs(lines))
+    if not done and code:
+        done = apply("comments", _normalize_blank_runs(_strip_comments(lines, file_path, sections)))
+    if not done:
+        done = apply("repeats", _collapse_repeats(lines))
+    if not done and code:
+        for keep in FUNCTION_KEEP:
+            if _tokens(_elide_functions(lines, keep)) <= budget or keep == FUNCTION_KEEP[-1]:
+                done = apply("function bodies", _elide_functions(lines, keep))
+                break
+    if not done and not code:
+        done = apply("structure", _keep_structure(lines, budget))
+    if not done:
+        apply("head/tail", _head_tail(lines, budget))
+    result = "\n".join(lines)
+    return Compaction(result, original, estimate_tokens(result), steps)
+
+
+def budget_for(mode: str, config: Dict) -> int:
+    budgets = dict(parse_mapping(config.get("prompt_token_budgets", [])))
+    try:
+        return int(budgets.get(mode, 0))
+    except ValueError:
+        return 0
+
+
+def compact_for_mode(
+    mode: str, text: str, config: Dict, file_path: str = ""
+) -> Optional[Compaction]:
+    """Compact ``text`` to the mode's budget; None when no budget applies."""
+    budget = budget_for(mode, config)
+    if budget <= 0:
+        return None
+    return compact(
+        text, budget, code=mode in CODE_MODES, file_path=file_path, sections=mode == "changeset"
+    )
@@ -1,6 +1,13 @@
+from __future__ import annotations
+
 import os
 import fnmatch
-from typing import Dict, Any
+
+# Loaded by every hook before it decides whether to run; keep typing (~5ms) off
+# the import path. Annotations are strings under postponed evaluation.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, Any, List, Tuple
 
 DEFAULT_CONFIG = {
     "enabled": True,
@@ -14,9 +21,101 @@ DEFAULT_CONFIG = {
     "stop_debate_rounds": 1,
     "models": ["gemini", "codex"],
     "cli_timeout": 90,
+    "cli_max_stdout_bytes": 1048576,
+    "cli_max_stderr_bytes": 65536,
+    "cli_nice": 0,
+    "cli_rlimit_as_mb": 0,
+    "cli_rlimit_cpu_seconds": 0,
+    "cli_isolated_cwd": False,
+    "model_profiles": [],
+    "cli_kill_grace": 2,
+    "cli_prompt_argv_max_bytes": 65536,
+    "worker_pool_enabled": False,
+    "worker_pool_size": 1,
+    "worker_pool_idle_timeout": 300,
+    "worker_pool_max_requests": 100,
+    "worker_pool_shutdown_after": 900,
     "subagent_consensus_enabled": True,
     "prompt_consensus_enabled": False,
     "prompt_consensus_min_length": 100,
+    "classifier_thresholds": ["plan=1", "research=1", "design=1", "signal=2"],
+    "subagent_min_matches": 0,
+    "history_enabled": False,
+    "history_retention_days": 30,
+    "history_max_reviews": 50000,
+    "adaptive_panel_enabled": False,
+    "adaptive_agreement_threshold": 0.95,
+    "adaptive_min_samples": 20,
+    "adaptive_window": 50,
+    "adaptive_audit_every": 10,
+    "speculative_review_enabled": False,
+    "speculation_wait": 240,
+    "speculation_ttl": 600,
+    "token_accounting_enabled": False,
+    "token_prices": [],
+    "token_budget_session": 0,
+    "token_budget_hour": 0,
+    "token_budget_day": 0,
+    "token_budget_downgrade_ratio": 0.8,
+    "cassette_mode": "off",
+    "cassette": "default",
+    "cassette_latency": 0,
+    "audit_max_file_bytes": 200000,
+    "sampling_enabled": False,
+    "sampling_path_rates": [],
+    "sampling_mode_rates": [],
+    "sampling_first_per_file": True,
+    "sampling_every_nth": 10,
+    "review_ledger_enabled": False,
+    "review_ledger_ttl_days": 7,
+    "review_ledger_max_files": 500,
+    "review_ledger_dependency_files": [
+        "requirements.txt", "pyproject.toml", "package.json", "go.mod", "Cargo.toml",
+    ],
+    "review_cache_enabled": False,
+    "review_cache_ttl": 86400,
+    "review_cache_url": "",
+    "review_cache_token": "",
+    "review_cache_timeout": 0.5,
+    "review_cache_model_versions": [],
+    "followup_enabled": False,
+    "followup_max_attempts": 3,
+    "prescreen_enabled": False,
+    "prescreen_skip_below": 0.05,
+    "prescreen_downgrade_below": 0.15,
+    "prescreen_min_samples": 200,
+    "singleflight_enabled": False,
+    "singleflight_wait": 300,
+    "singleflight_result_ttl": 30,
+    "prompt_token_budgets": ["plan=1000", "research=1000"],
+    "profile_dir": "",
+    "profile_max_files": 200,
+    "profile_max_mb": 50,
+    "routing_enabled": False,
+    "routing_tiers": ["fast=1", "panel=4", "debate=6"],
+    "routing_fast_model": "codex",
+    "risk_path_rules": [
+        "**/auth/**=3", "**/security/**=3", "**/migrations/**=3",
+        "*crypto*=3", "*secret*=2", "**/tests/**=-2", "test_*=-2",
+        "*_test.*=-2", "**/fixtures/**=-3",
+    ],
+    "risk_file_types": [
+        "*.sql=2", "*.sh=2", "*.tf=2", "Dockerfile=2", "*.py=1", "*.js=1",
+        "*.ts=1", "*.go=1", "*.rs=1", "*.java=1", "*.rb=1", "*.c=1", "*.cpp=1",
+    ],
+    "risk_size_steps": ["50=1", "200=2"],
+    "risk_sensitive_apis": [
+        "eval(", "exec(", "subprocess", "os.system", "pickle.load", "yaml.load(",
+        "innerHTML", "password", "secret", "jwt", "hashlib", "verify=False",
+        "chmod", "DROP TABLE",
+    ],
+    "risk_sensitive_api_max": 4,
+    "state_dir": ".claude/concensus",
+    "changeset_mode": False,
+    "changeset_max_file_chars": 4000,
+    "symbol_context_enabled": False,
+    "symbol_index_max_files": 5000,
+    "symbol_context_max_symbols": 15,
 }
 
 
@@ -55,6 +154,8 @@ def extract_frontmatter(content: str) -> Dict[str, Any]:
                     value = False
                 elif value.isdigit():
                     value = int(value)
+                elif value.count(".") == 1 and value.replace(".", "").isdigit():
+                    value = float(value)
                 result[key] = value
         elif stripped.startswith("-") and in_list:
             current_list.append(stripped[1:].strip().strip("\"'"))
@@ -73,19 +174,41 @@ def load_config(config_dir: str = ".claude") -> Dict[str, Any]:
     return config
 
 
+def get_state_dir(config: Dict[str, Any], *parts: str) -> str:
+    path = os.path.join(config.get("state_dir", ".claude/concensus"), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def parse_mapping(entries: List[str]) -> List[Tuple[str, str]]:
+    """Parse ``key=value`` list entries (frontmatter has no nested maps)."""
+    pairs = []
+    for entry in entries or []:
+        key, sep, value = str(entry).rpartition("=")
+        if sep and key.strip():
+            pairs.append((key.strip(), value.strip()))
+    return pairs
+
+
+def path_matches(file_path: str, pattern: str) -> bool:
+    normalized = file_path.replace("\\", "/")
+    if fnmatch.fnmatch(os.path.basename(normalized), pattern):
+        return True
+    if fnmatch.fnmatch(file_path, pattern):
+        return True
+    if "/" in pattern:
+        parts = normalized.split("/")
+        for i in range(len(parts)):
+            suffix = "/".join(parts[i:])
+            if fnmatch.fnmatch(suffix, pattern) or fnmatch.fnmatch("/" + suffix, pattern):
+                return True
+    return False
+
+
 def should_skip_path(file_path: str, config: Dict[str, Any]) -> bool:
-    basename = os.path.basename(file_path)
     for pattern in config.get("skip_paths", []):
-        if fnmatch.fnmatch(basename, pattern):
-            return True
-        if fnmatch.fnmatch(file_path, pattern):
+        if path_matches(file_path, pattern):
             return True
-        if "/" in pattern:
-            parts = file_path.replace("\\", "/").split("/")
-            for i in range(len(parts)):
-                suffix = "/".join(parts[i:])
-                if fnmatch.fnmatch(suffix, pattern):
-                    return True
     return False
 
 
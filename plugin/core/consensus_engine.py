@@ -1,12 +1,43 @@
 import os
 import re
 import sys
+import time
+import sqlite3
 from enum import Enum
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
 
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from core.cli_runner import run_models_parallel, run_gemini, run_codex, CLIResult
+from core.cli_runner import (
+    run_models_parallel,
+    run_gemini,
+    run_codex,
+    run_options_from_config,
+    CLIResult,
+)
+from core.agreement import category_for, choose_panel, locked_stats
+from core.compactor import compact_for_mode
+from core.followup import (
+    build_followup_prompt,
+    followup_outcome,
+    open_concerns,
+    resolve_concerns,
+    review_concerns,
+)
+from core.history import ModelCall
+from core.model_profiles import describe_profiles, describe_unmapped, profiled_options
+from core.prescreen import extract_features, prescreen_decision
+from core.review_ledger import ledger_plan
+from core.router import RouteDecision, apply_route
+from core.usage import (
+    budget_status,
+    budgets_configured,
+    estimate_cost,
+    format_usage,
+    total_usage,
+)
+from core.state_writes import StateWrites
+from core.symbol_index import symbol_context_for_change
 
 
 def _progress(msg: str) -> None:
@@ -27,6 +58,9 @@ class ConsensusResult:
     summary: str
     responses: Dict[str, str] = field(default_factory=dict)
     recommendation: str = ""
+    usage: Dict[str, int] = field(default_factory=dict)
+    # Deferred state writes of a speculative run (core/state_writes.py).
+    state_writes: List[Dict] = field(default_factory=list)
 
 
 PLUGIN_ROOT = os.environ.get(
@@ -46,13 +80,20 @@ TEMPLATE_MAP = {
     "plan": "verify-plan.txt",
     "research": "verify-research.txt",
     "direction": "verify-direction.txt",
+    "changeset": "verify-changeset.txt",
 }
 
 
-def build_verification_prompt(mode: str, context: str, file_path: str = "") -> str:
+def build_verification_prompt(
+    mode: str, context: str, file_path: str = "", symbols: str = ""
+) -> str:
     template_name = TEMPLATE_MAP.get(mode, "verify-design.txt")
     template = _load_template(template_name)
-    return template.replace("{{context}}", context).replace("{{file_path}}", file_path)
+    return (
+        template.replace("{{context}}", context)
+        .replace("{{file_path}}", file_path)
+        .replace("{{symbols}}", f"\n{symbols}\n" if symbols else "")
+    )
 
 
 def build_debate_prompt(
@@ -136,10 +177,343 @@ def _format_result(
     )
 
 
+def _skipped_result(log: List[str], responses: Dict[str, str], recommendation: str) -> ConsensusResult:
+    return ConsensusResult(
+        status=ConsensusStatus.SKIPPED,
+        round=0,
+        summary="\n".join(f"  {e}" for e in log)
+        + f"\n\nResult: SKIPPED\n  → {recommendation}",
+        responses=responses,
+        recommendation=recommendation,
+    )
+
+
+def _all_approve(result: ConsensusResult) -> bool:
+    verdicts = [
+        _extract_verdict(text) for text in result.responses.values() if not text.startswith("[Error")
+    ]
+    return result.status == ConsensusStatus.FULL_CONSENSUS and all(v == "APPROVE" for v in verdicts)
+
+
+def _model_call(round_num: int, result: CLIResult) -> ModelCall:
+    return ModelCall(
+        round=round_num,
+        model=result.model,
+        success=result.success,
+        verdict=_extract_verdict(result.output) if result.success else "",
+        latency_ms=result.duration_ms,
+        input_tokens=result.input_tokens,
+        cached_tokens=result.cached_tokens,
+        output_tokens=result.output_tokens,
+        error=result.error or "",
+    )
+
+
+def _log_round_usage(log: List[str], round_num: int, round_results: List[CLIResult]) -> None:
+    usage = total_usage(round_results)
+    if any(usage.values()):
+        log.append(f"⟐ Tokens (round {round_num}): {format_usage(usage)}")
+
+
+def _record_agreement(writes: StateWrites, category: str, cli_results: List[CLIResult]) -> None:
+    answered = [r for r in cli_results if r.success]
+    try:
+        writes.apply(
+            "agreement",
+            category=category,
+            verdicts={r.model: _extract_verdict(r.output) for r in answered},
+            latencies={r.model: r.duration_ms for r in answered},
+        )
+    except OSError as e:
+        _progress(f"Agreement stats not recorded: {e}")
+
+
 def run_consensus(
-    mode: str, context: str, file_path: str = "", config: Optional[Dict] = None
+    mode: str,
+    context: str,
+    file_path: str = "",
+    config: Optional[Dict] = None,
+    route: Optional[RouteDecision] = None,
+    session_id: str = "",
+    whole_file: bool = False,
+    speculative: bool = False,
 ) -> ConsensusResult:
+    """Review ``context``.
+
+    A ``speculative`` run (its tool call is not yet approved) changes no
+    persistent state; its writes are returned in ``result.state_writes``.
+    """
     config = config or {}
+    calls: List[ModelCall] = []
+    log: List[str] = []
+    writes = StateWrites(config, defer=speculative)
+    started = time.monotonic()
+    ledger = ledger_plan(config, file_path, context) if whole_file and mode == "code" else None
+    if ledger is not None and ledger.carried:
+        _progress(f"Ledger: {ledger.describe()}")
+        log.append(f"⟐ Ledger: {ledger.describe()}")
+    review_context = ledger.context(context) if ledger is not None else context
+    if ledger is not None and not ledger.changed:
+        result = _skipped_result(log, {}, "All regions were approved in an earlier review.")
+    else:
+        concerns = []
+        if _followup_enabled(config, mode, file_path):
+            try:
+                concerns = open_concerns(config, session_id, file_path)
+            except OSError as e:
+                _progress(f"Follow-up state unavailable: {e}")
+        if concerns:
+            result = _followup_consensus(
+                review_context, file_path, config, route, concerns, calls, session_id, log, writes
+            )
+        else:
+            result = _cached_consensus(
+                mode, review_context, file_path, config, route, calls, session_id, log, writes
+            )
+            if _followup_enabled(config, mode, file_path) and result.status != ConsensusStatus.SKIPPED:
+                _remember_concerns(writes, session_id, file_path, result)
+        if ledger is not None and result.status != ConsensusStatus.SKIPPED:
+            try:
+                writes.apply(
+                    "ledger",
+                    file_path=file_path,
+                    current=[r.digest for r in ledger.regions],
+                    reviewed=[r.digest for r in ledger.changed],
+                    approved=_all_approve(result),
+                )
+            except OSError as e:
+                _progress(f"Review ledger not updated: {e}")
+    result.usage = total_usage(calls)
+    if any(result.usage.values()):
+        cost = estimate_cost(calls, config)
+        note = f" ≈ ${cost:.4f}" if cost is not None else ""
+        _progress(f"Review tokens: {format_usage(result.usage)}{note}")
+        try:
+            writes.apply("usage", session_id=session_id, usage=result.usage)
+        except OSError as e:
+            _progress(f"Token usage not recorded: {e}")
+    if config.get("history_enabled", False):
+        try:
+            writes.apply(
+                "history",
+                content=context,
+                mode=mode,
+                path=file_path,
+                status=result.status.value,
+                rounds=result.round,
+                duration_ms=int((time.monotonic() - started) * 1000),
+                calls=[asdict(c) for c in calls],
+                tier=route.tier if route else "",
+                session_id=session_id,
+                features=extract_features(mode, file_path, review_context, config),
+            )
+        except (sqlite3.Error, OSError) as e:
+            _progress(f"History not recorded: {e}")
+    result.state_writes = writes.pending or []
+    return result
+
+
+def _budget_panel(
+    config: Dict, session_id: str, models: List[str], max_rounds: int, log: List[str]
+) -> Optional[Tuple[List[str], int]]:
+    """The (models, max_rounds) the token budget allows; None once it is exhausted."""
+    if not budgets_configured(config):
+        return models, max_rounds
+    try:
+        budget, reason = budget_status(config, session_id)
+    except OSError as e:
+        budget, reason = "ok", ""
+        _progress(f"Token usage unavailable: {e}")
+    if budget == "exhausted":
+        _progress(f"Token budget exhausted ({reason})")
+        log.append(f"⟐ Budget: exhausted ({reason}) — skipped")
+        return None
+    if budget == "downgrade" and (len(models) > 1 or max_rounds > 0):
+        models, max_rounds = apply_route(RouteDecision("fast", 0), models, max_rounds, config)
+        _progress(f"Token budget nearly spent ({reason}) — using {', '.join(models)} only")
+        log.append(f"⟐ Budget: downgraded to fast tier ({reason})")
+    return models, max_rounds
+
+
+def _followup_enabled(config: Dict, mode: str, file_path: str) -> bool:
+    return config.get("followup_enabled", False) and mode == "code" and bool(file_path)
+
+
+def _remember_concerns(
+    writes: StateWrites, session_id: str, file_path: str, result: ConsensusResult
+) -> None:
+    concern_responses = {
+        model: text for model, text in result.responses.items()
+        if model != "claude" and not text.startswith("[Error") and _extract_verdict(text) == "CONCERNS"
+    }
+    concerns = review_concerns(concern_responses)
+    try:
+        writes.apply("remember_concerns", session_id=session_id, file_path=file_path, concerns=concerns)
+    except OSError as e:
+        _progress(f"Follow-up state not updated: {e}")
+        return
+    if concerns:
+        _progress(f"Follow-up: {len(concerns)} concern(s) will be re-checked on the next change")
+
+
+def _followup_consensus(
+    context: str,
+    file_path: str,
+    config: Dict,
+    route: Optional[RouteDecision],
+    concerns: List[Dict],
+    calls: List[ModelCall],
+    session_id: str,
+    log: List[str],
+    writes: StateWrites,
+) -> ConsensusResult:
+    """Single round on verify-followup.txt: are the open concerns resolved, any regressions?"""
+    models = config.get("models", ["gemini", "codex"])
+    if route is not None:
+        models, _ = apply_route(route, models, 0, config)
+        _progress(f"Route: {route.describe()}")
+        log.append(f"⟐ Route: {route.describe()}")
+        if not models:
+            return _skipped_result(log, {}, "Low-risk change. Follow-up skipped by routing.")
+    budgeted = _budget_panel(config, session_id, models, 0, log)
+    if budgeted is None:
+        return _skipped_result(log, {}, "Token budget exhausted. Open concerns still apply.")
+    models = budgeted[0]
+    options = profiled_options(run_options_from_config(config), config, "followup", models, 0)
+    prompt = build_followup_prompt(_load_template("verify-followup.txt"), concerns, context, file_path)
+    _progress(f"Follow-up: checking {len(concerns)} open concern(s) with {', '.join(models)}")
+    log.append(f"⟐ Follow-up: {len(concerns)} open concern(s) from the previous review")
+    cli_results = run_models_parallel(
+        prompt, models, timeout=config.get("cli_timeout", 90), options=options
+    )
+    calls.extend(_model_call(0, r) for r in cli_results)
+    _log_round_usage(log, 0, cli_results)
+
+    responses = {"claude": f"(Original author of the code at {file_path})"}
+    for r in cli_results:
+        responses[r.model] = r.output if r.success else f"[Error: {r.error}]"
+    answered = {m: t for m, t in responses.items() if m != "claude" and not t.startswith("[Error")}
+    if not answered:
+        log.append("⟐ No models responded — skipped")
+        return _skipped_result(log, responses, "Follow-up unavailable. Open concerns still apply.")
+
+    statuses = resolve_concerns(concerns, answered)
+    for concern in concerns:
+        log.append(f"⟐ {concern['id']} {statuses[concern['id']]}: {concern['text'][:100]}")
+    remaining = followup_outcome(concerns, statuses, answered)
+    try:
+        writes.apply("followup", session_id=session_id, file_path=file_path, remaining=remaining)
+    except OSError as e:
+        _progress(f"Follow-up state not updated: {e}")
+    regressions = [c for c in remaining if c["id"] not in statuses]
+    for concern in regressions:
+        log.append(f"⟐ {concern['id']} NEW: {concern['text'][:100]}")
+    resolved = sum(1 for status in statuses.values() if status == "RESOLVED")
+    log.append(f"⟐ Follow-up: {resolved}/{len(concerns)} resolved, {len(regressions)} regression(s)")
+    active = {k: v for k, v in responses.items() if not v.startswith("[Error")}
+    return _format_result(determine_consensus(active), 0, responses, log)
+
+
+def _result_entry(result: ConsensusResult) -> Dict:
+    return {
+        "status": result.status.value,
+        "round": result.round,
+        "summary": result.summary,
+        "responses": result.responses,
+        "recommendation": result.recommendation,
+    }
+
+
+def _entry_result(entry: Dict, log: List[str]) -> ConsensusResult:
+    """Rebuild a stored result, prefixed with this run's process log."""
+    return ConsensusResult(
+        status=ConsensusStatus(entry["status"]),
+        round=entry["round"],
+        summary="\n".join(f"  {e}" for e in log) + "\n" + entry["summary"],
+        responses=entry["responses"],
+        recommendation=entry["recommendation"],
+    )
+
+
+def _cached_consensus(
+    mode: str,
+    context: str,
+    file_path: str,
+    config: Dict,
+    route: Optional[RouteDecision],
+    calls: List[ModelCall],
+    session_id: str,
+    log: List[str],
+    writes: StateWrites,
+) -> ConsensusResult:
+    use_cache = config.get("review_cache_enabled", False)
+    use_singleflight = config.get("singleflight_enabled", False)
+    if not use_cache and not use_singleflight:
+        return _run_consensus(mode, context, file_path, config, route, calls, session_id, log, writes)
+    from core import review_cache
+
+    key = review_cache.review_key(mode, context, file_path, config, route.tier if route else "")
+    if use_cache:
+        hit = review_cache.lookup(config, key)
+        if hit is not None:
+            entry, source = hit
+            age = int(time.time() - entry["created"])
+            _progress(f"Cache hit ({source}, reviewed {age}s ago)")
+            log.append(f"⟐ Cache: {source} hit, reviewed {age}s ago")
+            return _entry_result(entry, log)
+
+    own: List[ConsensusResult] = []
+    downgrades: List[str] = []
+
+    def run() -> Dict:
+        own.append(_run_consensus(
+            mode, context, file_path, config, route, calls, session_id, log, writes, downgrades
+        ))
+        return _result_entry(own[-1])
+
+    if use_singleflight:
+        from core.singleflight import coalesce
+
+        try:
+            entry, role = coalesce(config, key, run)
+        except OSError as e:
+            _progress(f"Singleflight unavailable: {e}")
+            if not own:
+                run()
+        else:
+            if role == "follower":
+                _progress("Reused the result of a concurrent identical review")
+                log.append("⟐ Coalesced: reused a concurrent identical review")
+                return _entry_result(entry, log)
+    else:
+        run()
+    result = own[-1]
+    if downgrades:
+        # The key names the full panel; a reduced run must not answer for it.
+        _progress(f"Review cache not written: downgraded by {', '.join(downgrades)}")
+    elif use_cache and result.status != ConsensusStatus.SKIPPED and calls and all(c.success for c in calls):
+        try:
+            review_cache.store(config, key, _result_entry(result))
+        except OSError as e:
+            _progress(f"Review cache not written: {e}")
+    return result
+
+
+def _run_consensus(
+    mode: str,
+    context: str,
+    file_path: str,
+    config: Dict,
+    route: Optional[RouteDecision],
+    calls: List[ModelCall],
+    session_id: str,
+    log: List[str],
+    writes: StateWrites,
+    downgrades: Optional[List[str]] = None,
+) -> ConsensusResult:
+    """Run the review; each reduction of the panel below the tier is named in ``downgrades``."""
+    if downgrades is None:
+        downgrades = []
     models = config.get("models", ["gemini", "codex"])
     if mode == "direction":
         max_rounds = 0
@@ -148,40 +522,110 @@ def run_consensus(
     else:
         max_rounds = config.get("debate_rounds", 2)
     cli_timeout = config.get("cli_timeout", 90)
-
-    prompt = build_verification_prompt(mode, context, file_path)
-    log: List[str] = []
+    run_options = run_options_from_config(config)
+
+    if route is not None:
+        models, max_rounds = apply_route(route, models, max_rounds, config)
+        _progress(f"Route: {route.describe()}")
+        log.append(f"⟐ Route: {route.describe()}")
+        if not models:
+            return _skipped_result(log, {}, "Low-risk change. Review skipped by routing.")
+
+    prescreen = prescreen_decision(config, mode, file_path, context)
+    if prescreen is not None:
+        action, probability = prescreen
+        _progress(f"Pre-screen: P(concerns) {probability:.2f} → {action}")
+        if action == "skip":
+            log.append(f"⟐ Pre-screen: P(concerns) {probability:.2f} — skipped")
+            return _skipped_result(log, {}, "Pre-screen predicts approval. Review skipped.")
+        if action == "downgrade" and (len(models) > 1 or max_rounds > 0):
+            models, max_rounds = apply_route(RouteDecision("fast", 0), models, max_rounds, config)
+            log.append(f"⟐ Pre-screen: P(concerns) {probability:.2f} — fast tier")
+            downgrades.append("pre-screen")
+
+    category = ""
+    if config.get("adaptive_panel_enabled", False) and len(models) > 1:
+        category = category_for(mode, file_path)
+        try:
+            with locked_stats(config) as stats:
+                panel = choose_panel(stats, category, models, config)
+        except OSError as e:
+            _progress(f"Agreement stats unavailable: {e}")
+        else:
+            if panel.reason:
+                _progress(f"Panel: {panel.describe()}")
+                log.append(f"⟐ Panel: {panel.describe()}")
+            if len(panel.models) < len(models):
+                max_rounds = 0
+                downgrades.append("adaptive panel")
+            models = panel.models
+
+    budgeted = _budget_panel(config, session_id, models, max_rounds, log)
+    if budgeted is None:
+        return _skipped_result(log, {}, "Token budget exhausted. Review skipped.")
+    if budgeted != (models, max_rounds):
+        downgrades.append("token budget")
+    models, max_rounds = budgeted
+
+    symbols = ""
+    if mode in ("code", "changeset") and config.get("symbol_context_enabled", False):
+        try:
+            symbols = symbol_context_for_change(context, file_path, config)
+        except OSError as e:
+            _progress(f"Symbol index unavailable: {e}")
+        if symbols:
+            attached = sum(1 for line in symbols.split("\n") if line.startswith("- "))
+            log.append(f"⟐ Symbol context: {attached} symbol(s) attached")
+
+    compaction = compact_for_mode(mode, context, config, file_path)
+    if compaction is not None and compaction.compacted:
+        context = compaction.text
+        _progress(f"Context compacted: {compaction.describe()}")
+        log.append(f"⟐ Context: {compaction.describe()}")
+
+    prompt = build_verification_prompt(mode, context, file_path, symbols)
 
     model_list = ", ".join(models)
     _progress(f"Querying {model_list} for review...")
     log.append(f"⟐ Queried: {model_list}")
-    cli_results = run_models_parallel(prompt, models, timeout=cli_timeout)
+    round_options = profiled_options(run_options, config, mode, models, 0)
+    if round_options.profiles:
+        log.append(f"⟐ Profiles: {describe_profiles(round_options.profiles)}")
+        unmapped = describe_unmapped(round_options.profiles)
+        if unmapped:
+            log.append(f"⟐ Profiles: no CLI flag for {unmapped} (ignored)")
+    cli_results = run_models_parallel(prompt, models, timeout=cli_timeout, options=round_options)
+    calls.extend(_model_call(0, r) for r in cli_results)
+    _log_round_usage(log, 0, cli_results)
+    if category:
+        _record_agreement(writes, category, cli_results)
 
     responses = {"claude": f"(Original author of the code at {file_path})"}
     model_status_parts = []
     for r in cli_results:
         if r.success:
             responses[r.model] = r.output
-            model_status_parts.append(f"{r.model} ✓")
-            _progress(f"{r.model} responded")
+            note = " (output truncated)" if r.truncated else ""
+            model_status_parts.append(f"{r.model} ✓{note}")
+            _progress(
+                f"{r.model} responded ({'warm worker, ' if r.warm else ''}"
+                f"peak RSS {r.peak_rss_kb // 1024} MiB, "
+                f"buffered {r.peak_buffer_bytes // 1024} KiB)"
+            )
         else:
             responses[r.model] = f"[Error: {r.error}]"
             model_status_parts.append(f"{r.model} ✗ ({r.error})")
             _progress(f"{r.model} failed: {r.error}")
     log.append(f"⟐ Responses: {', '.join(model_status_parts)}")
+    for r in cli_results:
+        if r.reaped:
+            log.append(f"⟐ Reaped {r.model} process group ({r.reaped})")
 
     successful = [r for r in cli_results if r.success]
     if not successful:
         _progress("No models responded — skipping consensus")
         log.append("⟐ No models responded — skipped")
-        return ConsensusResult(
-            status=ConsensusStatus.SKIPPED,
-            round=0,
-            summary="\n".join(f"  {e}" for e in log)
-            + "\n\nResult: SKIPPED\n  → Consensus unavailable. Proceed with caution.",
-            responses=responses,
-            recommendation="Consensus unavailable. Proceed with caution.",
-        )
+        return _skipped_result(log, responses, "Consensus unavailable. Proceed with caution.")
 
     active_responses = {k: v for k, v in responses.items() if not v.startswith("[Error")}
     status = determine_consensus(active_responses)
@@ -199,16 +643,23 @@ def run_consensus(
         for model in models:
             if model in responses and not responses[model].startswith("[Error"):
                 debate_prompts[model] = build_debate_prompt(context, responses, model)
+        round_options = profiled_options(run_options, config, mode, models, round_num)
         with ThreadPoolExecutor(max_workers=len(debate_prompts)) as executor:
             futures = {}
             for model, dprompt in debate_prompts.items():
                 runner = runners.get(model)
                 if runner:
-                    futures[executor.submit(runner, dprompt, cli_timeout)] = model
+                    futures[executor.submit(runner, dprompt, cli_timeout, round_options)] = model
+            round_results = []
             for future in as_completed(futures):
                 result = future.result()
+                round_results.append(result)
+                calls.append(_model_call(round_num, result))
                 if result.success:
                     responses[result.model] = result.output
+                if result.reaped:
+                    log.append(f"⟐ Reaped {result.model} process group ({result.reaped})")
+        _log_round_usage(log, round_num, round_results)
         active_responses = {k: v for k, v in responses.items() if not v.startswith("[Error")}
         status = determine_consensus(active_responses)
         if status == ConsensusStatus.FULL_CONSENSUS:
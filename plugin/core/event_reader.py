@@ -0,0 +1,149 @@
+"""Hook events located before they are parsed.
+
+A Write event can carry a multi-megabyte ``tool_input.content`` (and the same
+again in ``tool_response``), and most events are rejected from their routing
+fields alone. ``HookEvent`` scans the raw bytes once, jumping over string
+bodies with ``bytes.find``, and records the byte span of every field up to
+``MAX_DEPTH`` levels deep without decoding it. Hooks check ``field``,
+``size`` and ``max_lines`` in ``precheck``. ``load`` parses the whole event
+only when a review will run.
+"""
+import re
+import json
+from typing import Any, Dict, Optional, Tuple
+
+MAX_DEPTH = 2
+_TOKEN = re.compile(rb'["{}\[\]:,]')
+# JSON strings cannot hold a raw newline, so every line break is escaped.
+_NEWLINE = re.compile(rb"\\n|\\u000[aA]")
+
+
+def _string_end(raw: bytes, start: int) -> int:
+    """Index of the quote closing the string whose body starts at ``start``."""
+    pos = start
+    while True:
+        end = raw.find(b'"', pos)
+        if end < 0:
+            raise ValueError("Unterminated string in hook event")
+        i = end
+        while i > start and raw[i - 1] == 0x5C:
+            i -= 1
+        if (end - i) % 2 == 0:
+            return end
+        pos = end + 1
+
+
+def _record(spans, stack, start: int, end: int) -> None:
+    if len(stack) <= MAX_DEPTH and all(frame[0] for frame in stack):
+        spans[tuple(frame[1] for frame in stack)] = (start, end)
+
+
+def scan_spans(raw: bytes) -> Dict[Tuple[str, ...], Tuple[int, int]]:
+    """Map key paths of object fields to the byte span of their raw JSON value."""
+    spans: Dict[Tuple[str, ...], Tuple[int, int]] = {}
+    # Frames: [is_object, current_key, expecting_key, scalar_value_start]
+    stack = []
+    pos = 0
+    while True:
+        match = _TOKEN.search(raw, pos)
+        if match is None:
+            break
+        at = match.start()
+        token = raw[at:at + 1]
+        pos = at + 1
+        frame = stack[-1] if stack else None
+        if token == b'"':
+            end = _string_end(raw, pos)
+            if frame is not None and frame[0] and frame[2]:
+                frame[1] = json.loads(raw[at:end + 1])
+                frame[2] = False
+            elif frame is not None and frame[3] is not None:
+                _record(spans, stack, at, end + 1)
+                frame[3] = None
+            pos = end + 1
+        elif token == b":":
+            if frame is not None:
+                frame[3] = pos
+        elif token in (b"{", b"["):
+            if frame is not None:
+                frame[3] = None
+            stack.append([token == b"{", None, True, None])
+        else:
+            if frame is not None and frame[3] is not None:
+                _record(spans, stack, frame[3], at)
+                frame[3] = None
+            if token == b",":
+                if frame is not None and frame[0]:
+                    frame[2] = True
+            elif not stack:
+                raise ValueError("Unbalanced hook event")
+            else:
+                stack.pop()
+    if stack:
+        raise ValueError("Truncated hook event")
+    return spans
+
+
+class HookEvent:
+    """A hook event whose fields are decoded on demand."""
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self._data: Optional[Any] = None
+        try:
+            self.spans: Optional[Dict[Tuple[str, ...], Tuple[int, int]]] = scan_spans(raw)
+        except ValueError:
+            # Let the full parser report the error (or parse what the scanner could not).
+            self.spans = None
+
+    @classmethod
+    def from_data(cls, data: Any) -> "HookEvent":
+        event = cls.__new__(cls)
+        event.raw, event._data, event.spans = b"", data, None
+        return event
+
+    @property
+    def scanned(self) -> bool:
+        return self.spans is not None
+
+    @property
+    def loaded(self) -> bool:
+        return self._data is not None
+
+    def load(self) -> Any:
+        if self._data is None:
+            self._data = json.loads(self.raw)
+        return self._data
+
+    def _value(self, path: Tuple[str, ...], default: Any) -> Any:
+        value = self.load()
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                return default
+            value = value[key]
+        return value
+
+    def field(self, *path: str, default: Any = None) -> Any:
+        if self.spans is None or self._data is not None:
+            return self._value(path, default)
+        span = self.spans.get(path)
+        if span is None:
+            return default
+        return json.loads(self.raw[span[0]:span[1]])
+
+    def size(self, *path: str) -> int:
+        """Upper bound on the length of a string field, without decoding it."""
+        if self.spans is None or self._data is not None:
+            return len(str(self._value(path, "")))
+        start, end = self.spans.get(path, (0, 0))
+        return max(0, end - start - 2)
+
+    def max_lines(self, *path: str) -> int:
+        """Upper bound on the line count of a string field, without decoding it."""
+        if self.spans is None or self._data is not None:
+            value = str(self._value(path, ""))
+            return value.count("\n") + (1 if value else 0)
+        start, end = self.spans.get(path, (0, 0))
+        if end - start <= 2:
+            return 0
+        return len(_NEWLINE.findall(self.raw, start, end)) + 1
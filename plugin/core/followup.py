@@ -0,0 +1,185 @@
+"""Follow-up verification of open concerns.
+
+When a code review ends with CONCERNS, the listed issues are remembered per
+session and file in state_dir/followups.json. The next change to that file is
+not reviewed from scratch. The panel answers the narrower
+verify-followup.txt prompt instead: is each concern resolved, and did the fix
+introduce a regression in the changed region. A concern is resolved only when
+every model that answered says so. Regressions, the new bullets of answers
+with a CONCERNS verdict, become new open concerns.
+After ``followup_max_attempts`` follow-ups with concerns still open, the
+record is dropped and the next change gets a full review again.
+"""
+import os
+import re
+import time
+from typing import Any, ContextManager, Dict, List
+
+from core.config import get_state_dir
+from core.state import locked_json
+
+FOLLOWUP_FILE = "followups.json"
+FOLLOWUP_VERSION = 1
+MAX_CONCERNS = 8
+MAX_CONCERN_CHARS = 300
+KEEP_SESSION_SECONDS = 7 * 86400
+# "C1: RESOLVED ..." answers, which are not regressions even as "- " lines.
+_STATUS_LINE = re.compile(r"^C\d+\W+(RESOLVED|OPEN)\b", re.IGNORECASE)
+# "- None", "- No regressions found." and similar bullets list nothing.
+_PLACEHOLDER = re.compile(
+    r"^(none|n/?a|nothing|no (new )?(regressions?|issues?|concerns?|problems?)( found| introduced)?)\W*$",
+    re.IGNORECASE,
+)
+
+
+def locked_followups(config: Dict[str, Any]) -> ContextManager[Dict[str, Any]]:
+    path = os.path.join(get_state_dir(config), FOLLOWUP_FILE)
+    return locked_json(path, lambda: {"sessions": {}}, FOLLOWUP_VERSION)
+
+
+def extract_concerns(responses: Dict[str, str], fallback: bool = True) -> List[Dict[str, str]]:
+    """One concern per "- " line of each response (with ``fallback``, the whole response if it has none)."""
+    concerns: List[Dict[str, str]] = []
+    seen = set()
+    for model, text in responses.items():
+        items = [
+            line.strip()[2:].strip() for line in text.splitlines()
+            if line.strip().startswith("- ") and "VERDICT" not in line.upper()
+            and not _STATUS_LINE.match(line.strip()[2:].strip())
+            and not _PLACEHOLDER.match(line.strip()[2:].strip())
+        ]
+        if not items and fallback:
+            items = [" ".join(text.split())]
+        for item in items:
+            item = item[:MAX_CONCERN_CHARS]
+            if item and item.lower() not in seen:
+                seen.add(item.lower())
+                concerns.append({"model": model, "text": item})
+    return concerns[:MAX_CONCERNS]
+
+
+def _numbered(concerns: List[Dict[str, str]], start: int = 1) -> List[Dict[str, str]]:
+    return [{**c, "id": f"C{i}"} for i, c in enumerate(concerns, start)]
+
+
+def open_concerns(config: Dict[str, Any], session_id: str, file_path: str) -> List[Dict[str, str]]:
+    with locked_followups(config) as data:
+        record = data["sessions"].get(session_id or "default", {}).get(os.path.abspath(file_path))
+    return record["concerns"] if record else []
+
+
+def _store(data: Dict[str, Any], session_id: str, path: str, concerns: List[Dict[str, str]],
+           attempts: int) -> None:
+    now = time.time()
+    sessions = data["sessions"]
+    session = sessions.setdefault(session_id or "default", {})
+    if concerns:
+        session[path] = {"concerns": concerns, "attempts": attempts, "updated": now}
+    else:
+        session.pop(path, None)
+    data["sessions"] = {
+        k: v for k, v in sessions.items()
+        if v and now - max(r["updated"] for r in v.values()) < KEEP_SESSION_SECONDS
+    }
+
+
+def remember_concerns(
+    config: Dict[str, Any], session_id: str, file_path: str, concerns: List[Dict[str, str]]
+) -> None:
+    """Store (or with no concerns, clear) the open concerns for a file."""
+    with locked_followups(config) as data:
+        _store(data, session_id, os.path.abspath(file_path), concerns, 0)
+
+
+def review_concerns(concern_responses: Dict[str, str]) -> List[Dict[str, str]]:
+    """Numbered concerns (C1, C2, ...) from the CONCERNS answers of a full review."""
+    return _numbered(extract_concerns(concern_responses))
+
+
+def remember_review(
+    config: Dict[str, Any], session_id: str, file_path: str, concern_responses: Dict[str, str]
+) -> List[Dict[str, str]]:
+    concerns = review_concerns(concern_responses)
+    remember_concerns(config, session_id, file_path, concerns)
+    return concerns
+
+
+def build_followup_prompt(
+    template: str, concerns: List[Dict[str, str]], context: str, file_path: str
+) -> str:
+    listed = "\n".join(f"{c['id']}: {c['text']}" for c in concerns)
+    return (
+        template.replace("{{concerns}}", listed)
+        .replace("{{context}}", context)
+        .replace("{{file_path}}", file_path)
+    )
+
+
+def _status(concern_id: str, text: str) -> str:
+    match = re.search(
+        rf"^\W*{concern_id}\W+(RESOLVED|OPEN)\b", text, re.IGNORECASE | re.MULTILINE
+    )
+    return match.group(1).upper() if match else "UNKNOWN"
+
+
+def resolve_concerns(
+    concerns: List[Dict[str, str]], responses: Dict[str, str]
+) -> Dict[str, str]:
+    """Status per concern id: RESOLVED only if every model says so, OPEN if any says OPEN."""
+    statuses = {}
+    for concern in concerns:
+        votes = {_status(concern["id"], text) for text in responses.values()}
+        if votes == {"RESOLVED"}:
+            statuses[concern["id"]] = "RESOLVED"
+        elif "OPEN" in votes:
+            statuses[concern["id"]] = "OPEN"
+        else:
+            statuses[concern["id"]] = "UNKNOWN"
+    return statuses
+
+
+def followup_outcome(
+    concerns: List[Dict[str, str]], statuses: Dict[str, str], responses: Dict[str, str]
+) -> List[Dict[str, str]]:
+    """The concerns still open after a follow-up, regressions numbered after the known ones.
+
+    Regressions come only from answers with a CONCERNS verdict.
+    """
+    from core.consensus_engine import _extract_verdict
+
+    remaining = [c for c in concerns if statuses.get(c["id"]) != "RESOLVED"]
+    known = {c["text"].lower() for c in concerns}
+    concerned = {m: t for m, t in responses.items() if _extract_verdict(t) == "CONCERNS"}
+    regressions = [
+        c for c in extract_concerns(concerned, fallback=False) if c["text"].lower() not in known
+    ]
+    next_id = max((int(c["id"][1:]) for c in concerns), default=0) + 1
+    return (remaining + _numbered(regressions, next_id))[:MAX_CONCERNS]
+
+
+def store_followup(
+    config: Dict[str, Any], session_id: str, file_path: str, remaining: List[Dict[str, str]]
+) -> None:
+    """Count a follow-up attempt and keep ``remaining`` open, until followup_max_attempts."""
+    path = os.path.abspath(file_path)
+    with locked_followups(config) as data:
+        record = data["sessions"].get(session_id or "default", {}).get(path, {})
+        attempts = record.get("attempts", 0) + 1
+        if attempts >= config.get("followup_max_attempts", 3):
+            _store(data, session_id, path, [], 0)
+        else:
+            _store(data, session_id, path, remaining, attempts)
+
+
+def record_followup(
+    config: Dict[str, Any],
+    session_id: str,
+    file_path: str,
+    concerns: List[Dict[str, str]],
+    statuses: Dict[str, str],
+    responses: Dict[str, str],
+) -> List[Dict[str, str]]:
+    """Update the record after a follow-up; returns the concerns still open."""
+    remaining = followup_outcome(concerns, statuses, responses)
+    store_followup(config, session_id, file_path, remaining)
+    return remaining
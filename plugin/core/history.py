@@ -0,0 +1,273 @@
+"""Local review history (SQLite, WAL mode) written by run_consensus."""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from core.config import get_state_dir
+
+HISTORY_FILE = "history.db"
+SCHEMA_VERSION = 3
+# Prune at most once per this many inserted reviews.
+PRUNE_EVERY = 100
+
+# Pre-screen features per review (core/prescreen.py), JSON.
+FEATURES_TABLE = """CREATE TABLE IF NOT EXISTS review_features (
+    review_id INTEGER PRIMARY KEY REFERENCES reviews(id) ON DELETE CASCADE,
+    features TEXT NOT NULL
+)"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    session_id TEXT NOT NULL DEFAULT '',
+    content_hash TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    path TEXT NOT NULL DEFAULT '',
+    tier TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    rounds INTEGER NOT NULL,
+    duration_ms INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS model_calls (
+    review_id INTEGER NOT NULL REFERENCES reviews(id) ON DELETE CASCADE,
+    round INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    verdict TEXT NOT NULL DEFAULT '',
+    latency_ms INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    cached_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    error TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS reviews_ts ON reviews(ts);
+CREATE INDEX IF NOT EXISTS reviews_mode_ts ON reviews(mode, ts);
+CREATE INDEX IF NOT EXISTS reviews_path ON reviews(path);
+CREATE INDEX IF NOT EXISTS reviews_content_hash ON reviews(content_hash);
+CREATE INDEX IF NOT EXISTS model_calls_review ON model_calls(review_id);
+CREATE INDEX IF NOT EXISTS model_calls_model_latency ON model_calls(model, latency_ms);
+""" + FEATURES_TABLE + ";\n"
+# Applied in order to databases created by older versions.
+MIGRATIONS = {
+    2: "ALTER TABLE model_calls ADD COLUMN cached_tokens INTEGER NOT NULL DEFAULT 0",
+    3: FEATURES_TABLE,
+}
+
+
+@dataclass
+class ModelCall:
+    round: int
+    model: str
+    success: bool
+    verdict: str = ""
+    latency_ms: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    error: str = ""
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8", errors="replace")).hexdigest()[:16]
+
+
+def history_path(config: Dict[str, Any]) -> str:
+    return os.path.join(get_state_dir(config), HISTORY_FILE)
+
+
+def connect(config: Dict[str, Any]) -> sqlite3.Connection:
+    conn = sqlite3.connect(history_path(config), timeout=5)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < SCHEMA_VERSION:
+        if version == 0:
+            conn.executescript(SCHEMA)
+        else:
+            for target in range(version + 1, SCHEMA_VERSION + 1):
+                conn.execute(MIGRATIONS[target])
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    return conn
+
+
+def record_review(
+    config: Dict[str, Any],
+    *,
+    content: str,
+    mode: str,
+    path: str,
+    status: str,
+    rounds: int,
+    duration_ms: int,
+    calls: List[ModelCall],
+    tier: str = "",
+    session_id: str = "",
+    features: Optional[Dict[str, float]] = None,
+) -> int:
+    conn = connect(config)
+    try:
+        with conn:
+            review_id = conn.execute(
+                "INSERT INTO reviews (ts, session_id, content_hash, mode, path, tier, status, "
+                "rounds, duration_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), session_id, content_hash(content), mode, path, tier, status,
+                 rounds, duration_ms),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO model_calls (review_id, round, model, success, verdict, latency_ms, "
+                "input_tokens, cached_tokens, output_tokens, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (review_id, c.round, c.model, int(c.success), c.verdict, c.latency_ms,
+                     c.input_tokens, c.cached_tokens, c.output_tokens, c.error[:500])
+                    for c in calls
+                ],
+            )
+            if features:
+                conn.execute(
+                    "INSERT INTO review_features (review_id, features) VALUES (?, ?)",
+                    (review_id, json.dumps(features)),
+                )
+        if review_id % PRUNE_EVERY == 0:
+            prune(conn, config)
+        return review_id
+    finally:
+        conn.close()
+
+
+def prune(conn: sqlite3.Connection, config: Dict[str, Any]) -> int:
+    """Apply history_retention_days and history_max_reviews. Returns reviews deleted."""
+    deleted = 0
+    with conn:
+        days = config.get("history_retention_days", 30)
+        if days > 0:
+            cutoff = time.time() - days * 86400
+            deleted += conn.execute("DELETE FROM reviews WHERE ts < ?", (cutoff,)).rowcount
+        max_reviews = config.get("history_max_reviews", 50000)
+        if max_reviews > 0:
+            deleted += conn.execute(
+                "DELETE FROM reviews WHERE id <= "
+                "(SELECT id FROM reviews ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (max_reviews,),
+            ).rowcount
+    if deleted:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return deleted
+
+
+def compact(config: Dict[str, Any]) -> int:
+    conn = connect(config)
+    try:
+        deleted = prune(conn, config)
+        conn.execute("VACUUM")
+        return deleted
+    finally:
+        conn.close()
+
+
+def _since(days: Optional[float]) -> float:
+    return time.time() - days * 86400 if days else 0.0
+
+
+def _percentile(conn: sqlite3.Connection, model: str, since: float, count: int, q: float) -> int:
+    offset = min(count - 1, int(q * count))
+    row = conn.execute(
+        "SELECT c.latency_ms FROM model_calls c JOIN reviews r ON r.id = c.review_id "
+        "WHERE c.model = ? AND c.success = 1 AND r.ts >= ? "
+        "ORDER BY c.latency_ms LIMIT 1 OFFSET ?",
+        (model, since, offset),
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def latency_by_model(conn: sqlite3.Connection, days: Optional[float] = None) -> List[Dict[str, Any]]:
+    since = _since(days)
+    rows = conn.execute(
+        "SELECT c.model, COUNT(*) AS calls, SUM(c.success) AS ok, "
+        "CAST(AVG(CASE WHEN c.success THEN c.latency_ms END) AS INTEGER) AS mean_ms, "
+        "SUM(c.input_tokens) AS input_tokens, SUM(c.output_tokens) AS output_tokens "
+        "FROM model_calls c JOIN reviews r ON r.id = c.review_id WHERE r.ts >= ? "
+        "GROUP BY c.model ORDER BY c.model",
+        (since,),
+    ).fetchall()
+    stats = []
+    for row in rows:
+        ok = row["ok"] or 0
+        stats.append({
+            "model": row["model"],
+            "calls": row["calls"],
+            "failures": row["calls"] - ok,
+            "mean_ms": row["mean_ms"] or 0,
+            "p50_ms": _percentile(conn, row["model"], since, ok, 0.50) if ok else 0,
+            "p95_ms": _percentile(conn, row["model"], since, ok, 0.95) if ok else 0,
+            "input_tokens": row["input_tokens"] or 0,
+            "output_tokens": row["output_tokens"] or 0,
+        })
+    return stats
+
+
+def debate_rate_by_mode(conn: sqlite3.Connection, days: Optional[float] = None) -> List[Dict[str, Any]]:
+    rows = conn.execute(
+        "SELECT mode, COUNT(*) AS reviews, SUM(rounds > 0) AS debated, "
+        "SUM(status = 'FULL_CONSENSUS') AS consensus "
+        "FROM reviews WHERE ts >= ? GROUP BY mode ORDER BY reviews DESC",
+        (_since(days),),
+    ).fetchall()
+    return [
+        {
+            "mode": row["mode"],
+            "reviews": row["reviews"],
+            "debated": row["debated"],
+            "debate_rate": round(row["debated"] / row["reviews"], 3),
+            "consensus": row["consensus"],
+        }
+        for row in rows
+    ]
+
+
+def top_files(
+    conn: sqlite3.Connection, limit: int = 10, days: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    rows = conn.execute(
+        "SELECT path, COUNT(*) AS reviews, SUM(status != 'FULL_CONSENSUS') AS contested, "
+        "MAX(ts) AS last_ts FROM reviews WHERE path != '' AND ts >= ? "
+        "GROUP BY path ORDER BY reviews DESC, last_ts DESC LIMIT ?",
+        (_since(days), limit),
+    ).fetchall()
+    return [
+        {"path": row["path"], "reviews": row["reviews"], "contested": row["contested"]}
+        for row in rows
+    ]
+
+
+def labeled_features(conn: sqlite3.Connection, days: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Reviews with features, oldest first; label 1 if any round-0 verdict was CONCERNS."""
+    rows = conn.execute(
+        "SELECT r.ts, f.features, MAX(c.verdict = 'CONCERNS') AS concerns "
+        "FROM reviews r JOIN review_features f ON f.review_id = r.id "
+        "JOIN model_calls c ON c.review_id = r.id AND c.round = 0 AND c.success = 1 "
+        "WHERE r.ts >= ? GROUP BY r.id ORDER BY r.ts, r.id",
+        (_since(days),),
+    ).fetchall()
+    return [
+        {"ts": row["ts"], "features": json.loads(row["features"]), "label": row["concerns"]}
+        for row in rows
+    ]
+
+
+def recent_reviews(conn: sqlite3.Connection, limit: int = 20) -> List[Dict[str, Any]]:
+    rows = conn.execute(
+        "SELECT r.id, r.ts, r.mode, r.path, r.tier, r.status, r.rounds, r.duration_ms, "
+        "GROUP_CONCAT(c.model || ':' || c.verdict, ' ') AS verdicts "
+        "FROM reviews r LEFT JOIN model_calls c ON c.review_id = r.id "
+        "AND c.round = r.rounds GROUP BY r.id ORDER BY r.id DESC LIMIT ?",
+        (limit,),
+    ).fetchall()
+    return [dict(row) for row in rows]
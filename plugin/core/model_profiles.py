@@ -0,0 +1,87 @@
+"""Per-mode, per-model and per-round CLI settings (``model_profiles``).
+
+Each entry is ``"<selector>: key=value ..."``, e.g.
+``"direction/codex: model=gpt-5-mini effort=low tools=off"``. The selector is
+``mode[/model][@round]``: ``*`` (or an omitted part) matches anything, and the
+round is a number or ``debate`` for every round after 0. All matching entries
+apply in order, so a later entry overrides an earlier one. cli_runner maps the
+settings to each CLI's flags (ModelSpec.profile_flags). Neither CLI has a flag
+that disables tools: ``tools=off`` only implies ``isolated=true`` and
+``sandbox=read-only``, and ``describe_unmapped`` reports it with any other
+setting a CLI ignores.
+"""
+import shlex
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List
+
+from core.cli_runner import OFF_VALUES, RunOptions, unmapped_settings
+
+SETTINGS = ("model", "effort", "max_output", "sandbox", "isolated", "tools", "args")
+
+
+@dataclass
+class ProfileEntry:
+    mode: str
+    model: str
+    round: str
+    settings: Dict[str, str]
+
+
+def parse_profiles(entries: List[str]) -> List[ProfileEntry]:
+    parsed = []
+    for entry in entries or []:
+        selector, sep, rest = str(entry).partition(":")
+        if not sep:
+            continue
+        selector, _, round_spec = selector.strip().partition("@")
+        mode, _, model = selector.partition("/")
+        try:
+            tokens = shlex.split(rest)
+        except ValueError:
+            continue
+        settings = {}
+        for token in tokens:
+            key, sep, value = token.partition("=")
+            if sep and key in SETTINGS:
+                settings[key] = value
+        parsed.append(ProfileEntry(mode or "*", model or "*", round_spec.strip() or "*", settings))
+    return parsed
+
+
+def _round_matches(spec: str, round_num: int) -> bool:
+    return spec == "*" or spec == str(round_num) or (spec == "debate" and round_num > 0)
+
+
+def resolve_profile(config: Dict[str, Any], mode: str, model: str, round_num: int) -> Dict[str, str]:
+    settings: Dict[str, str] = {}
+    for entry in parse_profiles(config.get("model_profiles", [])):
+        if entry.mode in ("*", mode) and entry.model in ("*", model) and _round_matches(entry.round, round_num):
+            settings.update(entry.settings)
+    # No tools: nothing to read from the hook's cwd and nothing to change.
+    if settings.get("tools", "").lower() in OFF_VALUES:
+        settings.setdefault("isolated", "true")
+        settings.setdefault("sandbox", "read-only")
+    return settings
+
+
+def profiled_options(
+    options: RunOptions, config: Dict[str, Any], mode: str, models: List[str], round_num: int
+) -> RunOptions:
+    profiles = {m: resolve_profile(config, mode, m, round_num) for m in models}
+    return replace(options, profiles={m: p for m, p in profiles.items() if p})
+
+
+def describe_profiles(profiles: Dict[str, Dict[str, str]]) -> str:
+    return "; ".join(
+        f"{model} " + " ".join(f"{k}={v}" for k, v in settings.items())
+        for model, settings in sorted(profiles.items())
+    )
+
+
+def describe_unmapped(profiles: Dict[str, Dict[str, str]]) -> str:
+    """Settings with no flag on the model's CLI, e.g. ``gemini effort, tools``; empty if none."""
+    return "; ".join(
+        f"{model} {', '.join(keys)}"
+        for model, keys in sorted((m, unmapped_settings(m, p)) for m, p in profiles.items())
+        if keys
+    )
@@ -0,0 +1,194 @@
+"""Predictive pre-screen: estimate P(CONCERNS) before running the panel.
+
+A logistic regression over sparse change features (size, mode, file type,
+top-level directory, sensitive APIs, keywords) is trained in pure Python from
+the review history. Features are recorded for every review when
+``history_enabled`` is on. Label 1 means a model raised concerns in round 0.
+Training holds out the most recent reviews and stores held-out precision,
+recall and the miss rate among would-be-skipped reviews in
+state_dir/prescreen.json. The engine only uses a model that carries these
+metrics.
+"""
+import os
+import re
+import json
+import math
+import time
+import random
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.config import get_state_dir
+
+MODEL_FILE = "prescreen.json"
+MODEL_VERSION = 1
+KEYWORDS = (
+    "todo", "fixme", "hack", "except", "catch", "raise", "throw", "lock", "thread", "async",
+    "await", "sql", "select", "delete", "auth", "token", "random", "sleep", "retry", "global",
+    "unsafe", "cast", "float", "regex", "open(", "http",
+)
+_WORD = re.compile(r"[A-Za-z_]+\(?")
+
+
+def extract_features(
+    mode: str, file_path: str, content: str, config: Dict[str, Any]
+) -> Dict[str, float]:
+    lines = content.count("\n") + 1
+    features = {
+        "bias_lines_log": math.log1p(lines),
+        "bias_chars_log": math.log1p(len(content)),
+        f"mode={mode}": 1.0,
+    }
+    if file_path:
+        first_path = file_path.split(",")[0].strip()
+        ext = os.path.splitext(first_path)[1].lower() or "none"
+        features[f"ext={ext}"] = 1.0
+        parts = [p for p in first_path.replace(os.sep, "/").split("/") if p and p != "."]
+        if len(parts) > 1:
+            features[f"dir={parts[0]}"] = 1.0
+        if re.search(r"(^|/)(tests?|spec)(/|_)", first_path):
+            features["path=test"] = 1.0
+    lowered = content.lower()
+    for api in config.get("risk_sensitive_apis", []):
+        if api and api in content:
+            features[f"api={api}"] = 1.0
+    words = set(_WORD.findall(lowered))
+    for keyword in KEYWORDS:
+        if keyword in words or (keyword.endswith("(") and keyword in lowered):
+            features[f"kw={keyword}"] = 1.0
+    if content.startswith("diff --git") or "\n@@ " in content:
+        features["diff"] = 1.0
+    return features
+
+
+@dataclass
+class PrescreenModel:
+    weights: Dict[str, float]
+    bias: float
+    trained_at: float = 0.0
+    samples: int = 0
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+    def predict(self, features: Dict[str, float]) -> float:
+        z = self.bias + sum(self.weights.get(k, 0.0) * v for k, v in features.items())
+        return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+
+
+def train(
+    rows: List[Dict[str, Any]], epochs: int = 200, lr: float = 0.1, l2: float = 1e-3, seed: int = 0
+) -> PrescreenModel:
+    """Full-batch-shuffled SGD on logistic loss with L2 regularization."""
+    weights: Dict[str, float] = {}
+    positives = sum(r["label"] for r in rows)
+    prior = (positives + 1) / (len(rows) + 2)
+    bias = math.log(prior / (1 - prior))
+    order = list(range(len(rows)))
+    rng = random.Random(seed)
+    model = PrescreenModel(weights, bias)
+    for epoch in range(epochs):
+        rng.shuffle(order)
+        step = lr / (1 + epoch * 0.05)
+        for i in order:
+            features, label = rows[i]["features"], rows[i]["label"]
+            error = model.predict(features) - label
+            model.bias -= step * error
+            for name, value in features.items():
+                w = weights.get(name, 0.0)
+                weights[name] = w - step * (error * value + l2 * w)
+    model.weights = {k: round(v, 6) for k, v in weights.items() if abs(v) > 1e-6}
+    model.samples = len(rows)
+    model.trained_at = time.time()
+    return model
+
+
+def evaluate(model: PrescreenModel, rows: List[Dict[str, Any]], threshold: float) -> Dict[str, Any]:
+    """Metrics for the CONCERNS class; "skip" means predicted probability below threshold."""
+    tp = fp = fn = tn = 0
+    for row in rows:
+        flagged = model.predict(row["features"]) >= threshold
+        if flagged and row["label"]:
+            tp += 1
+        elif flagged:
+            fp += 1
+        elif row["label"]:
+            fn += 1
+        else:
+            tn += 1
+    skipped = fn + tn
+    return {
+        "threshold": threshold,
+        "holdout": len(rows),
+        "precision": round(tp / (tp + fp), 3) if tp + fp else 0.0,
+        "recall": round(tp / (tp + fn), 3) if tp + fn else 0.0,
+        "skip_rate": round(skipped / len(rows), 3) if rows else 0.0,
+        "missed_concern_rate": round(fn / skipped, 3) if skipped else 0.0,
+    }
+
+
+def split_holdout(rows: List[Dict[str, Any]], fraction: float):
+    """The most recent ``fraction`` of rows (time-ordered) is held out."""
+    cut = len(rows) - max(1, int(len(rows) * fraction))
+    return rows[:cut], rows[cut:]
+
+
+def model_path(config: Dict[str, Any]) -> str:
+    return os.path.join(get_state_dir(config), MODEL_FILE)
+
+
+def save_model(config: Dict[str, Any], model: PrescreenModel) -> None:
+    path = model_path(config)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": MODEL_VERSION, **asdict(model)}, f)
+    os.replace(tmp_path, path)
+
+
+def load_model(config: Dict[str, Any]) -> Optional[PrescreenModel]:
+    try:
+        with open(model_path(config), "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.pop("version", None) != MODEL_VERSION:
+        return None
+    return PrescreenModel(**data)
+
+
+def train_from_history(
+    config: Dict[str, Any], holdout: float = 0.2, days: Optional[float] = None, epochs: int = 200
+) -> PrescreenModel:
+    """Train on older reviews, evaluate on the most recent ones, retrain on all and save."""
+    from core import history
+
+    conn = history.connect(config)
+    try:
+        rows = history.labeled_features(conn, days)
+    finally:
+        conn.close()
+    minimum = config.get("prescreen_min_samples", 200)
+    if len(rows) < minimum:
+        raise ValueError(f"need at least {minimum} reviews with features, have {len(rows)}")
+    fit_rows, test_rows = split_holdout(rows, holdout)
+    threshold = config.get("prescreen_skip_below", 0.05)
+    metrics = evaluate(train(fit_rows, epochs), test_rows, threshold)
+    model = train(rows, epochs)
+    model.metrics = {**metrics, "positives": sum(r["label"] for r in rows)}
+    save_model(config, model)
+    return model
+
+
+def prescreen_decision(
+    config: Dict[str, Any], mode: str, file_path: str, content: str
+) -> Optional[Tuple[str, float]]:
+    """Return ("skip" | "downgrade" | "review", probability), or None without a usable model."""
+    if not config.get("prescreen_enabled", False):
+        return None
+    model = load_model(config)
+    if model is None or not model.metrics.get("holdout"):
+        return None
+    probability = model.predict(extract_features(mode, file_path, content, config))
+    if probability < config.get("prescreen_skip_below", 0.05):
+        return "skip", probability
+    if probability < config.get("prescreen_downgrade_below", 0.15):
+        return "downgrade", probability
+    return "review", probability
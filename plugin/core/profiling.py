@@ -0,0 +1,129 @@
+"""Per-invocation hook profiling (cProfile + tracemalloc).
+
+Enabled with the ``CONCENSUS_PROFILE`` environment variable: ``1`` writes to
+``profile_dir`` (default state_dir/profiles), any other value is used as the
+directory. Each invocation writes ``<stamp>-<event>.prof`` and a matching
+``.alloc`` tracemalloc snapshot; the oldest captures are removed once
+``profile_max_files`` or ``profile_max_mb`` is exceeded.
+"""
+import os
+import sys
+import time
+import pstats
+import cProfile
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import get_state_dir, load_config
+
+PROFILE_ENV = "CONCENSUS_PROFILE"
+TRACE_FRAMES = 10
+
+
+def profile_dir(setting: str, config: Dict[str, Any]) -> str:
+    if setting and setting != "1":
+        os.makedirs(setting, exist_ok=True)
+        return setting
+    if config.get("profile_dir"):
+        os.makedirs(config["profile_dir"], exist_ok=True)
+        return config["profile_dir"]
+    return get_state_dir(config, "profiles")
+
+
+def profiled(func: Callable[[], Optional[str]], setting: str) -> None:
+    """Run ``func`` (returning the hook event name) under cProfile and tracemalloc."""
+    tracemalloc.start(TRACE_FRAMES)
+    profiler = cProfile.Profile()
+    event = None
+    profiler.enable()
+    try:
+        event = func()
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        tracemalloc.stop()
+        try:
+            config = load_config()
+            directory = profile_dir(setting, config)
+            base = os.path.join(
+                directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{event or 'unknown'}"
+            )
+            profiler.dump_stats(base + ".prof")
+            snapshot.dump(base + ".alloc")
+            rotate(directory, config.get("profile_max_files", 200), config.get("profile_max_mb", 50))
+        except OSError as e:
+            print(f"[concensus] profile not written: {e}", file=sys.stderr)
+
+
+def _captures(directory: str) -> List[str]:
+    """Capture base paths (without extension), oldest first."""
+    bases = {
+        os.path.join(directory, name[: -len(".prof")])
+        for name in os.listdir(directory)
+        if name.endswith(".prof")
+    }
+    return sorted(bases, key=lambda b: os.path.getmtime(b + ".prof"))
+
+
+def _size(base: str) -> int:
+    return sum(os.path.getsize(base + ext) for ext in (".prof", ".alloc") if os.path.exists(base + ext))
+
+
+def rotate(directory: str, max_files: int, max_mb: float) -> int:
+    """Remove the oldest captures beyond the caps. Returns captures removed."""
+    captures = _captures(directory)
+    total = sum(_size(b) for b in captures)
+    removed = 0
+    while captures and (
+        (max_files > 0 and len(captures) > max_files)
+        or (max_mb > 0 and total > max_mb * 1024 * 1024)
+    ):
+        base = captures.pop(0)
+        total -= _size(base)
+        for ext in (".prof", ".alloc"):
+            if os.path.exists(base + ext):
+                os.remove(base + ext)
+        removed += 1
+    return removed
+
+
+def _short_path(path: str) -> str:
+    parts = path.replace(os.sep, "/").split("/")
+    return "/".join(parts[-2:])
+
+
+def report(directory: str, limit: int = 20, event: str = "") -> Dict[str, Any]:
+    """Aggregate top cumulative functions and allocation sites over all captures."""
+    captures = [b for b in _captures(directory) if not event or b.endswith(f"-{event}")]
+    if not captures:
+        return {"invocations": 0, "functions": [], "allocations": []}
+    n = len(captures)
+
+    stats = pstats.Stats(*(b + ".prof" for b in captures))
+    entries = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:limit]
+    functions = [
+        {
+            "function": f"{_short_path(filename)}:{line}({name})",
+            "calls": nc,
+            "tottime_ms": round(tt * 1000 / n, 2),
+            "cumtime_ms": round(ct * 1000 / n, 2),
+        }
+        for (filename, line, name), (_, nc, tt, ct, _) in entries
+    ]
+
+    sites: Dict[str, List[int]] = {}
+    for base in captures:
+        if not os.path.exists(base + ".alloc"):
+            continue
+        for stat in tracemalloc.Snapshot.load(base + ".alloc").statistics("lineno"):
+            frame = stat.traceback[0]
+            site = sites.setdefault(f"{_short_path(frame.filename)}:{frame.lineno}", [0, 0])
+            site[0] += stat.size
+            site[1] += stat.count
+    allocations = [
+        {"site": site, "kib": round(size / 1024 / n, 1), "blocks": count // n}
+        for site, (size, count) in sorted(sites.items(), key=lambda kv: kv[1][0], reverse=True)[:limit]
+    ]
+    return {"invocations": n, "functions": functions, "allocations": allocations}
@@ -0,0 +1,225 @@
+"""Review result cache: a local tier plus an optional shared HTTP tier.
+
+Entries are keyed by ``review_key``: a hash of the review context and mode,
+the file's base name, the rendered templates, the model list with each CLI's
+version (the ``review_cache_model_versions`` label, else what ``<cli>
+--version`` reports, remembered per installed executable), the route tier, the debate
+settings and the prompt-shaping settings (model profiles, symbol context,
+prompt token budgets). A change to any of these produces a new key, so a
+stale verdict is never served. Runs that were downgraded (pre-screen, token
+budget, a smaller adaptive panel) are not stored; see consensus_engine.
+
+Remote protocol (see core/cache_server.py)::
+
+    GET {url}/v1/reviews/{key}   200 + JSON entry, or 404
+    PUT {url}/v1/reviews/{key}   JSON entry; X-Cache-TTL: seconds
+
+Remote calls use ``review_cache_timeout`` and any failure falls back to the
+local tier; after a failure the remote is not tried again for
+``REMOTE_BACKOFF`` seconds in this process.
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import subprocess
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.config import get_state_dir, parse_mapping
+from core.state import locked_json
+
+CACHE_FORMAT = 1
+TEMPLATES_DIR = os.path.join(
+    os.environ.get("CLAUDE_PLUGIN_ROOT", os.path.dirname(os.path.dirname(__file__))), "templates"
+)
+REMOTE_BACKOFF = 60.0
+VERSION_TIMEOUT = 10
+VERSIONS_FILE = "cli_versions.json"
+VERSIONS_FORMAT = 1
+
+_remote_down_until = 0.0
+# "realpath:mtime_ns:size" -> reported version, for the life of the process.
+_reported_versions: Dict[str, str] = {}
+
+
+def _probe_version(path: str) -> str:
+    try:
+        proc = subprocess.run(
+            [path, "--version"], stdin=subprocess.DEVNULL, capture_output=True,
+            timeout=VERSION_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    if proc.returncode != 0:
+        return ""
+    return " ".join(proc.stdout.decode("utf-8", errors="replace").split())
+
+
+def _stamp(path: str) -> str:
+    stat = os.stat(path)
+    return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _reported_versions_for(paths: List[str], config: Dict[str, Any]) -> Dict[str, str]:
+    """Reported version per executable path.
+
+    Answers are kept in state_dir/cli_versions.json under the executable's
+    path, mtime and size, so hooks only run ``--version`` after an install
+    changes the file; misses are probed in parallel.
+    """
+    stamps = {path: _stamp(path) for path in paths}
+    missing = [p for p in paths if stamps[p] not in _reported_versions]
+    if missing:
+        state = os.path.join(get_state_dir(config), VERSIONS_FILE)
+        with locked_json(state, lambda: {"versions": {}}, VERSIONS_FORMAT) as data:
+            known = dict(data["versions"])
+        for path in missing:
+            if known.get(path, {}).get("stamp") == stamps[path]:
+                _reported_versions[stamps[path]] = known[path]["version"]
+        missing = [p for p in missing if stamps[p] not in _reported_versions]
+    if missing:
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            probed = dict(zip(missing, executor.map(_probe_version, missing)))
+        with locked_json(state, lambda: {"versions": {}}, VERSIONS_FORMAT) as data:
+            for path, version in probed.items():
+                # A failed probe is retried by the next process, not remembered.
+                if version:
+                    data["versions"][path] = {"stamp": stamps[path], "version": version}
+        for path, version in probed.items():
+            # Without an answer the key still changes when the CLI moves.
+            _reported_versions[stamps[path]] = version or f"unknown:{path}"
+    return {path: _reported_versions[stamps[path]] for path in paths}
+
+
+def _cli_versions(models: List[str], config: Dict[str, Any]) -> List[str]:
+    configured = dict(parse_mapping(config.get("review_cache_model_versions", [])))
+    paths = {}
+    for model in models:
+        found = shutil.which(model) if not configured.get(model) else None
+        if found:
+            paths[model] = os.path.realpath(found)
+    reported = _reported_versions_for(sorted(set(paths.values())), config)
+    return [
+        f"{m}={configured[m]}" if configured.get(m)
+        else f"{m}@{reported[paths[m]] if m in paths else 'missing'}"
+        for m in models
+    ]
+
+
+def _template_digest(mode: str) -> str:
+    from core.consensus_engine import TEMPLATE_MAP
+
+    digest = hashlib.sha256()
+    for name in (TEMPLATE_MAP.get(mode, "verify-design.txt"), "debate-round.txt"):
+        with open(os.path.join(TEMPLATES_DIR, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def review_key(
+    mode: str, context: str, file_path: str, config: Dict[str, Any], tier: str = ""
+) -> str:
+    models = config.get("models", ["gemini", "codex"])
+    parts = [
+        f"format={CACHE_FORMAT}",
+        f"mode={mode}",
+        f"file={os.path.basename(file_path)}",
+        f"template={_template_digest(mode)}",
+        *_cli_versions(models, config),
+        f"tier={tier}",
+        f"profiles={config.get('model_profiles', [])}",
+        f"symbols={config.get('symbol_context_enabled', False)}/{config.get('symbol_context_max_symbols', 15)}",
+        f"prompt_budgets={config.get('prompt_token_budgets', [])}",
+        f"rounds={config.get('debate_rounds', 2)}/{config.get('stop_debate_rounds', 1)}",
+        f"content={hashlib.sha256(context.encode('utf-8', errors='replace')).hexdigest()}",
+    ]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _local_path(config: Dict[str, Any], key: str) -> str:
+    return os.path.join(get_state_dir(config, "review_cache", key[:2]), f"{key}.json")
+
+
+def _local_get(config: Dict[str, Any], key: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_local_path(config, key), "r") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("expires", 0) < time.time():
+        return None
+    return entry
+
+
+def _local_put(config: Dict[str, Any], key: str, entry: Dict[str, Any]) -> None:
+    path = _local_path(config, key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
+
+
+def _remote_request(
+    config: Dict[str, Any], method: str, key: str, body: Optional[bytes] = None, ttl: int = 0
+) -> Optional[bytes]:
+    """Returns the body of a 200 response; None on 404 or any failure."""
+    global _remote_down_until
+    url = config.get("review_cache_url", "")
+    if not url or time.monotonic() < _remote_down_until:
+        return None
+    request = urllib.request.Request(f"{url.rstrip('/')}/v1/reviews/{key}", data=body, method=method)
+    request.add_header("Content-Type", "application/json")
+    if ttl:
+        request.add_header("X-Cache-TTL", str(ttl))
+    if config.get("review_cache_token"):
+        request.add_header("Authorization", f"Bearer {config['review_cache_token']}")
+    try:
+        with urllib.request.urlopen(request, timeout=config.get("review_cache_timeout", 0.5)) as resp:
+            return resp.read()
+    except urllib.error.HTTPError as e:
+        if e.code != 404:
+            _remote_down_until = time.monotonic() + REMOTE_BACKOFF
+        return None
+    except (OSError, ValueError):
+        _remote_down_until = time.monotonic() + REMOTE_BACKOFF
+        return None
+
+
+def lookup(config: Dict[str, Any], key: str) -> Optional[Tuple[Dict[str, Any], str]]:
+    """Return (entry, "local" | "remote") or None."""
+    entry = _local_get(config, key)
+    if entry is not None:
+        return entry, "local"
+    body = _remote_request(config, "GET", key)
+    if body is None:
+        return None
+    try:
+        entry = json.loads(body)
+    except ValueError:
+        return None
+    if entry.get("format") != CACHE_FORMAT or entry.get("expires", 0) < time.time():
+        return None
+    try:
+        _local_put(config, key, entry)
+    except OSError:
+        pass
+    return entry, "remote"
+
+
+def store(config: Dict[str, Any], key: str, result: Dict[str, Any]) -> None:
+    ttl = config.get("review_cache_ttl", 86400)
+    now = time.time()
+    entry = {"format": CACHE_FORMAT, "created": now, "expires": now + ttl, **result}
+    _local_put(config, key, entry)
+    _remote_request(config, "PUT", key, json.dumps(entry).encode("utf-8"), ttl)
+
+
+def clear_local(config: Dict[str, Any]) -> int:
+    directory = get_state_dir(config, "review_cache")
+    count = sum(len(files) for _, _, files in os.walk(directory))
+    shutil.rmtree(directory, ignore_errors=True)
+    return count
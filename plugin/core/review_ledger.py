@@ -0,0 +1,164 @@
+"""Hunk-level review ledger for whole-file writes.
+
+A file is split into top-level regions: a region starts at an unindented line
+that follows a blank line, so definitions, import blocks and top-level
+statements each become one region. The ledger (state_dir/review_ledger.json)
+keeps, per file, the content hashes of regions that passed a review with every
+model approving. On the next Write of that file only regions whose hash is not
+approved are sent for review; approvals for untouched regions carry forward.
+
+The whole ledger is discarded when its fingerprint changes: the review
+templates, the model list, or any of ``review_ledger_dependency_files``.
+"""
+import os
+import time
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, ContextManager, Dict, List, Optional
+
+from core.config import get_state_dir
+from core.state import locked_json
+
+LEDGER_FILE = "review_ledger.json"
+LEDGER_VERSION = 1
+TEMPLATES_DIR = os.path.join(
+    os.environ.get("CLAUDE_PLUGIN_ROOT", os.path.dirname(os.path.dirname(__file__))), "templates"
+)
+FINGERPRINT_TEMPLATES = ("verify-code.txt", "debate-round.txt")
+CLOSING_LINES = ("}", "};", ")", "]", "end")
+
+
+@dataclass
+class Region:
+    start: int
+    end: int
+    text: str
+
+    @property
+    def digest(self) -> str:
+        normalized = "\n".join(line.rstrip() for line in self.text.strip("\n").split("\n"))
+        return hashlib.sha256(normalized.encode("utf-8", errors="replace")).hexdigest()[:20]
+
+
+@dataclass
+class LedgerPlan:
+    regions: List[Region]
+    changed: List[Region] = field(default_factory=list)
+
+    @property
+    def carried(self) -> int:
+        return len(self.regions) - len(self.changed)
+
+    def context(self, content: str) -> str:
+        """Review context: the whole file, or only the changed regions."""
+        if not self.carried:
+            return content
+        parts = [
+            f"[{self.carried} of {len(self.regions)} top-level regions are unchanged since "
+            "their last approved review and are omitted]"
+        ]
+        for region in self.changed:
+            parts.append(f"[lines {region.start}-{region.end}]\n{region.text.strip(chr(10))}")
+        return "\n\n".join(parts)
+
+    def describe(self) -> str:
+        return (
+            f"{len(self.changed)} of {len(self.regions)} regions changed, "
+            f"{self.carried} approval(s) carried forward"
+        )
+
+
+def split_regions(content: str) -> List[Region]:
+    lines = content.split("\n")
+    regions: List[Region] = []
+    start = 0
+    for i in range(1, len(lines)):
+        line = lines[i]
+        if (
+            line.strip()
+            and not line[0].isspace()
+            and line.strip() not in CLOSING_LINES
+            and not lines[i - 1].strip()
+        ):
+            if "\n".join(lines[start:i]).strip():
+                regions.append(Region(start + 1, i, "\n".join(lines[start:i])))
+            start = i
+    if "\n".join(lines[start:]).strip():
+        regions.append(Region(start + 1, len(lines), "\n".join(lines[start:])))
+    return regions
+
+
+def fingerprint(config: Dict[str, Any]) -> str:
+    digest = hashlib.sha256()
+    digest.update(",".join(config.get("models", ["gemini", "codex"])).encode())
+    paths = [os.path.join(TEMPLATES_DIR, name) for name in FINGERPRINT_TEMPLATES]
+    paths += config.get("review_ledger_dependency_files", [])
+    for path in paths:
+        digest.update(path.encode())
+        try:
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        except OSError:
+            digest.update(b"-")
+    return digest.hexdigest()[:20]
+
+
+def locked_ledger(config: Dict[str, Any]) -> ContextManager[Dict[str, Any]]:
+    path = os.path.join(get_state_dir(config), LEDGER_FILE)
+    return locked_json(path, lambda: {"fingerprint": "", "files": {}}, LEDGER_VERSION)
+
+
+def _approved(data: Dict[str, Any], config: Dict[str, Any], file_path: str) -> Dict[str, float]:
+    current = fingerprint(config)
+    if data["fingerprint"] != current:
+        data["fingerprint"] = current
+        data["files"] = {}
+    ttl = config.get("review_ledger_ttl_days", 7) * 86400
+    now = time.time()
+    entry = data["files"].get(os.path.abspath(file_path), {})
+    return {h: ts for h, ts in entry.get("approved", {}).items() if not ttl or now - ts < ttl}
+
+
+def plan_review(config: Dict[str, Any], file_path: str, content: str) -> LedgerPlan:
+    regions = split_regions(content)
+    with locked_ledger(config) as data:
+        approved = _approved(data, config, file_path)
+    return LedgerPlan(regions, [r for r in regions if r.digest not in approved])
+
+
+def record_outcome(
+    config: Dict[str, Any], file_path: str, plan: LedgerPlan, approved: bool
+) -> None:
+    """Keep approvals for the file's current regions; add the reviewed ones if approved."""
+    record_approvals(
+        config, file_path, [r.digest for r in plan.regions], [r.digest for r in plan.changed], approved
+    )
+
+
+def record_approvals(
+    config: Dict[str, Any], file_path: str, current: List[str], reviewed: List[str], approved: bool
+) -> None:
+    """record_outcome on region digests, so the write can be stored and applied later."""
+    now = time.time()
+    current_set = set(current)
+    with locked_ledger(config) as data:
+        kept = {h: ts for h, ts in _approved(data, config, file_path).items() if h in current_set}
+        if approved:
+            kept.update({digest: now for digest in reviewed})
+        files = data["files"]
+        files[os.path.abspath(file_path)] = {"approved": kept, "reviewed_at": now}
+        max_files = config.get("review_ledger_max_files", 500)
+        if max_files > 0 and len(files) > max_files:
+            oldest = sorted(files, key=lambda p: files[p]["reviewed_at"])[: len(files) - max_files]
+            for path in oldest:
+                del files[path]
+
+
+def ledger_plan(config: Dict[str, Any], file_path: str, content: str) -> Optional[LedgerPlan]:
+    """plan_review, or None when the ledger is off or unreadable."""
+    if not file_path or not config.get("review_ledger_enabled", False):
+        return None
+    try:
+        return plan_review(config, file_path, content)
+    except OSError:
+        return None
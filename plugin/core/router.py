@@ -0,0 +1,94 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.config import parse_mapping, path_matches
+
+TIERS = ("skip", "fast", "panel", "debate")
+
+
+@dataclass
+class RouteDecision:
+    tier: str
+    score: int
+    reasons: List[str] = field(default_factory=list)
+
+    def describe(self) -> str:
+        reason = ", ".join(self.reasons) if self.reasons else "no risk signals"
+        return f"{self.tier} (score {self.score}: {reason})"
+
+
+def _to_int(value: Any, default: int = 0) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _count_lines(content: str) -> int:
+    return content.count("\n") + (1 if content and not content.endswith("\n") else 0)
+
+
+def score_risk(file_path: str, content: str, config: Dict[str, Any]) -> RouteDecision:
+    score = 0
+    reasons: List[str] = []
+
+    for pattern, weight in parse_mapping(config.get("risk_path_rules", [])):
+        if path_matches(file_path, pattern):
+            points = _to_int(weight)
+            score += points
+            reasons.append(f"path {pattern} {points:+d}")
+
+    for pattern, weight in parse_mapping(config.get("risk_file_types", [])):
+        if path_matches(file_path, pattern):
+            points = _to_int(weight)
+            score += points
+            reasons.append(f"type {pattern} {points:+d}")
+            break
+
+    line_count = _count_lines(content)
+    size_points = 0
+    for threshold, weight in parse_mapping(config.get("risk_size_steps", [])):
+        if line_count >= _to_int(threshold, line_count + 1):
+            size_points = max(size_points, _to_int(weight))
+    if size_points:
+        score += size_points
+        reasons.append(f"size {line_count} lines {size_points:+d}")
+
+    hits = [api for api in config.get("risk_sensitive_apis", []) if api and api in content]
+    if hits:
+        points = min(2 * len(hits), _to_int(config.get("risk_sensitive_api_max", 4), 4))
+        score += points
+        reasons.append(f"sensitive {', '.join(hits[:3])} {points:+d}")
+
+    return RouteDecision(tier=tier_for_score(score, config), score=score, reasons=reasons)
+
+
+def tier_for_score(score: int, config: Dict[str, Any]) -> str:
+    tier = "skip"
+    floors = {name: _to_int(value) for name, value in parse_mapping(config.get("routing_tiers", []))}
+    for name in TIERS[1:]:
+        if name in floors and score >= floors[name]:
+            tier = name
+    return tier
+
+
+def route_change(
+    file_path: str, content: str, config: Dict[str, Any]
+) -> Optional[RouteDecision]:
+    if not config.get("routing_enabled", False):
+        return None
+    return score_risk(file_path, content, config)
+
+
+def apply_route(
+    route: Optional[RouteDecision], models: List[str], max_rounds: int, config: Dict[str, Any]
+) -> Tuple[List[str], int]:
+    """Return the (models, max_rounds) a review should use for this tier."""
+    if route is None or route.tier == "debate":
+        return models, max_rounds
+    if route.tier == "fast":
+        fast_model = config.get("routing_fast_model", "codex")
+        return ([fast_model] if fast_model in models else models[:1]), 0
+    if route.tier == "panel":
+        return models, 0
+    return [], 0
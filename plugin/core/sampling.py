@@ -0,0 +1,136 @@
+"""Deterministic review sampling for PostToolUse.
+
+The review rate for a change is the lowest matching rate from
+``sampling_path_rates`` (first matching pattern) and ``sampling_mode_rates``
+(review mode and, with routing, its tier). A change below rate 1 is reviewed
+when a hash of (session, path, content) maps below the rate, so a retried
+event gets the same answer. Coverage guarantees override the draw: the first
+change to each file in a session, and every ``sampling_every_nth`` change.
+Per-session counters live in state_dir/sampling.json.
+"""
+import os
+import time
+import hashlib
+from dataclasses import asdict, dataclass
+from typing import Any, ContextManager, Dict, List, Optional
+
+from core.config import get_state_dir, parse_mapping, path_matches
+from core.state import locked_json
+
+SAMPLING_FILE = "sampling.json"
+SAMPLING_VERSION = 1
+# Decisions remembered per session so repeated events reuse them.
+MAX_DECISIONS = 500
+KEEP_SESSION_SECONDS = 7 * 86400
+
+
+@dataclass
+class SampleDecision:
+    review: bool
+    reason: str
+    rate: float
+    # Changes sampled out since the previous reviewed change (set when review is True).
+    sampled_out_since_review: int = 0
+
+    def describe(self) -> str:
+        return f"{'reviewed' if self.review else 'sampled out'} ({self.reason})"
+
+
+def locked_sampling(config: Dict[str, Any]) -> ContextManager[Dict[str, Any]]:
+    path = os.path.join(get_state_dir(config), SAMPLING_FILE)
+    return locked_json(path, lambda: {"sessions": {}}, SAMPLING_VERSION)
+
+
+def _rate(value: str) -> Optional[float]:
+    try:
+        return min(1.0, max(0.0, float(value)))
+    except ValueError:
+        return None
+
+
+def sampling_rate(file_path: str, mode: str, tier: str, config: Dict[str, Any]) -> float:
+    rates = [1.0]
+    for pattern, value in parse_mapping(config.get("sampling_path_rates", [])):
+        if path_matches(file_path, pattern) and _rate(value) is not None:
+            rates.append(_rate(value))
+            break
+    for name, value in parse_mapping(config.get("sampling_mode_rates", [])):
+        if name in (mode, tier) and _rate(value) is not None:
+            rates.append(_rate(value))
+    return min(rates)
+
+
+def _draw(key: str) -> float:
+    return int(key[:13], 16) / 16 ** 13
+
+
+def sample_change(
+    config: Dict[str, Any],
+    session_id: str,
+    file_path: str,
+    content: str,
+    mode: str = "code",
+    tier: str = "",
+) -> Optional[SampleDecision]:
+    """Decide whether to review a change; None when sampling is off."""
+    if not config.get("sampling_enabled", False):
+        return None
+    rate = sampling_rate(file_path, mode, tier, config)
+    key = hashlib.sha256(
+        "\0".join((session_id, os.path.abspath(file_path), content)).encode("utf-8", errors="replace")
+    ).hexdigest()
+    now = time.time()
+    with locked_sampling(config) as data:
+        sessions = data["sessions"]
+        session = sessions.setdefault(session_id or "default", {
+            "files": [], "changes": 0, "reviewed": 0, "sampled_out": 0, "pending": 0,
+            "decisions": {},
+        })
+        session["last"] = now
+        if key in session["decisions"]:
+            return SampleDecision(**session["decisions"][key])
+
+        session["changes"] += 1
+        every_nth = config.get("sampling_every_nth", 10)
+        if rate >= 1:
+            review, reason = True, "rate 1"
+        elif config.get("sampling_first_per_file", True) and file_path not in session["files"]:
+            review, reason = True, "first change to this file in the session"
+        elif every_nth > 0 and session["changes"] % every_nth == 0:
+            review, reason = True, f"change {session['changes']}, every {every_nth}th is reviewed"
+        else:
+            draw = _draw(key)
+            review, reason = draw < rate, f"rate {rate:g}, draw {draw:.2f}"
+
+        decision = SampleDecision(review, reason, rate)
+        if review:
+            session["reviewed"] += 1
+            decision.sampled_out_since_review = session["pending"]
+            session["pending"] = 0
+            if file_path not in session["files"]:
+                session["files"].append(file_path)
+        else:
+            session["sampled_out"] += 1
+            session["pending"] += 1
+        session["decisions"][key] = asdict(decision)
+        while len(session["decisions"]) > MAX_DECISIONS:
+            session["decisions"].pop(next(iter(session["decisions"])))
+        data["sessions"] = {
+            k: v for k, v in sessions.items() if now - v.get("last", 0) < KEEP_SESSION_SECONDS
+        }
+    return decision
+
+
+def sampling_report(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    with locked_sampling(config) as data:
+        sessions = sorted(data["sessions"].items(), key=lambda kv: kv[1].get("last", 0))
+    return [
+        {
+            "session": session_id,
+            "changes": s["changes"],
+            "reviewed": s["reviewed"],
+            "sampled_out": s["sampled_out"],
+            "files": len(s["files"]),
+        }
+        for session_id, s in sessions[-20:]
+    ]
@@ -0,0 +1,94 @@
+"""Cross-process coalescing of identical in-flight reviews.
+
+Hook processes reviewing the same review key (core/review_cache.review_key)
+share one run. The first to take the flock on state_dir/inflight/<key>.lock
+is the leader. It runs the review and writes <key>.result.json before it
+releases the lock. Followers block on the same lock and then read that
+result. The kernel drops a crashed leader's flock, so the next follower
+finds no result and runs the review itself. Results are reused for
+``singleflight_result_ttl`` seconds after they finish.
+"""
+import os
+import json
+import time
+import fcntl
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.config import get_state_dir
+
+POLL_INTERVAL = 0.05
+# Lock and result files untouched for this long are removed by leaders.
+STALE_SECONDS = 86400
+
+
+def _paths(config: Dict[str, Any], key: str) -> Tuple[str, str]:
+    directory = get_state_dir(config, "inflight")
+    return os.path.join(directory, f"{key}.lock"), os.path.join(directory, f"{key}.result.json")
+
+
+def _fresh_result(path: str, ttl: float) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return entry if time.time() - entry.get("finished", 0) <= ttl else None
+
+
+def _acquire(fd: int, wait: float) -> bool:
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(POLL_INTERVAL)
+
+
+def _prune(directory: str) -> None:
+    cutoff = time.time() - STALE_SECONDS
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) >= cutoff:
+                continue
+            if name.endswith(".lock"):
+                with open(path, "a") as f:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    os.remove(path)
+            else:
+                os.remove(path)
+        except OSError:
+            continue
+
+
+def coalesce(
+    config: Dict[str, Any], key: str, run: Callable[[], Dict[str, Any]]
+) -> Tuple[Dict[str, Any], str]:
+    """Run ``run`` once per key across processes.
+
+    Returns (entry, role): role is "leader" when this process ran it,
+    "follower" when another process's result was reused, and "timeout"
+    when waiting exceeded ``singleflight_wait`` and this process ran it alone.
+    """
+    ttl = config.get("singleflight_result_ttl", 30)
+    lock_path, result_path = _paths(config, key)
+    with open(lock_path, "a") as lock:
+        contended = not _acquire(lock.fileno(), 0)
+        if contended and not _acquire(lock.fileno(), config.get("singleflight_wait", 300)):
+            return run(), "timeout"
+        try:
+            entry = _fresh_result(result_path, ttl)
+            if entry is not None:
+                return entry, "follower"
+            entry = run()
+            tmp_path = f"{result_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({**entry, "finished": time.time()}, f)
+            os.replace(tmp_path, result_path)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    _prune(os.path.dirname(lock_path))
+    return entry, "leader"
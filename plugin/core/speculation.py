@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Speculative code review started at PreToolUse.
+
+PreToolUse already has the complete tool_input, so a detached worker starts
+the review while the tool call waits for approval and runs. PostToolUse
+attaches to the worker's result by tool-input hash. Each job lives in
+state_dir/speculation as ``<key>.job.json`` (review context), ``<key>.lock``
+(flock held for the worker's whole lifetime) and ``<key>.result.json``.
+Jobs that are never claimed (rejected or failed tool calls) are discarded
+when a newer edit to the same file starts, at Stop, or after speculation_ttl.
+
+The worker changes no persistent state: follow-up records, the review
+ledger, token usage, history and agreement stats are written by
+``claim_result`` from the result's ``state_writes`` (core/state_writes.py).
+A discarded job therefore counts nowhere.
+"""
+import os
+import sys
+import json
+import time
+import fcntl
+import signal
+import hashlib
+import argparse
+import subprocess
+from typing import Any, Dict, List, Optional
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import get_state_dir, load_config
+
+POLL_INTERVAL = 0.05
+
+
+def speculation_key(input_data: dict) -> str:
+    payload = json.dumps(
+        {"tool_name": input_data.get("tool_name", ""), "tool_input": input_data.get("tool_input", {})},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def _paths(config: Dict[str, Any], key: str) -> Dict[str, str]:
+    base = os.path.join(get_state_dir(config, "speculation"), key)
+    return {"job": f"{base}.job.json", "lock": f"{base}.lock", "result": f"{base}.result.json"}
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: dict) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _lock_held(lock_path: str) -> bool:
+    try:
+        with open(lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return False
+    except OSError:
+        return True
+
+
+def _jobs(config: Dict[str, Any]) -> List[str]:
+    directory = get_state_dir(config, "speculation")
+    return [name[: -len(".job.json")] for name in os.listdir(directory) if name.endswith(".job.json")]
+
+
+def discard(config: Dict[str, Any], key: str) -> None:
+    paths = _paths(config, key)
+    job = _read_json(paths["job"]) or {}
+    if job.get("pid") and _lock_held(paths["lock"]):
+        try:
+            os.killpg(job["pid"], signal.SIGTERM)
+        except OSError:
+            pass
+    for path in paths.values():
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def discard_stale(
+    config: Dict[str, Any], session_id: Optional[str] = None, file_path: Optional[str] = None
+) -> int:
+    """Discard jobs past speculation_ttl, plus any matching session_id / file_path."""
+    ttl = config.get("speculation_ttl", 600)
+    discarded = 0
+    for key in _jobs(config):
+        job = _read_json(_paths(config, key)["job"]) or {}
+        expired = time.time() - job.get("created", 0) > ttl
+        same_session = session_id is not None and job.get("session_id") == session_id
+        superseded = same_session and file_path is not None and job.get("file_path") == file_path
+        if expired or (same_session and file_path is None) or superseded:
+            discard(config, key)
+            discarded += 1
+    return discarded
+
+
+def start_speculation(config: Dict[str, Any], input_data: dict, ctx: dict) -> Optional[str]:
+    """Launch a detached review worker for this tool call. Returns its key."""
+    key = speculation_key(input_data)
+    paths = _paths(config, key)
+    if os.path.exists(paths["job"]):
+        return key
+    session_id = input_data.get("session_id", "")
+    discard_stale(config, session_id=session_id, file_path=ctx["file_path"])
+    job = {**ctx, "session_id": session_id, "created": time.time()}
+    _write_json(paths["job"], job)
+    # Take the lock before spawning and hand it to the worker, so PostToolUse
+    # never sees an unlocked job whose worker has not started yet.
+    lock = open(paths["lock"], "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "run", "--job", paths["job"]],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            pass_fds=(lock.fileno(),),
+        )
+    finally:
+        lock.close()
+    job["pid"] = proc.pid
+    _write_json(paths["job"], job)
+    return key
+
+
+def claim_result(config: Dict[str, Any], input_data: dict, timeout: float) -> Optional[dict]:
+    """Wait for this tool call's speculative review.
+
+    Returns None when there is nothing to attach to (no job, or the worker
+    died without a result), so the caller reviews inline instead. A claimed
+    result's deferred state writes are applied here.
+    """
+    key = speculation_key(input_data)
+    paths = _paths(config, key)
+    if not os.path.exists(paths["job"]):
+        return None
+    deadline = time.monotonic() + timeout
+    while True:
+        result = _read_json(paths["result"])
+        if result is None and not _lock_held(paths["lock"]):
+            result = _read_json(paths["result"])  # worker may have finished in between
+            break
+        if result is not None:
+            break
+        if time.monotonic() > deadline:
+            result = {"status": "SKIPPED", "summary": "Result: SKIPPED\n  → Speculative review timed out."}
+            break
+        time.sleep(POLL_INTERVAL)
+    discard(config, key)
+    if result is not None:
+        from core.state_writes import apply_state_writes
+
+        apply_state_writes(config, result.get("state_writes", []))
+    return result
+
+
+def run_job(job_path: str) -> None:
+    from core.cli_runner import reap_live_groups
+    from core.consensus_engine import run_consensus
+    from core.router import route_change
+
+    def terminate(signum, frame):
+        reap_live_groups()
+        os._exit(128 + signum)
+
+    signal.signal(signal.SIGTERM, terminate)
+    job = _read_json(job_path)
+    if job is None:
+        return
+    config = load_config()
+    started = time.time()
+    result = run_consensus(
+        mode=job["mode"],
+        context=job["content"],
+        file_path=job["file_path"],
+        config=config,
+        route=route_change(job["file_path"], job["content"], config),
+        session_id=job.get("session_id", ""),
+        whole_file=job.get("whole_file", False),
+        speculative=True,
+    )
+    if os.path.exists(job_path):
+        _write_json(job_path.replace(".job.json", ".result.json"), {
+            "status": result.status.value,
+            "summary": result.summary,
+            "state_writes": result.state_writes,
+            "started": started,
+            "finished": time.time(),
+        })
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Concensus speculative review worker")
+    parser.add_argument("command", choices=["run"])
+    parser.add_argument("--job", required=True)
+    args = parser.parse_args(argv)
+    run_job(args.job)
+
+
+if __name__ == "__main__":
+    main()
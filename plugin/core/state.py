@@ -0,0 +1,27 @@
+import os
+import json
+import fcntl
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+
+@contextmanager
+def locked_json(path: str, empty: Callable[[], Dict[str, Any]], version: int) -> Iterator[Dict[str, Any]]:
+    """Load, yield and atomically save a JSON state file under an exclusive flock.
+
+    A missing, corrupt or other-version file starts over from ``empty()``.
+    """
+    with open(path + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            if data.get("version") != version:
+                raise ValueError("stale state")
+        except (OSError, ValueError):
+            data = {**empty(), "version": version}
+        yield data
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
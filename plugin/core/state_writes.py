@@ -0,0 +1,78 @@
+"""Persistent state written by a review, applied now or deferred.
+
+A review updates follow-up records, the review ledger, token usage, history
+and agreement stats. A speculative review (core/speculation.py) runs before
+its tool call has been approved, so it collects these writes as JSON instead.
+PostToolUse applies them only when it claims the result. A rejected or
+superseded tool call therefore leaves no trace, and a claimed one is counted
+exactly once.
+"""
+import sys
+import sqlite3
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _record_agreement(
+    config: Dict[str, Any], category: str, verdicts: Dict[str, str], latencies: Dict[str, int]
+) -> None:
+    from core.agreement import locked_stats, record_round
+
+    with locked_stats(config) as stats:
+        record_round(stats, category, verdicts, latencies, config)
+
+
+def _record_history(config: Dict[str, Any], calls: List[Dict[str, Any]], **fields: Any) -> None:
+    from core.history import ModelCall, record_review
+
+    record_review(config, calls=[ModelCall(**c) for c in calls], **fields)
+
+
+def _writers() -> Dict[str, Callable[..., None]]:
+    from core.followup import remember_concerns, store_followup
+    from core.review_ledger import record_approvals
+    from core.usage import record_usage
+
+    return {
+        "agreement": _record_agreement,
+        "remember_concerns": remember_concerns,
+        "followup": store_followup,
+        "ledger": record_approvals,
+        "usage": record_usage,
+        "history": _record_history,
+    }
+
+
+class StateWrites:
+    """Apply each write at once, or with ``defer`` keep it in ``pending``."""
+
+    def __init__(self, config: Dict[str, Any], defer: bool = False):
+        self.config = config
+        self.pending: Optional[List[Dict[str, Any]]] = [] if defer else None
+
+    @property
+    def deferred(self) -> bool:
+        return self.pending is not None
+
+    def apply(self, name: str, **kwargs: Any) -> None:
+        """Raises whatever the writer raises (OSError, sqlite3.Error) when applied now."""
+        if self.pending is not None:
+            self.pending.append({"write": name, "args": kwargs})
+        else:
+            _writers()[name](self.config, **kwargs)
+
+
+def apply_state_writes(config: Dict[str, Any], writes: List[Dict[str, Any]]) -> int:
+    """Apply writes deferred by a speculative review; returns how many succeeded."""
+    writers = _writers()
+    applied = 0
+    for entry in writes or []:
+        writer = writers.get(entry.get("write", ""))
+        if writer is None:
+            continue
+        try:
+            writer(config, **entry.get("args", {}))
+        except (OSError, sqlite3.Error, TypeError) as e:
+            print(f"  ⟐ Review state not updated ({entry['write']}): {e}", file=sys.stderr, flush=True)
+            continue
+        applied += 1
+    return applied
@@ -0,0 +1,275 @@
+import os
+import re
+import ast
+import json
+from typing import Any, Dict, Optional, Set
+
+from core.config import get_state_dir, should_skip_path
+
+INDEX_VERSION = 1
+INDEX_FILE = "symbols.json"
+
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv", "dist", "build", ".tox"}
+
+GENERIC_PATTERNS = {
+    ".js": [
+        r"^\s*(?:export\s+)?(?:async\s+)?function\s*\*?\s*(?P<name>\w+)\s*(?P<sig>\([^)]*\))",
+        r"^\s*(?:export\s+)?(?:const|let|var)\s+(?P<name>\w+)\s*=\s*(?:async\s+)?(?P<sig>\([^)]*\))\s*=>",
+        r"^\s*(?:export\s+)?(?:default\s+)?class\s+(?P<name>\w+)(?P<sig>)",
+    ],
+    ".go": [
+        r"^func\s+(?:\([^)]*\)\s*)?(?P<name>\w+)\s*(?P<sig>\([^)]*\)[^{]*)",
+        r"^type\s+(?P<name>\w+)\s+(?P<sig>struct|interface)",
+    ],
+    ".rs": [
+        r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?fn\s+(?P<name>\w+)\s*(?P<sig>(?:<[^>]*>)?\([^)]*\)[^{;]*)",
+        r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:struct|enum|trait)\s+(?P<name>\w+)(?P<sig>)",
+    ],
+    ".rb": [
+        r"^\s*def\s+(?:self\.)?(?P<name>\w+[?!]?)(?P<sig>\([^)]*\))?",
+        r"^\s*(?:class|module)\s+(?P<name>\w+)(?P<sig>)",
+    ],
+}
+GENERIC_PATTERNS[".jsx"] = GENERIC_PATTERNS[".js"]
+GENERIC_PATTERNS[".ts"] = GENERIC_PATTERNS[".js"]
+GENERIC_PATTERNS[".tsx"] = GENERIC_PATTERNS[".js"]
+GENERIC_PATTERNS[".mjs"] = GENERIC_PATTERNS[".js"]
+
+GENERIC_IMPORT = re.compile(
+    r"^\s*(?:import\s.*?from\s+['\"]([^'\"]+)['\"]|import\s+['\"]([^'\"]+)['\"]"
+    r"|const\s+\w+\s*=\s*require\(['\"]([^'\"]+)['\"]\)|use\s+([\w:]+)|require\s+['\"]([^'\"]+)['\"])",
+    re.MULTILINE,
+)
+IDENTIFIER = re.compile(r"\b[A-Za-z_]\w*\b")
+CALL = re.compile(r"\b([A-Za-z_]\w*)\s*\(")
+COMMENT_PREFIXES = ("//", "#", "*", "/*", "///")
+
+SUPPORTED_EXTENSIONS = {".py"} | set(GENERIC_PATTERNS)
+
+
+def _docstring_summary(doc: Optional[str]) -> str:
+    if not doc:
+        return ""
+    return doc.strip().split("\n\n")[0].strip()[:200]
+
+
+def parse_python(source: str) -> Dict[str, Any]:
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return {"defs": [], "imports": [], "calls": []}
+    defs = []
+
+    def visit(nodes, prefix=""):
+        for node in nodes:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                keyword = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+                returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+                defs.append({
+                    "name": node.name,
+                    "qualname": prefix + node.name,
+                    "kind": "function",
+                    "line": node.lineno,
+                    "signature": f"{keyword} {node.name}({ast.unparse(node.args)}){returns}",
+                    "doc": _docstring_summary(ast.get_docstring(node)),
+                })
+            elif isinstance(node, ast.ClassDef):
+                bases = ", ".join(ast.unparse(b) for b in node.bases)
+                defs.append({
+                    "name": node.name,
+                    "qualname": prefix + node.name,
+                    "kind": "class",
+                    "line": node.lineno,
+                    "signature": f"class {node.name}({bases})" if bases else f"class {node.name}",
+                    "doc": _docstring_summary(ast.get_docstring(node)),
+                })
+                visit(node.body, prefix + node.name + ".")
+
+    visit(tree.body)
+    imports: Set[str] = set()
+    calls: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            imports.add(node.module)
+        elif isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Name):
+                calls.add(func.id)
+            elif isinstance(func, ast.Attribute):
+                calls.add(func.attr)
+    return {"defs": defs, "imports": sorted(imports), "calls": sorted(calls)}
+
+
+def parse_generic(source: str, ext: str) -> Dict[str, Any]:
+    patterns = [re.compile(p) for p in GENERIC_PATTERNS.get(ext, [])]
+    lines = source.split("\n")
+    defs = []
+    for lineno, line in enumerate(lines, start=1):
+        for pattern in patterns:
+            match = pattern.match(line)
+            if not match:
+                continue
+            doc_lines = []
+            i = lineno - 2
+            while i >= 0 and lines[i].strip().startswith(COMMENT_PREFIXES):
+                doc_lines.insert(0, lines[i].strip().lstrip("/#* ").strip())
+                i -= 1
+            defs.append({
+                "name": match.group("name"),
+                "qualname": match.group("name"),
+                "kind": "definition",
+                "line": lineno,
+                "signature": line.strip().rstrip("{").strip(),
+                "doc": " ".join(d for d in doc_lines if d)[:200],
+            })
+            break
+    imports = sorted({next(g for g in m.groups() if g) for m in GENERIC_IMPORT.finditer(source)})
+    calls = sorted(set(CALL.findall(source)))
+    return {"defs": defs, "imports": imports, "calls": calls}
+
+
+def parse_file(path: str) -> Optional[Dict[str, Any]]:
+    ext = os.path.splitext(path)[1]
+    if ext not in SUPPORTED_EXTENSIONS:
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+    return parse_python(source) if ext == ".py" else parse_generic(source, ext)
+
+
+def load_index(config: Dict[str, Any]) -> Dict[str, Any]:
+    path = os.path.join(get_state_dir(config), INDEX_FILE)
+    try:
+        with open(path, "r") as f:
+            index = json.load(f)
+        if index.get("version") == INDEX_VERSION:
+            return index
+    except (OSError, json.JSONDecodeError):
+        pass
+    return {"version": INDEX_VERSION, "files": {}}
+
+
+def save_index(config: Dict[str, Any], index: Dict[str, Any]) -> None:
+    path = os.path.join(get_state_dir(config), INDEX_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, path)
+
+
+def refresh_index(root: str, index: Dict[str, Any], config: Dict[str, Any]) -> int:
+    """Re-parse files whose mtime changed since the last refresh. Returns files updated."""
+    max_files = config.get("symbol_index_max_files", 5000)
+    files = index.setdefault("files", {})
+    seen = set()
+    updated = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        if len(seen) >= max_files:
+            break
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")]
+        for name in filenames:
+            if os.path.splitext(name)[1] not in SUPPORTED_EXTENSIONS:
+                continue
+            path = os.path.join(dirpath, name)
+            rel_path = os.path.relpath(path, root)
+            if should_skip_path(rel_path, config):
+                continue
+            if len(seen) >= max_files:
+                break
+            seen.add(rel_path)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            entry = files.get(rel_path)
+            if entry and entry.get("mtime") == mtime:
+                continue
+            parsed = parse_file(path)
+            if parsed is None:
+                continue
+            files[rel_path] = {"mtime": mtime, **parsed}
+            updated += 1
+    for rel_path in list(files):
+        if rel_path not in seen:
+            del files[rel_path]
+            updated += 1
+    return updated
+
+
+def referenced_names(content: str, file_path: str) -> Set[str]:
+    if file_path.endswith(".py"):
+        try:
+            tree = ast.parse(content)
+            names = set()
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Name):
+                    names.add(node.id)
+                elif isinstance(node, ast.Attribute):
+                    names.add(node.attr)
+                elif isinstance(node, ast.alias):
+                    names.add((node.asname or node.name).split(".")[-1])
+            return names
+        except (SyntaxError, ValueError):
+            pass
+    return set(IDENTIFIER.findall(content))
+
+
+def _is_same_file(own_path: str, rel_path: str) -> bool:
+    return bool(own_path) and (own_path == rel_path or own_path.endswith(os.sep + rel_path))
+
+
+def build_symbol_context(
+    content: str, file_path: str, index: Dict[str, Any], max_symbols: int = 15
+) -> str:
+    files = index.get("files", {})
+    own_path = os.path.normpath(file_path) if file_path else ""
+    own_defs = set()
+    if file_path.endswith(".py"):
+        own_defs = {d["name"] for d in parse_python(content)["defs"]}
+    names = referenced_names(content, file_path) - own_defs
+
+    definitions = []
+    for rel_path in sorted(files):
+        if _is_same_file(own_path, rel_path):
+            continue
+        for d in files[rel_path].get("defs", []):
+            if d["name"] in names:
+                line = f"- {rel_path}:{d['line']}  {d['signature']}"
+                if d.get("doc"):
+                    line += f"\n    {d['doc']}"
+                definitions.append(line)
+    callers = []
+    for name in sorted(own_defs):
+        users = [
+            p for p in sorted(files)
+            if name in files[p].get("calls", []) and not _is_same_file(own_path, p)
+        ]
+        if users:
+            callers.append(f"- {name} is called from: {', '.join(users[:5])}")
+
+    sections = []
+    if definitions:
+        sections.append(
+            "Referenced definitions elsewhere in the project:\n"
+            + "\n".join(definitions[:max_symbols])
+        )
+    if callers:
+        sections.append(
+            "Callers of definitions in this change:\n" + "\n".join(callers[:max_symbols])
+        )
+    return "\n\n".join(sections)
+
+
+def symbol_context_for_change(content: str, file_path: str, config: Dict[str, Any]) -> str:
+    root = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
+    index = load_index(config)
+    if refresh_index(root, index, config):
+        save_index(config, index)
+    return build_symbol_context(
+        content, file_path, index, config.get("symbol_context_max_symbols", 15)
+    )
@@ -0,0 +1,141 @@
+"""Token accounting and budgets.
+
+Per-call token counts come from the CLIs' structured output (codex
+``turn.completed`` usage, ``gemini --output-format json`` stats). Totals are
+bucketed per session, clock hour and day in state_dir/usage.json. Budgets
+count input + output tokens (cached input is a subset of input).
+"""
+import os
+import time
+from typing import Any, ContextManager, Dict, Iterable, List, Optional, Tuple
+
+from core.config import get_state_dir, parse_mapping
+from core.state import locked_json
+
+USAGE_FILE = "usage.json"
+USAGE_VERSION = 1
+TOKEN_FIELDS = ("input_tokens", "cached_tokens", "output_tokens")
+# Buckets older than this are dropped on write.
+KEEP_HOURS = 48
+KEEP_DAYS = 8
+KEEP_SESSION_SECONDS = 7 * 86400
+
+
+def locked_usage(config: Dict[str, Any]) -> ContextManager[Dict[str, Any]]:
+    path = os.path.join(get_state_dir(config), USAGE_FILE)
+    return locked_json(path, lambda: {"sessions": {}, "hours": {}, "days": {}}, USAGE_VERSION)
+
+
+def _hour_key(ts: float) -> str:
+    return time.strftime("%Y-%m-%dT%H", time.localtime(ts))
+
+
+def _day_key(ts: float) -> str:
+    return time.strftime("%Y-%m-%d", time.localtime(ts))
+
+
+def total_usage(calls: Iterable[Any]) -> Dict[str, int]:
+    """Sum token fields over anything carrying them (ModelCall, CLIResult)."""
+    totals = dict.fromkeys(TOKEN_FIELDS, 0)
+    for call in calls:
+        for name in TOKEN_FIELDS:
+            totals[name] += getattr(call, name, 0)
+    return totals
+
+
+def budget_tokens(usage: Dict[str, int]) -> int:
+    return usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+
+
+def format_usage(usage: Dict[str, int]) -> str:
+    return (
+        f"in {usage['input_tokens']} (cached {usage['cached_tokens']}) / "
+        f"out {usage['output_tokens']}"
+    )
+
+
+def estimate_cost(calls: Iterable[Any], config: Dict[str, Any]) -> Optional[float]:
+    """USD estimate from token_prices ("model=input/cached/output" per 1M tokens)."""
+    prices = {}
+    for model, value in parse_mapping(config.get("token_prices", [])):
+        try:
+            prices[model] = [float(p) for p in value.split("/")]
+        except ValueError:
+            continue
+    if not prices:
+        return None
+    cost = 0.0
+    for call in calls:
+        rates = prices.get(call.model)
+        if not rates or len(rates) != 3:
+            continue
+        uncached = call.input_tokens - call.cached_tokens
+        cost += (
+            uncached * rates[0] + call.cached_tokens * rates[1] + call.output_tokens * rates[2]
+        ) / 1_000_000
+    return cost
+
+
+def record_usage(config: Dict[str, Any], session_id: str, usage: Dict[str, int]) -> None:
+    tokens = budget_tokens(usage)
+    if not tokens:
+        return
+    now = time.time()
+    with locked_usage(config) as data:
+        session = data["sessions"].setdefault(session_id or "default", {"tokens": 0})
+        session["tokens"] += tokens
+        session["last"] = now
+        for bucket, key in (("hours", _hour_key(now)), ("days", _day_key(now))):
+            data[bucket][key] = data[bucket].get(key, 0) + tokens
+        hour_cutoff = _hour_key(now - KEEP_HOURS * 3600)
+        day_cutoff = _day_key(now - KEEP_DAYS * 86400)
+        data["hours"] = {k: v for k, v in data["hours"].items() if k >= hour_cutoff}
+        data["days"] = {k: v for k, v in data["days"].items() if k >= day_cutoff}
+        data["sessions"] = {
+            k: v for k, v in data["sessions"].items()
+            if now - v.get("last", 0) < KEEP_SESSION_SECONDS
+        }
+
+
+def current_usage(config: Dict[str, Any], session_id: str) -> Dict[str, int]:
+    now = time.time()
+    with locked_usage(config) as data:
+        return {
+            "session": data["sessions"].get(session_id or "default", {}).get("tokens", 0),
+            "hour": data["hours"].get(_hour_key(now), 0),
+            "day": data["days"].get(_day_key(now), 0),
+        }
+
+
+def budgets_configured(config: Dict[str, Any]) -> bool:
+    return any(config.get(f"token_budget_{window}", 0) > 0 for window in ("session", "hour", "day"))
+
+
+def budget_status(config: Dict[str, Any], session_id: str) -> Tuple[str, str]:
+    """Return ("ok" | "downgrade" | "exhausted", reason) for the tightest budget."""
+    used = current_usage(config, session_id)
+    downgrade_ratio = config.get("token_budget_downgrade_ratio", 0.8)
+    worst: Tuple[float, str] = (0.0, "")
+    for window in ("session", "hour", "day"):
+        limit = config.get(f"token_budget_{window}", 0)
+        if limit > 0:
+            ratio = used[window] / limit
+            if ratio > worst[0]:
+                worst = (ratio, f"{window} {used[window]}/{limit} tokens")
+    ratio, reason = worst
+    if ratio >= 1:
+        return "exhausted", reason
+    if ratio >= downgrade_ratio:
+        return "downgrade", reason
+    return "ok", reason
+
+
+def usage_report(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    with locked_usage(config) as data:
+        rows = [{"window": f"day {k}", "tokens": v} for k, v in sorted(data["days"].items())]
+        rows += [{"window": f"hour {k}", "tokens": v} for k, v in sorted(data["hours"].items())[-6:]]
+        rows += [
+            {"window": f"session {k}", "tokens": v["tokens"]}
+            for k, v in sorted(data["sessions"].items(), key=lambda kv: kv[1].get("last", 0))[-10:]
+        ]
+    return rows
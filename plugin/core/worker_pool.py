@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""Warm model worker pool.
+
+A per-project daemon keeps ``pool_size`` pre-spawned CLI processes per backend.
+Each worker is started in its prompt-over-stdin mode (``gemini`` /
+``codex exec --json -``), so node startup, auth refresh and config parsing
+happen while it waits for a prompt. A worker serves one prompt and is replaced
+in the background; the daemon itself is recycled after ``pool_max_requests``.
+"""
+import os
+import sys
+import json
+import time
+import fcntl
+import socket
+import argparse
+import threading
+import subprocess
+import socketserver
+from dataclasses import asdict, fields
+from typing import Dict, List, Optional
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cli_runner import (
+    MODEL_SPECS,
+    CLIResult,
+    RunOptions,
+    SpawnedProcess,
+    collect_model,
+    discard_process,
+    model_argv,
+    spawn_process,
+)
+
+
+class WarmWorker:
+    def __init__(self, model: str, spawned: SpawnedProcess):
+        self.model = model
+        self.spawned = spawned
+        self.spawned_at = time.monotonic()
+
+    def healthy(self) -> bool:
+        return self.spawned.proc.poll() is None
+
+
+class WorkerPool:
+    def __init__(self, models: List[str], options: RunOptions):
+        self.models = [m for m in models if m in MODEL_SPECS]
+        self.options = options
+        self.idle: Dict[str, List[WarmWorker]] = {m: [] for m in self.models}
+        self.requests = 0
+        self.last_request = time.monotonic()
+        self._lock = threading.Lock()
+        self._replenish_lock = threading.Lock()
+
+    def _spawn_worker(self, model: str) -> Optional[WarmWorker]:
+        try:
+            spawned = spawn_process(model_argv(model, self.options), self.options, stdin_pipe=True)
+        except OSError:
+            return None
+        return WarmWorker(model, spawned)
+
+    def replenish(self) -> None:
+        if not self._replenish_lock.acquire(blocking=False):
+            return
+        try:
+            for model in list(self.models):
+                while True:
+                    with self._lock:
+                        if len(self.idle[model]) >= self.options.pool_size:
+                            break
+                    worker = self._spawn_worker(model)
+                    if worker is None:
+                        break
+                    with self._lock:
+                        self.idle[model].append(worker)
+        finally:
+            self._replenish_lock.release()
+
+    def evict(self) -> int:
+        """Drop idle workers that died or sat unused past pool_idle_timeout."""
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            for model, workers in self.idle.items():
+                keep = []
+                for worker in workers:
+                    expired = now - worker.spawned_at > self.options.pool_idle_timeout
+                    if expired or not worker.healthy():
+                        evicted.append(worker)
+                    else:
+                        keep.append(worker)
+                self.idle[model] = keep
+        for worker in evicted:
+            discard_process(worker.spawned)
+        return len(evicted)
+
+    def acquire(self, model: str) -> Optional[WarmWorker]:
+        with self._lock:
+            while self.idle.get(model):
+                worker = self.idle[model].pop(0)
+                if worker.healthy():
+                    return worker
+                discard_process(worker.spawned)
+        return None
+
+    def run(self, model: str, prompt: str, timeout: int) -> CLIResult:
+        if model not in MODEL_SPECS:
+            return CLIResult(model=model, output="", success=False, error=f"Unknown model {model}")
+        with self._lock:
+            self.requests += 1
+            self.last_request = time.monotonic()
+            if model not in self.models:
+                self.models.append(model)
+                self.idle[model] = []
+        worker = self.acquire(model)
+        warm = worker is not None
+        if worker is None:
+            worker = self._spawn_worker(model)
+        if worker is None:
+            return CLIResult(model=model, output="", success=False, error=f"{model} CLI not found")
+        threading.Thread(target=self.replenish, daemon=True).start()
+        return collect_model(
+            model, worker.spawned, timeout, self.options, prompt.encode("utf-8"), warm=warm
+        )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers = [w for ws in self.idle.values() for w in ws]
+            self.idle = {m: [] for m in self.models}
+        for worker in workers:
+            discard_process(worker.spawned)
+
+
+def _recv_line(sock: socket.socket) -> bytes:
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    return b"".join(chunks)
+
+
+class _PoolHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        server = self.server
+        try:
+            request = json.loads(_recv_line(self.request))
+            if request.get("op") == "ping":
+                response = {"ok": True, "requests": server.pool.requests}
+            else:
+                result = server.pool.run(request["model"], request["prompt"], request["timeout"])
+                response = asdict(result)
+        except (ValueError, KeyError) as e:
+            response = {"error": f"bad request: {e}"}
+        self.request.sendall(json.dumps(response).encode("utf-8") + b"\n")
+        if server.pool.requests >= server.pool.options.pool_max_requests:
+            threading.Thread(target=_stop, args=(server,), daemon=True).start()
+
+
+class _PoolServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = False
+    block_on_close = True
+
+
+def _stop(server: _PoolServer) -> None:
+    # Unlink first so new clients fail fast and run directly instead of queueing.
+    if os.path.exists(server.server_address):
+        os.unlink(server.server_address)
+    server.shutdown()
+
+
+def _maintain(server: _PoolServer) -> None:
+    pool = server.pool
+    while True:
+        time.sleep(min(5, max(1, pool.options.pool_idle_timeout // 4)))
+        if time.monotonic() - pool.last_request > pool.options.pool_shutdown_after:
+            _stop(server)
+            return
+        pool.evict()
+        pool.replenish()
+
+
+def serve(socket_path: str, models: List[str], options: RunOptions) -> None:
+    lock_file = open(socket_path + ".lock", "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return  # another daemon owns this socket
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    pool = WorkerPool(models, options)
+    server = _PoolServer(socket_path, _PoolHandler)
+    server.pool = pool
+    try:
+        pool.replenish()
+        threading.Thread(target=_maintain, args=(server,), daemon=True).start()
+        server.serve_forever(poll_interval=0.5)
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        pool.shutdown()
+        lock_file.close()
+
+
+def start_pool_daemon(options: RunOptions, models: List[str]) -> None:
+    option_values = {f.name: getattr(options, f.name) for f in fields(RunOptions)}
+    subprocess.Popen(
+        [
+            sys.executable, os.path.abspath(__file__), "serve",
+            "--socket", options.pool_socket,
+            "--models", ",".join(models),
+            "--options", json.dumps(option_values),
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def request_from_pool(
+    options: RunOptions, model: str, prompt: str, timeout: int
+) -> Optional[CLIResult]:
+    """Run a prompt on a warm worker. Returns None (and starts the daemon) if no pool is up."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout + 10)
+        sock.connect(options.pool_socket)
+        request = {"model": model, "prompt": prompt, "timeout": timeout}
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        response = json.loads(_recv_line(sock))
+    except (OSError, ValueError):
+        if _lock_is_free(options.pool_socket):
+            start_pool_daemon(options, [model])
+        return None
+    finally:
+        sock.close()
+    if "error" in response and "model" not in response:
+        return None
+    known = {f.name for f in fields(CLIResult)}
+    return CLIResult(**{k: v for k, v in response.items() if k in known})
+
+
+def _lock_is_free(socket_path: str) -> bool:
+    try:
+        with open(socket_path + ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Concensus warm model worker pool")
+    parser.add_argument("command", choices=["serve"])
+    parser.add_argument("--socket", required=True)
+    parser.add_argument("--models", default="gemini,codex")
+    parser.add_argument("--options", default="{}")
+    args = parser.parse_args(argv)
+    options = RunOptions(**json.loads(args.options))
+    options.pool_socket = args.socket
+    serve(args.socket, args.models.split(","), options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Single entry point for every hook event.
+
+Imports only what the event's trigger check needs; the consensus engine (and
+with it subprocess, threads and the CLI runner) is loaded lazily by the hook
+module once a review will actually run. Likewise the event itself is only
+scanned for its routing fields until a hook's precheck accepts it.
+"""
+import os
+import sys
+import json
+
+PLUGIN_ROOT = os.environ.get(
+    "CLAUDE_PLUGIN_ROOT", os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+if PLUGIN_ROOT not in sys.path:
+    sys.path.insert(0, PLUGIN_ROOT)
+
+HOOKS = {
+    "PreToolUse": ("pretooluse", "Concensus pretooluse hook error"),
+    "PostToolUse": ("posttooluse", "Concensus error"),
+    "Stop": ("stop", "Concensus stop hook error"),
+    "SubagentStop": ("subagentstop", "Concensus subagentstop hook error"),
+    "UserPromptSubmit": ("userpromptsubmit", "Concensus userpromptsubmit hook error"),
+}
+
+
+def dispatch_event(event) -> str:
+    """Run the hook for ``event`` (core.event_reader.HookEvent).
+
+    A hook module's optional ``precheck(event)`` sees the unparsed event and
+    returns False to skip it; the full event is parsed only for ``handle``.
+    """
+    entry = HOOKS.get(event.field("hook_event_name", default=""))
+    if entry is None:
+        return json.dumps({})
+    module_name, error_label = entry
+    try:
+        module = __import__(f"hooks.{module_name}", fromlist=["handle"])
+        precheck = getattr(module, "precheck", None)
+        if precheck is not None and event.scanned and not precheck(event):
+            return json.dumps({})
+        return module.handle(event.load())
+    except Exception as e:
+        return json.dumps({"systemMessage": f"[{error_label}: {e}]"})
+
+
+def dispatch(input_data: dict) -> str:
+    from core.event_reader import HookEvent
+
+    return dispatch_event(HookEvent.from_data(input_data))
+
+
+def _read_stdin() -> bytes:
+    stream = getattr(sys.stdin, "buffer", None)
+    return stream.read() if stream is not None else sys.stdin.read().encode("utf-8")
+
+
+def _run():
+    try:
+        from core.event_reader import HookEvent
+
+        event = HookEvent(_read_stdin())
+        print(dispatch_event(event))
+        return event.field("hook_event_name")
+    except Exception as e:
+        print(json.dumps({"systemMessage": f"[Concensus dispatch error: {e}]"}))
+
+
+def main():
+    try:
+        profile = os.environ.get("CONCENSUS_PROFILE", "")
+        if profile and profile != "0":
+            from core.profiling import profiled
+
+            profiled(_run, profile)
+        else:
+            _run()
+    finally:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,25 @@ if PLUGIN_ROOT not in sys.path:
     sys.path.insert(0, PLUGIN_ROOT)
 
 from core.config import load_config, should_skip_path, should_skip_change
-from core.consensus_engine import run_consensus
+
+
+# Tool input field holding the changed text, per tool.
+CONTENT_FIELDS = {"Write": "content", "Edit": "new_string"}
+
+
+def change_may_trigger(event, config: dict) -> bool:
+    """should_trigger on the unparsed event (core.event_reader.HookEvent); False only if it is False."""
+    if not config.get("enabled", True):
+        return False
+    if should_skip_path(event.field("tool_input", "file_path", default=""), config):
+        return False
+    content_field = CONTENT_FIELDS.get(event.field("tool_name", default=""))
+    lines = event.max_lines("tool_input", content_field) if content_field else 0
+    return lines >= config.get("min_change_lines", 5)
+
+
+def precheck(event) -> bool:
+    return change_may_trigger(event, load_config())
 
 
 def should_trigger(input_data: dict, config: dict) -> bool:
@@ -27,41 +45,92 @@ def should_trigger(input_data: dict, config: dict) -> bool:
 
 
 def _get_change_content(input_data: dict) -> str:
-    tool_name = input_data.get("tool_name", "")
-    tool_input = input_data.get("tool_input", {})
-    if tool_name == "Write":
-        return tool_input.get("content", "")
-    elif tool_name == "Edit":
-        return tool_input.get("new_string", "")
-    return ""
+    content_field = CONTENT_FIELDS.get(input_data.get("tool_name", ""))
+    if content_field is None:
+        return ""
+    return input_data.get("tool_input", {}).get(content_field, "")
 
 
 def build_context_from_input(input_data: dict) -> dict:
     tool_input = input_data.get("tool_input", {})
     file_path = tool_input.get("file_path", "")
     content = _get_change_content(input_data)
-    return {"mode": "code", "file_path": file_path, "content": content}
+    return {
+        "mode": "code",
+        "file_path": file_path,
+        "content": content,
+        "whole_file": input_data.get("tool_name", "") == "Write",
+    }
+
+
+def sample(input_data: dict, ctx: dict, route, config: dict):
+    """Sampling decision for this change, or None when sampling is off."""
+    if not config.get("sampling_enabled", False):
+        return None
+    from core.sampling import sample_change
+
+    return sample_change(
+        config,
+        input_data.get("session_id", ""),
+        ctx["file_path"],
+        ctx["content"],
+        ctx["mode"],
+        route.tier if route is not None else "",
+    )
 
 
 def format_hook_output(consensus_summary: str) -> str:
     return json.dumps({"systemMessage": f"[CONSENSUS REVIEW]\n{consensus_summary}"})
 
 
+def handle(input_data: dict) -> str:
+    config = load_config()
+    if not should_trigger(input_data, config):
+        return json.dumps({})
+    from core.router import route_change
+
+    ctx = build_context_from_input(input_data)
+    route = route_change(ctx["file_path"], ctx["content"], config)
+    if route is not None and route.tier == "skip":
+        print(f"  ⟐ Route: {route.describe()}", file=sys.stderr, flush=True)
+        return json.dumps({})
+    if config.get("changeset_mode", False):
+        from core.changeset import record_edit
+
+        record_edit(config, input_data.get("session_id", ""), input_data)
+        return json.dumps({})
+    decision = sample(input_data, ctx, route, config)
+    if decision is not None and not decision.review:
+        print(f"  ⟐ Sampling: {decision.describe()}", file=sys.stderr, flush=True)
+        return json.dumps({})
+    if config.get("speculative_review_enabled", False):
+        from core.speculation import claim_result
+
+        claimed = claim_result(config, input_data, config.get("speculation_wait", 240))
+        if claimed is not None:
+            return format_hook_output(claimed["summary"])
+    from core.consensus_engine import run_consensus
+
+    result = run_consensus(
+        mode=ctx["mode"],
+        context=ctx["content"],
+        file_path=ctx["file_path"],
+        config=config,
+        route=route,
+        session_id=input_data.get("session_id", ""),
+        whole_file=ctx["whole_file"],
+    )
+    if decision is not None and decision.sampled_out_since_review:
+        return format_hook_output(
+            f"  ⟐ Sampling: {decision.sampled_out_since_review} change(s) sampled out "
+            f"since the last review\n{result.summary}"
+        )
+    return format_hook_output(result.summary)
+
+
 def main():
     try:
-        input_data = json.load(sys.stdin)
-        config = load_config()
-        if not should_trigger(input_data, config):
-            print(json.dumps({}))
-            return
-        ctx = build_context_from_input(input_data)
-        result = run_consensus(
-            mode=ctx["mode"],
-            context=ctx["content"],
-            file_path=ctx["file_path"],
-            config=config,
-        )
-        print(format_hook_output(result.summary))
+        print(handle(json.load(sys.stdin)))
     except Exception as e:
         print(json.dumps({"systemMessage": f"[Concensus error: {e}]"}))
     finally:
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+
+PLUGIN_ROOT = os.environ.get(
+    "CLAUDE_PLUGIN_ROOT", os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+if PLUGIN_ROOT not in sys.path:
+    sys.path.insert(0, PLUGIN_ROOT)
+
+from core.config import load_config
+from hooks.posttooluse import should_trigger, build_context_from_input, change_may_trigger, sample
+
+
+def precheck(event) -> bool:
+    config = load_config()
+    if not config.get("speculative_review_enabled", False) or config.get("changeset_mode", False):
+        return False
+    return change_may_trigger(event, config)
+
+
+def handle(input_data: dict) -> str:
+    """Start the review in the background; never blocks or alters the tool call."""
+    config = load_config()
+    if not config.get("speculative_review_enabled", False):
+        return json.dumps({})
+    if config.get("changeset_mode", False) or not should_trigger(input_data, config):
+        return json.dumps({})
+    from core.router import route_change
+
+    ctx = build_context_from_input(input_data)
+    route = route_change(ctx["file_path"], ctx["content"], config)
+    if route is not None and route.tier == "skip":
+        return json.dumps({})
+    decision = sample(input_data, ctx, route, config)
+    if decision is not None and not decision.review:
+        return json.dumps({})
+    from core.speculation import start_speculation
+
+    start_speculation(config, input_data, ctx)
+    return json.dumps({})
+
+
+def main():
+    try:
+        print(handle(json.load(sys.stdin)))
+    except Exception as e:
+        print(json.dumps({"systemMessage": f"[Concensus pretooluse hook error: {e}]"}))
+    finally:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
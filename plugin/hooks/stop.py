@@ -2,7 +2,6 @@
 import os
 import sys
 import json
-import re
 
 PLUGIN_ROOT = os.environ.get(
     "CLAUDE_PLUGIN_ROOT", os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -11,59 +10,23 @@ if PLUGIN_ROOT not in sys.path:
     sys.path.insert(0, PLUGIN_ROOT)
 
 from core.config import load_config
-from core.consensus_engine import run_consensus
-
-DESIGN_PATTERNS = [
-    r"\b(architect(?:ure|ural))\b",
-    r"\b(design pattern|observer|singleton|factory|strategy)\b",
-    r"\b(microservice|monolith|event[- ]driven|serverless)\b",
-    r"\b(trade[- ]?off|pros?\s+and\s+cons?)\b",
-    r"\b(I (?:recommend|suggest|propose)\s+(?:we|to)\s+(?:use|implement|adopt))\b",
-    r"\b((?:two|three|multiple)\s+(?:options?|approaches?|alternatives?))\b",
-    r"\b(database\s+(?:schema|design|model))\b",
-    r"\b(API\s+(?:design|structure|contract))\b",
-    r"\b(state\s+management|caching\s+strategy|auth(?:entication)?\s+(?:flow|method))\b",
-]
-
-PLAN_PATTERNS = [
-    r"\bstep\s+[1-9]\b",
-    r"\bphase\s+[1-9]\b",
-    r"\bimplementation\s+plan\b",
-    r"\bmilestone\s+\d+\b",
-    r"(?:^|\n)\s*\d+\.\s+\S.*(?:\n\s*\d+\.\s+\S.*){2,}",
-]
-
-RESEARCH_PATTERNS = [
-    r"\bfindings?\b",
-    r"\bevidence\s+suggests?\b",
-    r"\bcomparison\s+of\b",
-    r"\bbenchmarks?\b",
-    r"\banalysis\s+(?:shows?|indicates?|reveals?)\b",
-    r"\bour\s+investigation\b",
-]
-
-DESIGN_REGEX = re.compile("|".join(DESIGN_PATTERNS), re.IGNORECASE)
-PLAN_REGEX = re.compile("|".join(PLAN_PATTERNS), re.IGNORECASE | re.MULTILINE)
-RESEARCH_REGEX = re.compile("|".join(RESEARCH_PATTERNS), re.IGNORECASE)
 
 
 def detect_design_decision(text: str) -> bool:
     if len(text) < 50:
         return False
-    return bool(DESIGN_REGEX.search(text))
+    from core.classifier import classify
 
+    return classify(text).count("design") > 0
 
-def detect_content_type(text: str) -> str | None:
+
+def detect_content_type(text: str, thresholds: dict | None = None) -> str | None:
     """Detect content type with priority: plan > research > design > None."""
     if len(text) < 50:
         return None
-    if PLAN_REGEX.search(text):
-        return "plan"
-    if RESEARCH_REGEX.search(text):
-        return "research"
-    if DESIGN_REGEX.search(text):
-        return "design"
-    return None
+    from core.classifier import classify
+
+    return classify(text).content_type(thresholds)
 
 
 def format_stop_output(context: str) -> str:
@@ -83,44 +46,102 @@ def format_consensus_output(consensus_summary: str) -> str:
     })
 
 
+def format_changeset_output(file_results: str, consensus_summary: str) -> str:
+    return json.dumps({
+        "systemMessage": f"[CONSENSUS REVIEW - CHANGESET]\n{file_results}\n\n{consensus_summary}"
+    })
+
+
+def review_changeset(session_id: str, config: dict) -> str | None:
+    """Review every file journaled by PostToolUse this turn in one consensus run."""
+    from core.changeset import (
+        load_changeset,
+        clear_changeset,
+        build_changeset_context,
+        format_file_results,
+    )
+    from core.consensus_engine import ConsensusStatus, run_consensus
+
+    changeset = load_changeset(config, session_id)
+    if not changeset:
+        return None
+    file_paths = list(changeset)
+    result = run_consensus(
+        mode="changeset",
+        context=build_changeset_context(
+            changeset, config.get("changeset_max_file_chars", 4000)
+        ),
+        file_path=", ".join(file_paths),
+        config=config,
+        session_id=session_id,
+    )
+    # Only once reviewed: a failed or skipped run (e.g. no model answered)
+    # keeps the journal for the next Stop.
+    if result.status != ConsensusStatus.SKIPPED:
+        clear_changeset(config, session_id)
+    return format_changeset_output(
+        format_file_results(result.responses, file_paths), result.summary
+    )
+
+
+def read_transcript_tail(transcript_path: str, max_chars: int = 2000) -> str | None:
+    """Read only the end of the transcript; it can grow to many megabytes."""
+    try:
+        with open(transcript_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - max_chars * 4))
+            content = f.read().decode("utf-8", errors="ignore")
+    except OSError:
+        return None
+    return content[-max_chars:]
+
+
+def handle(input_data: dict) -> str:
+    if input_data.get("stop_hook_active", False):
+        return json.dumps({})
+
+    config = load_config()
+    if not config.get("enabled", True):
+        return json.dumps({})
+
+    if config.get("speculative_review_enabled", False):
+        from core.speculation import discard_stale
+
+        discard_stale(config, session_id=input_data.get("session_id", ""))
+
+    if config.get("changeset_mode", False):
+        output = review_changeset(input_data.get("session_id", ""), config)
+        if output:
+            return output
+
+    transcript_path = input_data.get("transcript_path", "")
+    assistant_text = input_data.get("reason", "")
+    if transcript_path and os.path.exists(transcript_path):
+        assistant_text = read_transcript_tail(transcript_path) or assistant_text
+
+    from core.classifier import thresholds_from_config
+
+    content_type = detect_content_type(assistant_text, thresholds_from_config(config))
+
+    if content_type in ("plan", "research"):
+        from core.consensus_engine import run_consensus
+
+        result = run_consensus(
+            mode=content_type,
+            context=assistant_text,
+            config=config,
+            session_id=input_data.get("session_id", ""),
+        )
+        return format_consensus_output(result.summary)
+    if content_type == "design":
+        return format_stop_output(assistant_text[:500])
+    return json.dumps({})
+
+
 def main():
     try:
-        input_data = json.load(sys.stdin)
-
-        if input_data.get("stop_hook_active", False):
-            print(json.dumps({}))
-            sys.exit(0)
-
-        config = load_config()
-        if not config.get("enabled", True):
-            print(json.dumps({}))
-            sys.exit(0)
-
-        transcript_path = input_data.get("transcript_path", "")
-        reason = input_data.get("reason", "")
-        assistant_text = reason
-
-        if transcript_path and os.path.exists(transcript_path):
-            try:
-                with open(transcript_path, "r") as f:
-                    content = f.read()
-                assistant_text = content[-2000:] if len(content) > 2000 else content
-            except (IOError, UnicodeDecodeError):
-                pass
-
-        content_type = detect_content_type(assistant_text)
-
-        if content_type in ("plan", "research"):
-            result = run_consensus(
-                mode=content_type,
-                context=assistant_text[:4000],
-                config=config,
-            )
-            print(format_consensus_output(result.summary))
-        elif content_type == "design":
-            print(format_stop_output(assistant_text[:500]))
-        else:
-            print(json.dumps({}))
+        print(handle(json.load(sys.stdin)))
     except Exception as e:
         print(json.dumps({"systemMessage": f"[Concensus stop hook error: {e}]"}))
     finally:
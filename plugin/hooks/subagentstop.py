@@ -10,12 +10,20 @@ if PLUGIN_ROOT not in sys.path:
     sys.path.insert(0, PLUGIN_ROOT)
 
 from core.config import load_config
-from core.consensus_engine import run_consensus
 
 VALIDATED_AGENT_TYPES = {"Explore", "Plan"}
 MIN_MESSAGE_LENGTH = 200
 
 
+def precheck(event) -> bool:
+    config = load_config()
+    if not config.get("enabled", True) or not config.get("subagent_consensus_enabled", True):
+        return False
+    if event.field("agent_type", default="") not in VALIDATED_AGENT_TYPES:
+        return False
+    return event.size("last_assistant_message") >= MIN_MESSAGE_LENGTH
+
+
 def should_trigger(input_data: dict, config: dict) -> bool:
     if not config.get("enabled", True):
         return False
@@ -27,6 +35,13 @@ def should_trigger(input_data: dict, config: dict) -> bool:
     message = input_data.get("last_assistant_message", "")
     if len(message) < MIN_MESSAGE_LENGTH:
         return False
+    min_matches = config.get("subagent_min_matches", 0)
+    if min_matches > 0:
+        from core.classifier import classify, CONTENT_PATTERNS
+
+        counts = classify(message).counts
+        if sum(counts[category] for category in CONTENT_PATTERNS) < min_matches:
+            return False
     return True
 
 
@@ -36,22 +51,25 @@ def format_hook_output(consensus_summary: str) -> str:
     })
 
 
+def handle(input_data: dict) -> str:
+    config = load_config()
+    if not should_trigger(input_data, config):
+        return json.dumps({})
+    from core.consensus_engine import run_consensus
+
+    message = input_data.get("last_assistant_message", "")
+    result = run_consensus(
+        mode="research",
+        context=message,
+        config=config,
+        session_id=input_data.get("session_id", ""),
+    )
+    return format_hook_output(result.summary)
+
+
 def main():
     try:
-        input_data = json.load(sys.stdin)
-        config = load_config()
-
-        if not should_trigger(input_data, config):
-            print(json.dumps({}))
-            return
-
-        message = input_data.get("last_assistant_message", "")
-        result = run_consensus(
-            mode="research",
-            context=message[:4000],
-            config=config,
-        )
-        print(format_hook_output(result.summary))
+        print(handle(json.load(sys.stdin)))
     except Exception as e:
         print(json.dumps({"systemMessage": f"[Concensus subagentstop hook error: {e}]"}))
     finally:
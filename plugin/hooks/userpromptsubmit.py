@@ -2,7 +2,6 @@
 import os
 import sys
 import json
-import re
 
 PLUGIN_ROOT = os.environ.get(
     "CLAUDE_PLUGIN_ROOT", os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -11,37 +10,26 @@ if PLUGIN_ROOT not in sys.path:
     sys.path.insert(0, PLUGIN_ROOT)
 
 from core.config import load_config
-from core.consensus_engine import run_consensus
-
-SIGNAL_WORDS = re.compile(
-    r"\b(implement|design|architect|build|create|migrate|refactor|"
-    r"restructure|overhaul|integrate|deploy|introduce|establish|"
-    r"replace|rewrite|convert)\b",
-    re.IGNORECASE,
-)
-
-QUESTION_START = re.compile(
-    r"^\s*(what|how|why|where|when|who|which|can|could|is|are|do|does)\b",
-    re.IGNORECASE,
-)
-
-ACTION_WORDS = re.compile(
-    r"\b(implement|build|create|make|add|set up|deploy|migrate|refactor)\b",
-    re.IGNORECASE,
-)
 
 
 def count_signal_words(text: str) -> int:
-    return len(SIGNAL_WORDS.findall(text))
+    from core.classifier import classify
+
+    return classify(text).count("signal")
 
 
 def is_pure_question(text: str) -> bool:
     """Detect pure questions with no actionable intent."""
-    if not QUESTION_START.search(text):
-        return False
-    if ACTION_WORDS.search(text):
+    from core.classifier import classify
+
+    return classify(text).pure_question
+
+
+def precheck(event) -> bool:
+    config = load_config()
+    if not config.get("enabled", True) or not config.get("prompt_consensus_enabled", False):
         return False
-    return True
+    return event.size("prompt") >= config.get("prompt_consensus_min_length", 100)
 
 
 def should_trigger(prompt: str, config: dict) -> bool:
@@ -52,14 +40,16 @@ def should_trigger(prompt: str, config: dict) -> bool:
     min_length = config.get("prompt_consensus_min_length", 100)
     if len(prompt) < min_length:
         return False
-    if is_pure_question(prompt):
+    from core.classifier import classify, thresholds_from_config
+
+    classification = classify(prompt)
+    if classification.pure_question:
+        return False
+    # Score is the signal-word count plus one for a long prompt, so one signal
+    # word in a long prompt meets the default threshold of 2.
+    if classification.count("signal") == 0:
         return False
-    signal_count = count_signal_words(prompt)
-    if signal_count >= 2:
-        return True
-    if signal_count >= 1 and len(prompt) >= 200:
-        return True
-    return False
+    return classification.score >= thresholds_from_config(config)["signal"]
 
 
 def format_hook_output(consensus_summary: str) -> str:
@@ -68,22 +58,25 @@ def format_hook_output(consensus_summary: str) -> str:
     })
 
 
+def handle(input_data: dict) -> str:
+    config = load_config()
+    prompt = input_data.get("prompt", "")
+    if not should_trigger(prompt, config):
+        return json.dumps({})
+    from core.consensus_engine import run_consensus
+
+    result = run_consensus(
+        mode="direction",
+        context=prompt,
+        config=config,
+        session_id=input_data.get("session_id", ""),
+    )
+    return format_hook_output(result.summary)
+
+
 def main():
     try:
-        input_data = json.load(sys.stdin)
-        config = load_config()
-        prompt = input_data.get("prompt", "")
-
-        if not should_trigger(prompt, config):
-            print(json.dumps({}))
-            return
-
-        result = run_consensus(
-            mode="direction",
-            context=prompt,
-            config=config,
-        )
-        print(format_hook_output(result.summary))
+        print(handle(json.load(sys.stdin)))
     except Exception as e:
         print(json.dumps({"systemMessage": f"[Concensus userpromptsubmit hook error: {e}]"}))
     finally:
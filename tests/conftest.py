@@ -1,6 +1,7 @@
 import os
 import sys
 import json
+import stat
 import pytest
 
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
@@ -30,3 +31,19 @@ class SnapshotE2E:
 @pytest.fixture
 def snapshot_e2e():
     return SnapshotE2E()
+
+
+@pytest.fixture
+def fake_cli(tmp_path, monkeypatch):
+    """Install a fake model CLI on PATH: fake_cli("gemini", python_source)."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+
+    def install(name, source):
+        path = bin_dir / name
+        path.write_text(f"#!{sys.executable}\n{source}")
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+        return str(path)
+
+    return install
@@ -0,0 +1,83 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.agreement import category_for, choose_panel, locked_stats, record_round, pair_agreement
+
+CONFIG = {"adaptive_agreement_threshold": 0.9, "adaptive_min_samples": 5, "adaptive_window": 10,
+          "adaptive_audit_every": 3}
+CATEGORY = "code|.py|src"
+
+
+def _stats_with(outcomes, latency=None):
+    stats = {"version": 1, "categories": {}}
+    for agree in outcomes:
+        verdicts = {"gemini": "APPROVE", "codex": "APPROVE" if agree else "CONCERNS"}
+        record_round(stats, CATEGORY, verdicts, latency or {"gemini": 3000, "codex": 1000}, CONFIG)
+    return stats
+
+
+def test_category_for(monkeypatch, tmp_path):
+    monkeypatch.setenv("CLAUDE_PROJECT_DIR", str(tmp_path))
+    assert category_for("code", str(tmp_path / "src" / "api" / "app.py")) == "code|.py|src"
+    assert category_for("code", "Makefile") == "code|-|."
+    assert category_for("plan", "") == "plan|*|*"
+    assert category_for("changeset", "a.py, b.py") == "changeset|*|*"
+
+
+def test_record_round_keeps_rolling_window():
+    stats = _stats_with([False] * 5 + [True] * 10)
+    entry = stats["categories"][CATEGORY]
+    assert pair_agreement(entry, "codex", "gemini") == (1.0, 10)
+    assert entry["latency"] == {"gemini": 3000, "codex": 1000}
+
+
+def test_full_panel_until_enough_agreeing_samples():
+    models = ["gemini", "codex"]
+    assert choose_panel(_stats_with([True] * 4), CATEGORY, models, CONFIG).models == models
+    assert choose_panel(_stats_with([True, False] * 5), CATEGORY, models, CONFIG).models == models
+
+
+def test_shrinks_to_fastest_model_with_periodic_audit():
+    stats = _stats_with([True] * 10)
+    models = ["gemini", "codex"]
+    first = choose_panel(stats, CATEGORY, models, CONFIG)
+    assert first.models == ["codex"]
+    assert "agreement 100% over 10" in first.describe()
+    assert choose_panel(stats, CATEGORY, models, CONFIG).models == ["codex"]
+    audit = choose_panel(stats, CATEGORY, models, CONFIG)
+    assert audit.audit is True and audit.models == models
+    assert choose_panel(stats, CATEGORY, models, CONFIG).models == ["codex"]
+
+
+def test_audit_disagreements_restore_full_panel():
+    stats = _stats_with([True] * 10)
+    for _ in range(2):
+        record_round(stats, CATEGORY, {"gemini": "APPROVE", "codex": "CONCERNS"}, {}, CONFIG)
+    assert choose_panel(stats, CATEGORY, ["gemini", "codex"], CONFIG).models == ["gemini", "codex"]
+
+
+def test_locked_stats_persists(tmp_path):
+    config = {"state_dir": str(tmp_path)}
+    with locked_stats(config) as stats:
+        record_round(stats, CATEGORY, {"gemini": "APPROVE", "codex": "APPROVE"}, {}, CONFIG)
+    with open(tmp_path / "agreement.json") as f:
+        assert json.load(f)["categories"][CATEGORY]["pairs"] == {"codex+gemini": "1"}
+
+
+def test_run_consensus_logs_panel_change(tmp_path, fake_cli, monkeypatch):
+    from core.consensus_engine import run_consensus
+
+    monkeypatch.chdir(tmp_path)
+    fake_cli("codex", (
+        "import json\n"
+        "print(json.dumps({'type': 'item.completed', 'item': {'type': 'agent_message', 'text': 'VERDICT: APPROVE'}}))\n"
+    ))
+    config = {"state_dir": str(tmp_path / "state"), "adaptive_panel_enabled": True,
+              "models": ["gemini", "codex"], "cli_timeout": 10, **CONFIG}
+    with locked_stats(config) as stats:
+        stats.update(_stats_with([True] * 10))
+    result = run_consensus("code", "x = 1\n", file_path="src/app.py", config=config)
+    assert "⟐ Panel: codex (agreement 100% over 10 code|.py|src reviews)" in result.summary
+    assert "⟐ Queried: codex" in result.summary
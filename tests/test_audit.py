@@ -0,0 +1,112 @@
+import os
+import sys
+import json
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core import audit
+from core.cli import main
+
+# Approves unless the prompt contains "danger"; counts calls next to the script.
+GEMINI = (
+    "import os, sys\n"
+    "open(os.path.join(os.path.dirname(sys.argv[0]), 'calls'), 'a').write('x')\n"
+    "print('VERDICT: CONCERNS uses danger()' if 'danger' in sys.argv[-1] else 'VERDICT: APPROVE')\n"
+)
+CONFIG = "---\nmodels:\n  - gemini\ncli_timeout: 10\nmin_change_lines: 2\ndebate_rounds: 0\n---\n"
+
+
+def _project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".claude").mkdir()
+    (tmp_path / ".claude" / "concensus.local.md").write_text(CONFIG)
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "ok.py").write_text("def ok():\n    return 1\n")
+    (src / "bad.py").write_text("def bad():\n    return danger()\n")
+    (src / "tiny.py").write_text("x = 1\n")
+    (src / "blob.bin").write_bytes(b"\0\1\2\n\n\n")
+    (tmp_path / "README.md").write_text("# Title\n\ntext\n")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "dep.js").write_text("a()\nb()\n")
+
+
+def _calls(script):
+    path = os.path.join(os.path.dirname(script), "calls")
+    return len(open(path).read()) if os.path.exists(path) else 0
+
+
+def test_audit_tree_json_report_and_resume(tmp_path, monkeypatch, fake_cli, capsys):
+    script = fake_cli("gemini", GEMINI)
+    _project(tmp_path, monkeypatch)
+    assert main(["audit", "src", "README.md", "--fail-on-concerns", "--jobs", "2"]) == 1
+    out = capsys.readouterr()
+    report = json.loads(out.out)
+    by_path = {r["path"]: r for r in report["results"]}
+    assert sorted(by_path) == ["src/bad.py", "src/ok.py"]
+    assert by_path["src/ok.py"]["verdicts"] == {"gemini": "APPROVE"}
+    assert "danger" in by_path["src/bad.py"]["concerns"]["gemini"]
+    assert report["summary"]["with_concerns"] == 1
+    assert "[2/2]" in out.err
+    assert _calls(script) == 2
+
+    assert main(["audit", "src", "README.md"]) == 0
+    resumed = json.loads(capsys.readouterr().out)
+    assert all(r["resumed"] for r in resumed["results"])
+    assert _calls(script) == 2
+
+
+def test_audit_sarif_for_diff_range(tmp_path, monkeypatch, fake_cli, capsys):
+    fake_cli("gemini", GEMINI)
+    _project(tmp_path, monkeypatch)
+    git = ["git", "-c", "user.email=a@b", "-c", "user.name=a"]
+    subprocess.run(["git", "init", "-q"], check=True)
+    subprocess.run([*git, "add", "src"], check=True)
+    subprocess.run([*git, "commit", "-qm", "base"], check=True)
+    (tmp_path / "src" / "ok.py").write_text("def ok():\n    return danger()\n\n\ndef more():\n    pass\n")
+    subprocess.run([*git, "commit", "-qam", "change"], check=True)
+
+    assert main(["audit", "--diff", "HEAD~1..HEAD", "--format", "sarif", "--no-checkpoint"]) == 0
+    sarif = json.loads(capsys.readouterr().out)
+    assert sarif["version"] == "2.1.0"
+    results = sarif["runs"][0]["results"]
+    assert len(results) == 1
+    assert results[0]["locations"][0]["physicalLocation"]["artifactLocation"]["uri"] == "src/ok.py"
+    assert results[0]["level"] == "warning"
+
+
+def test_budget_stops_new_work(tmp_path):
+    items = [audit.AuditItem(f"f{i}.py", f"x = {i}\n") for i in range(3)]
+    results = audit.run_audit(items, {}, jobs=1, budget=1e-9, progress=lambda msg: None)
+    assert [r.status for r in results] == ["NOT_REVIEWED"] * 3
+
+
+def test_diff_items_handle_unusual_paths_and_git_errors(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    git = ["git", "-c", "user.email=a@b", "-c", "user.name=a"]
+    subprocess.run(["git", "init", "-q"], check=True)
+    names = ["my file.py", "café.py"]
+    for name in names:
+        (tmp_path / name).write_text("a = 1\n")
+    subprocess.run([*git, "add", "."], check=True)
+    subprocess.run([*git, "commit", "-qm", "base"], check=True)
+    for name in names:
+        (tmp_path / name).write_text("a = 1\nb = 2\nc = 3\n")
+    subprocess.run([*git, "commit", "-qam", "change"], check=True)
+    items = audit.diff_items("HEAD~1..HEAD", {"min_change_lines": 1}, 1 << 20)
+    assert sorted(i.path for i in items) == sorted(names)
+    assert all("+b = 2" in i.context and not i.error for i in items)
+
+    real_run = subprocess.run
+
+    def failing_diff(argv, **kwargs):
+        if "--" in argv and argv[-1] == "café.py":
+            raise subprocess.CalledProcessError(128, argv, stderr="fatal: bad path")
+        return real_run(argv, **kwargs)
+
+    monkeypatch.setattr(audit.subprocess, "run", failing_diff)
+    items = audit.diff_items("HEAD~1..HEAD", {"min_change_lines": 1}, 1 << 20)
+    errors = [i for i in items if i.error]
+    assert [i.path for i in errors] == ["café.py"] and "fatal: bad path" in errors[0].error
+    results = audit.run_audit(errors, {}, progress=lambda msg: None)
+    assert [(r.path, r.status) for r in results] == [("café.py", "ERROR")]
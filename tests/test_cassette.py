@@ -0,0 +1,71 @@
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.cli_runner import RunOptions, run_codex, run_gemini, run_options_from_config
+
+COUNTER_GEMINI = (
+    "import os, sys, time\n"
+    "time.sleep(0.2)\n"
+    "path = os.path.join(os.path.dirname(sys.argv[0]), 'calls')\n"
+    "n = int(open(path).read()) + 1 if os.path.exists(path) else 1\n"
+    "open(path, 'w').write(str(n))\n"
+    "print(f'VERDICT: APPROVE call {n}')\n"
+    "print('warning', file=sys.stderr)\n"
+)
+
+
+def _options(path, mode, latency=0.0):
+    return RunOptions(cassette_mode=mode, cassette_path=str(path), cassette_latency=latency)
+
+
+def test_record_writes_invocation(tmp_path, fake_cli):
+    fake_cli("gemini", COUNTER_GEMINI)
+    path = tmp_path / "c.jsonl"
+    result = run_gemini("review this", timeout=10, options=_options(path, "record"))
+    assert result.output == "VERDICT: APPROVE call 1"
+    entry = json.loads(path.read_text())
+    assert entry["model"] == "gemini"
+    assert "{prompt}" in entry["argv"] and "review this" not in entry["argv"]
+    assert entry["returncode"] == 0 and entry["stderr"].strip() == "warning"
+    assert entry["duration_ms"] >= 200
+
+
+def test_replay_serves_recorded_calls_in_order(tmp_path, fake_cli):
+    fake_cli("gemini", COUNTER_GEMINI)
+    path = tmp_path / "c.jsonl"
+    for _ in range(2):
+        run_gemini("same", timeout=10, options=_options(path, "record"))
+    os.remove(fake_cli("gemini", ""))
+
+    replay = _options(path, "replay")
+    outputs = [run_gemini("same", timeout=10, options=replay).output for _ in range(3)]
+    assert outputs == ["VERDICT: APPROVE call 1", "VERDICT: APPROVE call 2", "VERDICT: APPROVE call 2"]
+
+    missing = run_codex("same", timeout=10, options=replay)
+    assert not missing.success and "No cassette entry for codex" in missing.error
+
+
+def test_replay_latency_scaling(tmp_path, fake_cli):
+    fake_cli("gemini", COUNTER_GEMINI)
+    path = tmp_path / "c.jsonl"
+    run_gemini("p", timeout=10, options=_options(path, "record"))
+
+    started = time.monotonic()
+    instant = run_gemini("p", timeout=10, options=_options(path, "replay"))
+    assert time.monotonic() - started < 0.15
+    assert instant.duration_ms >= 200
+
+    started = time.monotonic()
+    run_gemini("p", timeout=10, options=_options(path, "replay", latency=1.0))
+    assert time.monotonic() - started >= 0.2
+
+
+def test_run_options_from_config_resolves_cassette(tmp_path):
+    config = {"state_dir": str(tmp_path), "cassette_mode": "replay", "cassette": "ci"}
+    options = run_options_from_config(config)
+    assert options.cassette_mode == "replay"
+    assert options.cassette_path == os.path.join(str(tmp_path), "cassettes", "ci.jsonl")
+    assert run_options_from_config({"cassette_mode": "off"}).cassette_mode == ""
@@ -0,0 +1,84 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.changeset import (
+    record_edit,
+    load_changeset,
+    clear_changeset,
+    build_changeset_context,
+    extract_file_verdicts,
+    format_file_results,
+)
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {"state_dir": str(tmp_path / "state")}
+
+
+def _write(path, content):
+    return {"tool_name": "Write", "tool_input": {"file_path": path, "content": content}}
+
+
+def _edit(path, old, new):
+    return {
+        "tool_name": "Edit",
+        "tool_input": {"file_path": path, "old_string": old, "new_string": new},
+    }
+
+
+def test_record_and_load_groups_by_file(config):
+    record_edit(config, "s1", _write("src/a.py", "def a(): pass\n"))
+    record_edit(config, "s1", _edit("src/b.py", "x = 0", "x = 1"))
+    record_edit(config, "s1", _edit("src/a.py", "pass", "return 1"))
+    record_edit(config, "s2", _write("src/c.py", "c = 1\n"))
+    changeset = load_changeset(config, "s1")
+    assert list(changeset) == ["src/a.py", "src/b.py"]
+    assert len(changeset["src/a.py"]) == 2
+
+
+def test_clear_changeset(config):
+    record_edit(config, "s1", _write("src/a.py", "a = 1\n"))
+    clear_changeset(config, "s1")
+    assert load_changeset(config, "s1") == {}
+
+
+def test_build_context_has_per_file_sections(config):
+    record_edit(config, "s1", _write("src/a.py", "def a(): pass\n"))
+    record_edit(config, "s1", _edit("src/b.py", "x = 0", "x = 1"))
+    context = build_changeset_context(load_changeset(config, "s1"))
+    assert "- src/a.py (1 edit(s))" in context
+    assert "### FILE: src/a.py" in context
+    assert "### FILE: src/b.py" in context
+    assert "+++ with:\nx = 1" in context
+
+
+def test_build_context_truncates_large_files(config):
+    record_edit(config, "s1", _write("src/a.py", "x" * 100))
+    context = build_changeset_context(load_changeset(config, "s1"), max_file_chars=10)
+    assert "... (truncated)" in context
+
+
+def test_extract_file_verdicts():
+    text = (
+        "VERDICT: CONCERNS\n"
+        "FILE: src/a-b.py — APPROVE\n"
+        "FILE: `c.py`: CONCERNS\n"
+        "- c.py: off-by-one"
+    )
+    verdicts = extract_file_verdicts(text, ["src/a-b.py", "/project/src/c.py"])
+    assert verdicts == {"src/a-b.py": "APPROVE", "/project/src/c.py": "CONCERNS"}
+
+
+def test_format_file_results_skips_errors_and_claude():
+    responses = {
+        "claude": "(Original author)",
+        "gemini": "VERDICT: APPROVE\nFILE: a.py — APPROVE",
+        "codex": "[Error: Timeout]",
+    }
+    text = format_file_results(responses, ["a.py", "b.py"])
+    assert "a.py: gemini APPROVE" in text
+    assert "b.py: gemini ?" in text
+    assert "codex" not in text
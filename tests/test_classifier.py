@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.classifier import classify, thresholds_from_config, DEFAULT_THRESHOLDS
+
+
+def test_classify_counts_each_category():
+    text = (
+        "Our findings from the benchmarks favor an event-driven architecture. "
+        "Step 1: implement the queue. Step 2: migrate the consumers."
+    )
+    result = classify(text)
+    assert result.count("research") == 2
+    assert result.count("design") == 2
+    assert result.count("plan") == 2
+    assert result.count("signal") == 2
+    assert result.count("action") == 2
+
+
+def test_classify_numbered_list_needs_three_consecutive_items():
+    assert classify("Do this:\n1. one\n2. two\n3. three\n").count("plan") == 1
+    assert classify("1. one\n\n2. two\n  3. three").count("plan") == 1
+    assert classify("1. one\nsome prose\n2. two\n3. three").count("plan") == 0
+
+
+def test_classify_counts_verbs_inside_phrases_and_lists():
+    result = classify("We should review the database design.\n1. build it\n2. deploy it\n3. test")
+    assert result.count("design") == 1
+    assert result.count("signal") == 3  # design, build, deploy
+
+
+def test_classify_question_and_score():
+    question = classify("How does Redis handle persistence?")
+    assert question.pure_question is True
+    assert classify("How do I set up caching?").pure_question is False
+    assert classify("x " * 100 + "refactor").score == 2
+    assert classify("refactor").score == 1
+
+
+def test_content_type_priority_and_thresholds():
+    text = "Our findings show a microservice split. Step 1: extract the auth service."
+    assert classify(text).content_type() == "plan"
+    assert classify(text).content_type({"plan": 2, "research": 1, "design": 1}) == "research"
+    assert classify("plain text only").content_type() is None
+
+
+def test_thresholds_from_config():
+    assert thresholds_from_config({}) == DEFAULT_THRESHOLDS
+    thresholds = thresholds_from_config({"classifier_thresholds": ["design=3", "bogus=x"]})
+    assert thresholds["design"] == 3
+    assert thresholds["plan"] == 1
+
+
+def test_classify_scales_linearly_on_long_text():
+    text = ("The monolith trade-off findings suggest we refactor. 1. a\n" * 20000)
+    start = time.monotonic()
+    result = classify(text)
+    assert time.monotonic() - start < 2
+    assert result.count("design") == 40000
@@ -43,3 +43,165 @@ def test_run_gemini_timeout():
     result = run_gemini("Count to a million slowly", timeout=1)
     assert result.success is False
     assert result.error is not None
+
+
+# --- bounded streaming reader tests (fake CLIs, no network) ---
+
+def test_gemini_output_is_capped_and_truncation_recorded(fake_cli):
+    from core.cli_runner import RunOptions
+    fake_cli("gemini", "import sys\nsys.stdout.write('x' * 500000)\n")
+    result = run_gemini("p", timeout=10, options=RunOptions(max_stdout_bytes=1000))
+    assert result.success is True
+    assert len(result.output) == 1000
+    assert result.truncated is True
+    assert result.peak_buffer_bytes <= 1000 + 65536
+
+
+def test_gemini_small_output_not_truncated(fake_cli):
+    fake_cli("gemini", "print('VERDICT: APPROVE')\n")
+    result = run_gemini("p", timeout=10)
+    assert result.output == "VERDICT: APPROVE"
+    assert result.truncated is False
+    assert result.peak_rss_kb > 0
+
+
+def test_codex_discards_irrelevant_events(fake_cli):
+    from core.cli_runner import RunOptions
+    fake_cli("codex", (
+        "import json\n"
+        "for i in range(2000):\n"
+        "    print(json.dumps({'type': 'item.completed', 'item': {'type': 'command_execution', 'aggregated_output': 'y' * 1000}}))\n"
+        "print(json.dumps({'type': 'item.completed', 'item': {'type': 'agent_message', 'text': 'VERDICT: APPROVE'}}))\n"
+    ))
+    result = run_codex("p", timeout=10, options=RunOptions(max_stdout_bytes=4096))
+    assert result.success is True
+    assert result.output == "VERDICT: APPROVE"
+    assert result.truncated is False
+    assert result.peak_buffer_bytes < 4096 + 65536
+
+
+def test_failed_cli_reports_stderr(fake_cli):
+    fake_cli("gemini", "import sys\nsys.stderr.write('quota exceeded')\nsys.exit(3)\n")
+    result = run_gemini("p", timeout=10)
+    assert result.success is False
+    assert result.error == "quota exceeded"
+
+
+def test_fake_cli_timeout(fake_cli):
+    fake_cli("gemini", "import time\ntime.sleep(30)\n")
+    result = run_gemini("p", timeout=1)
+    assert result.success is False
+    assert result.error == "Timeout"
+
+
+# --- process-group lifecycle tests ---
+
+GRANDCHILD_SCRIPT = (
+    "import os, subprocess, sys, time\n"
+    "pid_file = os.environ['CONCENSUS_TEST_PID_FILE']\n"
+    "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'],\n"
+    "                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)\n"
+    "open(pid_file, 'w').write(str(child.pid))\n"
+    "{tail}\n"
+)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    with open(f"/proc/{pid}/stat") as f:
+        return f.read().split()[2] != "Z"
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_timeout_kills_whole_process_group(fake_cli, tmp_path, monkeypatch):
+    pid_file = tmp_path / "grandchild.pid"
+    monkeypatch.setenv("CONCENSUS_TEST_PID_FILE", str(pid_file))
+    fake_cli("gemini", GRANDCHILD_SCRIPT.format(tail="time.sleep(60)"))
+    result = run_gemini("p", timeout=1)
+    assert result.error == "Timeout"
+    assert "SIGTERM" in result.reaped
+    assert not _pid_alive(int(pid_file.read_text()))
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_lingering_grandchild_reaped_after_normal_exit(fake_cli, tmp_path, monkeypatch):
+    pid_file = tmp_path / "grandchild.pid"
+    monkeypatch.setenv("CONCENSUS_TEST_PID_FILE", str(pid_file))
+    fake_cli("gemini", GRANDCHILD_SCRIPT.format(tail="print('VERDICT: APPROVE')"))
+    result = run_gemini("p", timeout=10)
+    assert result.success is True
+    assert result.output == "VERDICT: APPROVE"
+    assert result.reaped.startswith("pgid")
+    assert not _pid_alive(int(pid_file.read_text()))
+
+
+def test_isolated_cwd_and_limits(fake_cli, tmp_path):
+    from core.cli_runner import RunOptions
+    fake_cli("gemini", (
+        "import os, resource\n"
+        "print(os.getcwd() == os.environ['TMPDIR'], os.path.basename(os.getcwd()).startswith('concensus-'))\n"
+        "print(os.nice(0), resource.getrlimit(resource.RLIMIT_CPU)[0])\n"
+    ))
+    options = RunOptions(isolated_cwd=True, nice=5, rlimit_cpu_seconds=30)
+    result = run_gemini("p", timeout=10, options=options)
+    assert result.output.split("\n") == ["True True", f"{os.nice(0) + 5} 30"]
+    assert result.reaped == ""
+
+
+def test_limits_without_preexec_keep_missing_cli_error(fake_cli, monkeypatch, tmp_path):
+    from core.cli_runner import RunOptions
+    fake_cli("gemini", "print('VERDICT: APPROVE')\n")
+    monkeypatch.setenv("PATH", str(tmp_path / "bin"))
+    result = run_models_parallel("p", ["gemini", "codex"], timeout=10, options=RunOptions(nice=1))
+    by_model = {r.model: r for r in result}
+    assert by_model["gemini"].output == "VERDICT: APPROVE"
+    assert by_model["codex"].error == "codex CLI not found"
+
+
+# --- prompt transport (argv vs stdin) ---
+
+ECHO_TRANSPORT = (
+    "import sys\n"
+    "args = sys.argv[1:]\n"
+    "if args and args[-1] not in ('-', '--json') and args[0] != '--output-format':\n"
+    "    print(f'argv {len(args[-1].encode())}')\n"
+    "else:\n"
+    "    print(f'stdin {len(sys.stdin.buffer.read())} {args}')\n"
+)
+
+
+def test_small_prompt_passed_as_argument(fake_cli):
+    from core.cli_runner import RunOptions
+    fake_cli("gemini", ECHO_TRANSPORT)
+    result = run_gemini("short prompt", timeout=10, options=RunOptions())
+    assert result.output == "argv 12"
+
+
+def test_multi_megabyte_prompt_sent_over_stdin(fake_cli):
+    import time
+    from core.cli_runner import RunOptions
+    fake_cli("gemini", ECHO_TRANSPORT)
+    prompt = "é" * (2 * 1024 * 1024)
+    started = time.monotonic()
+    result = run_gemini(prompt, timeout=30, options=RunOptions())
+    assert result.output == f"stdin {4 * 1024 * 1024} []"
+    assert time.monotonic() - started < 10
+
+
+def test_codex_large_prompt_uses_dash_argument(fake_cli):
+    from core.cli_runner import RunOptions
+    fake_cli("codex", "import sys, json\n"
+             "text = 'stdin %d %s' % (len(sys.stdin.buffer.read()), sys.argv[1:])\n"
+             "print(json.dumps({'type': 'item.completed', 'item': {'type': 'agent_message', 'text': text}}))\n")
+    result = run_codex("x" * 300_000, timeout=10, options=RunOptions())
+    assert result.output == "stdin 300000 ['exec', '--json', '-']"
+
+
+def test_e2big_falls_back_to_stdin(fake_cli):
+    from core.cli_runner import RunOptions
+    fake_cli("gemini", ECHO_TRANSPORT)
+    result = run_gemini("x" * 200_000, timeout=10, options=RunOptions(argv_prompt_max_bytes=10**9))
+    assert result.output == "stdin 200000 []"
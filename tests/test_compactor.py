@@ -0,0 +1,136 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.compactor import budget_for, compact, compact_for_mode, estimate_tokens
+
+
+def _function(name, body_lines):
+    body = "\n".join(f"    total += step_{i}(value)  # accumulate" for i in range(body_lines))
+    return f"def {name}(value):\n    total = 0\n{body}\n    return total\n"
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("def f(x): return x") == 9
+    assert estimate_tokens("internationalization") == 5
+
+
+def test_within_budget_is_unchanged():
+    text = "x = 1\n\n\n\ny = 2"
+    result = compact(text, 100, code=True)
+    assert result.text == text and not result.compacted and not result.steps
+
+
+def test_blank_runs_and_comments_removed_first():
+    text = "x = 1   \n\n\n\n# explain x\n" + "# more\n" * 20 + "y = 2\n"
+    result = compact(text, 10, code=True, file_path="x.py")
+    assert result.text == "x = 1\n\ny = 2"
+    assert result.steps == ["whitespace", "comments"]
+
+
+def test_c_preprocessor_and_pointer_lines_are_not_comments():
+    text = (
+        "#include <stdio.h>\n#define MAX 10\n/* block\n * comment\n */\n"
+        "// line comment\nvoid f(int *p) {\n    *p = MAX;\n    /* one-line */\n}\n"
+    )
+    result = compact(text + "// pad\n" * 40, 30, code=True, file_path="src/main.c")
+    assert result.text == "#include <stdio.h>\n#define MAX 10\nvoid f(int *p) {\n    *p = MAX;\n}"
+    assert result.steps == ["whitespace", "comments"]
+
+
+def test_python_star_args_are_not_comments():
+    text = "def f(\n    *args,\n    **kwargs,\n):\n    # note\n    return args\n" + "# pad\n" * 40
+    result = compact(text, 25, code=True, file_path="f.py")
+    assert result.text == "def f(\n    *args,\n    **kwargs,\n):\n    return args"
+
+
+def test_unknown_extension_and_changeset_sections():
+    text = "# heading-like line\nvalue\n" + "# pad\n" * 40
+    result = compact(text, 30, code=True, file_path="notes.xyz")
+    assert "comments" not in result.steps and "# heading-like line" in result.text
+    changeset = (
+        "Files changed in this turn:\n\n### FILE: a.py\n# py comment\nx = 1\n"
+        "\n### FILE: b.c\n#include <a.h>\n// c comment\n" + "// pad\n" * 40
+    )
+    result = compact(changeset, 40, code=True, sections=True)
+    assert "# py comment" not in result.text and "// c comment" not in result.text
+    assert "#include <a.h>" in result.text and "x = 1" in result.text
+
+
+def test_repeated_lines_collapsed():
+    text = "start\n" + "retrying connection...\n" * 50 + "done"
+    result = compact(text, 40)
+    assert result.text == "start\nretrying connection...\n[… 49 identical lines elided …]\ndone"
+
+
+def test_long_function_middle_elided():
+    text = _function("first", 60) + "\n" + _function("second", 2)
+    result = compact(text, 400, code=True)
+    assert result.tokens <= 400
+    assert "function bodies" in result.steps
+    lines = result.text.split("\n")
+    assert lines[0] == "def first(value):"
+    assert any(line.strip().startswith("[…") and "lines elided" in line for line in lines)
+    assert "    return total" in lines
+    assert "def second(value):" in lines and "    total += step_1(value)  # accumulate" in lines
+
+
+def test_long_class_keeps_method_signatures():
+    methods = "\n".join(
+        "    " + line for i in range(10) for line in _function(f"m{i}", 8).rstrip("\n").split("\n")
+    )
+    text = f"class Service:\n{methods}\n"
+    result = compact(text, 600, code=True, file_path="service.py")
+    assert "function bodies" in result.steps
+    lines = result.text.split("\n")
+    assert lines[0] == "class Service:"
+    for i in range(10):
+        assert f"    def m{i}(value):" in lines
+    assert result.text.count("lines elided") == 10
+
+    kotlin = "class Repo(val db: Db) {\n" + "\n".join(
+        f"    fun get{i}(id: Int) {{\n" + "\n".join(f"        step({j})" for j in range(12)) + "\n    }"
+        for i in range(4)
+    ) + "\n}\n"
+    result = compact(kotlin, 200, code=True, file_path="Repo.kt")
+    for i in range(4):
+        assert f"    fun get{i}(id: Int) {{" in result.text
+
+
+def test_prose_keeps_headings_and_numbered_steps():
+    filler = "This paragraph explains background details at considerable length. " * 3
+    text = "## Plan\n" + "\n".join(f"{filler}\n{i}. Step {i} does something" for i in range(1, 9))
+    result = compact(text, 150)
+    assert result.tokens <= 150
+    assert result.steps == ["whitespace", "structure"]
+    assert result.text.startswith("## Plan")
+    for i in range(1, 9):
+        assert f"{i}. Step {i} does something" in result.text
+    assert "lines elided" in result.text
+
+
+def test_head_tail_fallback_respects_budget():
+    text = "\n".join(f"## heading {i}" for i in range(200))
+    result = compact(text, 100)
+    assert result.tokens <= 100
+    assert result.text.startswith("## heading 0") and result.text.endswith("## heading 199")
+
+
+def test_budget_per_mode():
+    config = {"prompt_token_budgets": ["plan=50", "code=bad"]}
+    assert budget_for("plan", config) == 50
+    assert budget_for("code", config) == 0
+    assert compact_for_mode("code", "x" * 1000, config) is None
+    assert compact_for_mode("plan", "word " * 200, config).tokens <= 50
+
+
+def test_engine_logs_compaction(fake_cli):
+    from core.consensus_engine import run_consensus
+
+    fake_cli("gemini", "import sys; sys.stdin.read() if False else None; print('VERDICT: APPROVE')\n")
+    fake_cli("codex", "import json; print(json.dumps({'type': 'item.completed', 'item': "
+             "{'type': 'agent_message', 'text': 'VERDICT: APPROVE'}}))\n")
+    config = {"prompt_token_budgets": ["plan=100"], "cli_timeout": 10}
+    result = run_consensus("plan", "1. Do the thing\n" + "background " * 500, config=config)
+    assert "⟐ Context: " in result.summary and "→" in result.summary
@@ -45,3 +45,22 @@ def test_min_change_lines_filter():
     config = load_config(config_dir="/nonexistent")
     assert should_skip_change("a\nb\nc", config) is True   # 3 lines < 5
     assert should_skip_change("a\nb\nc\nd\ne\nf", config) is False  # 6 lines >= 5
+
+
+def test_parse_mapping():
+    from core.config import parse_mapping
+    assert parse_mapping(["**/auth/**=3", "bad", "*.py=-1"]) == [("**/auth/**", "3"), ("*.py", "-1")]
+
+
+def test_path_matches_directory_globs():
+    from core.config import path_matches
+    assert path_matches("src/auth/login.py", "**/auth/**") is True
+    assert path_matches("auth/login.py", "**/auth/**") is True
+    assert path_matches("/project/src/main.py", "**/auth/**") is False
+
+
+def test_extract_frontmatter_parses_floats():
+    from core.config import extract_frontmatter
+    parsed = extract_frontmatter("---\nadaptive_agreement_threshold: 0.9\nversion: 1.2.3\n---\n")
+    assert parsed["adaptive_agreement_threshold"] == 0.9
+    assert parsed["version"] == "1.2.3"
@@ -126,3 +126,14 @@ def test_run_consensus_integration():
     assert result.round >= 0
     assert isinstance(result.summary, str)
     assert len(result.summary) > 0
+
+
+def test_build_verification_prompt_with_symbols():
+    prompt = build_verification_prompt(
+        mode="code",
+        context="total = parse_amount(x)",
+        file_path="cart.py",
+        symbols="Referenced definitions elsewhere in the project:\n- util.py:1  def parse_amount(text)",
+    )
+    assert "def parse_amount(text)" in prompt
+    assert "{{symbols}}" not in build_verification_prompt("code", "x = 1", "a.py")
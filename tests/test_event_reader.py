@@ -0,0 +1,97 @@
+import os
+import sys
+import json
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.event_reader import HookEvent, scan_spans
+from hooks.dispatch import dispatch_event
+
+TRICKY = 'a "quoted" {brace} [x], key: \\ end\\'
+
+
+def _event(**fields):
+    return HookEvent(json.dumps(fields).encode())
+
+
+def test_scan_finds_fields_without_decoding_values():
+    event = _event(
+        hook_event_name="PostToolUse",
+        tool_name="Write",
+        stop_hook_active=False,
+        tool_input={"file_path": "src/app.py", "content": TRICKY, "nested": {"deep": "x"}, "n": 3},
+        tool_response={"items": [{"file_path": "elsewhere.py"}], "success": True},
+    )
+    assert event.field("hook_event_name") == "PostToolUse"
+    assert event.field("tool_input", "file_path") == "src/app.py"
+    assert event.field("tool_input", "content") == TRICKY
+    assert event.field("tool_input", "n") == 3
+    assert event.field("stop_hook_active") is False
+    assert event.field("tool_response", "success") is True
+    assert event.field("tool_input", "nested", "deep") is None
+    assert event.field("missing", default="") == ""
+    assert ("tool_response", "items", "file_path") not in event.spans
+    assert not event.loaded
+    assert scan_spans(b'{"a": [1, {"b": "}"}], "c": "]"}') == {("c",): (28, 31)}
+
+
+def test_size_and_line_bounds():
+    content = "line\n" * 40 + "tail ünïcode \"q\""
+    event = _event(tool_input={"content": content, "empty": ""})
+    assert event.size("tool_input", "content") >= len(content)
+    assert event.max_lines("tool_input", "content") >= content.count("\n") + 1
+    assert event.max_lines("tool_input", "empty") == 0
+    assert event.max_lines("tool_input", "absent") == 0
+
+
+def test_malformed_event_falls_back_to_full_parser():
+    event = HookEvent(b'{"hook_event_name": "Stop"')
+    assert not event.scanned
+    with pytest.raises(ValueError):
+        event.field("hook_event_name")
+
+
+def test_skipped_write_is_never_parsed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    big = "x = 1\n" * 500_000
+    event = _event(
+        hook_event_name="PostToolUse",
+        tool_name="Write",
+        tool_input={"file_path": "package-lock.json", "content": big},
+        tool_response={"content": big},
+    )
+    started = time.perf_counter()
+    assert json.loads(dispatch_event(event)) == {}
+    assert time.perf_counter() - started < 0.5
+    assert not event.loaded
+
+    small = _event(
+        hook_event_name="PostToolUse",
+        tool_name="Edit",
+        tool_input={"file_path": "src/app.py", "new_string": "x = 2\n"},
+    )
+    assert json.loads(dispatch_event(small)) == {}
+    assert not small.loaded
+
+
+def test_precheck_agrees_with_should_trigger(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from core.config import load_config
+    from hooks import posttooluse
+
+    config = load_config()
+    cases = [
+        ("Write", "src/app.py", "content", "a\nb\nc\nd\ne\n"),
+        ("Write", "src/app.py", "content", "a\nb\nc\nd"),
+        ("Edit", "src/app.py", "new_string", "a\nb\nc\nd\ne"),
+        ("Edit", "dist/app.min.js", "new_string", "a\n" * 20),
+        ("Read", "src/app.py", "content", "a\n" * 20),
+    ]
+    for tool, path, key, text in cases:
+        data = {"hook_event_name": "PostToolUse", "tool_name": tool,
+                "tool_input": {"file_path": path, key: text}}
+        event = HookEvent(json.dumps(data).encode())
+        if posttooluse.should_trigger(data, config):
+            assert posttooluse.precheck(event), (tool, path, text)
@@ -0,0 +1,111 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core import followup
+from core.consensus_engine import ConsensusStatus, run_consensus
+
+REVIEWER = (
+    "import sys\n"
+    "prompt = sys.argv[-1]\n"
+    "if 'Open concerns:' not in prompt:\n"
+    "    print('VERDICT: CONCERNS\\n- Missing null check on user\\n- SQL built by concatenation')\n"
+    "elif 'null_checked' in prompt:\n"
+    "    print('- C2: RESOLVED, parameterized\\n- C3: RESOLVED\\nVERDICT: APPROVE')\n"
+    "else:\n"
+    "    print('C1: RESOLVED\\nC2: OPEN\\n- Off-by-one in the new loop\\nVERDICT: CONCERNS')\n"
+)
+CODE = "def f(user):\n    return user.email\n" * 3
+
+
+def _config(tmp_path, **extra):
+    return {"state_dir": str(tmp_path / "state"), "models": ["gemini"], "cli_timeout": 10,
+            "debate_rounds": 0, "min_change_lines": 1, "followup_enabled": True, **extra}
+
+
+def test_extract_concerns_from_bullets():
+    concerns = followup.extract_concerns({
+        "gemini": "VERDICT: CONCERNS\n- A bug\n- another\n",
+        "codex": "- a bug\n- C1: RESOLVED fine\n",
+        "other": "Vague worry without bullets",
+    })
+    assert [c["text"] for c in concerns] == ["A bug", "another", "Vague worry without bullets"]
+    assert followup.extract_concerns({"x": "no bullets"}, fallback=False) == []
+
+
+def test_resolution_needs_every_model():
+    concerns = [{"id": "C1", "text": "a"}, {"id": "C2", "text": "b"}, {"id": "C10", "text": "c"}]
+    statuses = followup.resolve_concerns(concerns, {
+        "gemini": "C1: RESOLVED\nC2 - resolved\nC10: OPEN",
+        "codex": "- C1 — RESOLVED\nC2: OPEN",
+    })
+    assert statuses == {"C1": "RESOLVED", "C2": "OPEN", "C10": "OPEN"}
+    assert followup.resolve_concerns(concerns[:1], {"gemini": "looks fine"}) == {"C1": "UNKNOWN"}
+
+
+def test_record_followup_tracks_regressions_and_attempts(tmp_path):
+    config = _config(tmp_path, followup_max_attempts=2)
+    concerns = followup.remember_review(config, "s", "f.py", {"gemini": "- one\n- two"})
+    assert [c["id"] for c in concerns] == ["C1", "C2"]
+    remaining = followup.record_followup(
+        config, "s", "f.py", concerns, {"C1": "RESOLVED", "C2": "OPEN"},
+        {"gemini": "C2: OPEN\n- three\nVERDICT: CONCERNS"}
+    )
+    assert [(c["id"], c["text"]) for c in remaining] == [("C2", "two"), ("C3", "three")]
+    assert followup.open_concerns(config, "s", "f.py") == remaining
+    assert followup.open_concerns(config, "other", "f.py") == []
+    followup.record_followup(config, "s", "f.py", remaining, {}, {})
+    assert followup.open_concerns(config, "s", "f.py") == []
+
+
+def test_regressions_only_from_concerns_verdicts(tmp_path):
+    config = _config(tmp_path)
+    concerns = followup.remember_review(config, "s", "f.py", {"gemini": "- one\n- two"})
+    remaining = followup.record_followup(config, "s", "f.py", concerns, {"C1": "RESOLVED", "C2": "RESOLVED"}, {
+        "gemini": "C1: RESOLVED\nC2: RESOLVED\n- None\nVERDICT: APPROVE",
+        "codex": "C1: RESOLVED\nC2: RESOLVED\n- Other nit\nVERDICT: APPROVE",
+        "claude": "C1: RESOLVED\nC2: RESOLVED\n- No regressions found.\nVERDICT: CONCERNS",
+    })
+    assert remaining == []
+    assert followup.open_concerns(config, "s", "f.py") == []
+
+
+def test_followup_respects_route_and_budget(tmp_path, fake_cli):
+    from core.router import RouteDecision
+    from core.usage import record_usage
+
+    fake_cli("gemini", REVIEWER)
+    config = _config(tmp_path, token_budget_session=1000)
+    run_consensus("code", CODE, file_path="app.py", config=config, session_id="s")
+    skipped = run_consensus("code", CODE + "# edited\n", file_path="app.py", config=config,
+                            session_id="s", route=RouteDecision("skip", 0))
+    assert skipped.status == ConsensusStatus.SKIPPED
+    record_usage(config, "s", {"input_tokens": 1000, "cached_tokens": 0, "output_tokens": 0})
+    exhausted = run_consensus("code", CODE + "# edited\n", file_path="app.py", config=config, session_id="s")
+    assert exhausted.status == ConsensusStatus.SKIPPED
+    assert "⟐ Budget: exhausted" in exhausted.summary
+    assert len(followup.open_concerns(config, "s", "app.py")) == 2
+
+
+def test_engine_runs_followup_after_concerns(tmp_path, fake_cli):
+    fake_cli("gemini", REVIEWER)
+    config = _config(tmp_path)
+
+    first = run_consensus("code", CODE, file_path="app.py", config=config, session_id="s")
+    assert "Follow-up" not in first.summary
+    assert len(followup.open_concerns(config, "s", "app.py")) == 2
+
+    second = run_consensus("code", CODE + "# edited\n", file_path="app.py", config=config, session_id="s")
+    assert "⟐ C1 RESOLVED: Missing null check on user" in second.summary
+    assert "⟐ C2 OPEN: SQL built by concatenation" in second.summary
+    assert "⟐ C3 NEW: Off-by-one in the new loop" in second.summary
+    assert "1/2 resolved, 1 regression(s)" in second.summary
+    # Other sessions still get full reviews.
+    other = run_consensus("code", CODE, file_path="app.py", config=config, session_id="t")
+    assert "Follow-up" not in other.summary
+
+    third = run_consensus("code", CODE + "null_checked = True\n", file_path="app.py", config=config,
+                          session_id="s")
+    assert "2/2 resolved, 0 regression(s)" in third.summary
+    assert third.status == ConsensusStatus.FULL_CONSENSUS
+    assert followup.open_concerns(config, "s", "app.py") == []
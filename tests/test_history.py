@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core import history
+from core.history import ModelCall, record_review
+
+
+def _config(tmp_path, **overrides):
+    return {"state_dir": str(tmp_path / "state"), **overrides}
+
+
+def _record(config, mode="code", path="src/app.py", status="FULL_CONSENSUS", rounds=0, calls=None):
+    return record_review(
+        config,
+        content=f"{mode}:{path}",
+        mode=mode,
+        path=path,
+        status=status,
+        rounds=rounds,
+        duration_ms=100,
+        calls=calls or [ModelCall(round=0, model="gemini", success=True, verdict="APPROVE", latency_ms=100)],
+    )
+
+
+def test_connect_uses_wal(tmp_path):
+    conn = history.connect(_config(tmp_path))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+def test_latency_percentiles_by_model(tmp_path):
+    config = _config(tmp_path)
+    for latency in range(100, 2100, 100):
+        _record(config, calls=[
+            ModelCall(round=0, model="gemini", success=True, verdict="APPROVE", latency_ms=latency),
+            ModelCall(round=0, model="codex", success=False, latency_ms=45000, error="Timeout"),
+        ])
+    conn = history.connect(config)
+    stats = {row["model"]: row for row in history.latency_by_model(conn)}
+    conn.close()
+    assert stats["gemini"]["calls"] == 20
+    assert stats["gemini"]["p50_ms"] == 1100
+    assert stats["gemini"]["p95_ms"] == 2000
+    assert stats["codex"]["failures"] == 20
+    assert stats["codex"]["p95_ms"] == 0
+
+
+def test_debate_rate_and_top_files(tmp_path):
+    config = _config(tmp_path)
+    _record(config, mode="code", path="a.py")
+    _record(config, mode="code", path="a.py", status="MAJORITY_AGREE", rounds=2)
+    _record(config, mode="plan", path="")
+    conn = history.connect(config)
+    debates = {row["mode"]: row for row in history.debate_rate_by_mode(conn)}
+    files = history.top_files(conn)
+    conn.close()
+    assert debates["code"]["debate_rate"] == 0.5
+    assert debates["plan"]["debated"] == 0
+    assert files == [{"path": "a.py", "reviews": 2, "contested": 1}]
+
+
+def test_prune_applies_retention_and_cap(tmp_path):
+    config = _config(tmp_path, history_retention_days=1, history_max_reviews=2)
+    for _ in range(4):
+        _record(config)
+    conn = history.connect(config)
+    conn.execute("UPDATE reviews SET ts = ? WHERE id = 4", (time.time() - 3 * 86400,))
+    conn.commit()
+    assert history.prune(conn, config) == 2
+    assert [r[0] for r in conn.execute("SELECT id FROM reviews ORDER BY id")] == [2, 3]
+    assert conn.execute("SELECT COUNT(*) FROM model_calls").fetchone()[0] == 2
+    conn.close()
+
+
+def test_run_consensus_records_history(tmp_path, fake_cli):
+    from core.consensus_engine import run_consensus
+
+    fake_cli("gemini", "print('VERDICT: APPROVE')\n")
+    fake_cli("codex", (
+        "import json\n"
+        "print(json.dumps({'type': 'item.completed', 'item': {'type': 'agent_message', 'text': 'VERDICT: APPROVE'}}))\n"
+    ))
+    config = _config(tmp_path, history_enabled=True, models=["gemini", "codex"], cli_timeout=10)
+    result = run_consensus("code", "def f():\n    pass\n", file_path="f.py", config=config, session_id="s1")
+    assert result.status.value == "FULL_CONSENSUS"
+    conn = history.connect(config)
+    review = conn.execute("SELECT * FROM reviews").fetchone()
+    calls = conn.execute("SELECT model, verdict, latency_ms FROM model_calls ORDER BY model").fetchall()
+    conn.close()
+    assert (review["mode"], review["path"], review["session_id"]) == ("code", "f.py", "s1")
+    assert [(c["model"], c["verdict"]) for c in calls] == [("codex", "APPROVE"), ("gemini", "APPROVE")]
+    assert all(c["latency_ms"] > 0 for c in calls)
+
+
+def test_history_cli_outputs_json(tmp_path, monkeypatch, capsys):
+    from core.cli import main
+
+    monkeypatch.chdir(tmp_path)
+    config = {"state_dir": ".claude/concensus"}
+    _record(config, path="a.py")
+    assert main(["history", "files", "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)[0]["path"] == "a.py"
+    assert main(["history", "latency"]) == 0
+    assert "gemini" in capsys.readouterr().out
+
+
+def test_connect_migrates_v1_database(tmp_path):
+    import sqlite3
+    config = _config(tmp_path)
+    os.makedirs(config["state_dir"])
+    conn = sqlite3.connect(history.history_path(config))
+    conn.executescript(history.SCHEMA.replace("    cached_tokens INTEGER NOT NULL DEFAULT 0,\n", ""))
+    conn.execute("PRAGMA user_version=1")
+    conn.close()
+    _record(config, calls=[ModelCall(round=0, model="codex", success=True, cached_tokens=7)])
+    conn = history.connect(config)
+    assert conn.execute("SELECT cached_tokens FROM model_calls").fetchone()[0] == 7
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == history.SCHEMA_VERSION
+    conn.close()
@@ -0,0 +1,98 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.cli_runner import RunOptions, model_argv, _model_options
+from core.consensus_engine import run_consensus
+from core.model_profiles import describe_unmapped, parse_profiles, profiled_options, resolve_profile
+
+PROFILES = [
+    "*/codex: effort=medium",
+    "direction: tools=off",
+    "direction/codex: model=gpt-5-mini effort=low",
+    "code/codex@debate: effort=high args='--skip-git-repo-check'",
+    "broken entry",
+    "code/gemini: colour=blue",
+]
+
+RECORDING_CLI = (
+    "import os, sys, json\n"
+    "path = os.path.join(os.path.dirname(sys.argv[0]), 'argv.jsonl')\n"
+    "open(path, 'a').write(json.dumps({'argv': sys.argv[1:], 'cwd': os.getcwd()}) + '\\n')\n"
+    "print('VERDICT: {verdict}')\n"
+)
+
+
+def test_parse_profiles_selectors():
+    entries = parse_profiles(PROFILES)
+    assert [(e.mode, e.model, e.round) for e in entries] == [
+        ("*", "codex", "*"),
+        ("direction", "*", "*"),
+        ("direction", "codex", "*"),
+        ("code", "codex", "debate"),
+        ("code", "gemini", "*"),
+    ]
+    assert entries[3].settings == {"effort": "high", "args": "--skip-git-repo-check"}
+    assert entries[4].settings == {}
+
+
+def test_resolve_profile_applies_matches_in_order():
+    config = {"model_profiles": PROFILES}
+    assert resolve_profile(config, "direction", "codex", 0) == {
+        "effort": "low", "tools": "off", "model": "gpt-5-mini", "isolated": "true", "sandbox": "read-only",
+    }
+    assert resolve_profile(config, "code", "codex", 0) == {"effort": "medium"}
+    assert resolve_profile(config, "code", "codex", 2)["effort"] == "high"
+    assert resolve_profile(config, "plan", "gemini", 0) == {}
+    options = profiled_options(RunOptions(), config, "plan", ["gemini", "codex"], 0)
+    assert options.profiles == {"codex": {"effort": "medium"}}
+
+
+def test_model_argv_maps_settings_to_cli_flags():
+    options = RunOptions(profiles={
+        "codex": {"model": "gpt-5-mini", "effort": "low", "max_output": "800", "sandbox": "read-only",
+                  "args": "--skip-git-repo-check"},
+        "gemini": {"model": "gemini-2.5-flash", "effort": "low", "sandbox": "read-only"},
+    })
+    assert model_argv("codex", options, "P") == [
+        "codex", "exec", "-m", "gpt-5-mini", "-c", "model_reasoning_effort=low",
+        "-c", "model_max_output_tokens=800", "--sandbox", "read-only", "--skip-git-repo-check",
+        "--json", "P",
+    ]
+    assert model_argv("gemini", options, "P") == [
+        "gemini", "-m", "gemini-2.5-flash", "--approval-mode", "default", "-p", "P",
+    ]
+    assert model_argv("gemini", RunOptions(), "P") == ["gemini", "-p", "P"]
+
+
+def test_unmapped_settings_and_off_values():
+    profiles = {"gemini": {"effort": "low", "tools": "off", "isolated": "none"}, "codex": {"effort": "low"}}
+    assert describe_unmapped(profiles) == "gemini effort, tools"
+    assert describe_unmapped({"codex": {"tools": "off", "args": "-x"}}) == "codex tools"
+    assert _model_options("gemini", RunOptions(isolated_cwd=True, profiles=profiles)).isolated_cwd is False
+
+
+def test_engine_uses_profile_per_mode_and_round(tmp_path, fake_cli):
+    codex = fake_cli("codex", RECORDING_CLI.replace("{verdict}", "APPROVE"))
+    fake_cli("gemini", RECORDING_CLI.replace("{verdict}", "CONCERNS"))
+    config = {"state_dir": str(tmp_path / "state"), "models": ["gemini", "codex"], "cli_timeout": 10,
+              "debate_rounds": 1, "model_profiles": PROFILES}
+
+    result = run_consensus("direction", "Add a cache", config=config)
+    calls = [json.loads(line) for line in open(os.path.join(os.path.dirname(codex), "argv.jsonl"))]
+    codex_call = next(c for c in calls if "exec" in c["argv"])
+    assert codex_call["argv"][:3] == ["exec", "-c", "model_reasoning_effort=low"]
+    assert codex_call["argv"][3:7] == ["-m", "gpt-5-mini", "--sandbox", "read-only"]
+    assert os.path.basename(codex_call["cwd"]).startswith("concensus-")
+    gemini_call = next(c for c in calls if "exec" not in c["argv"])
+    assert gemini_call["argv"][:3] == ["--approval-mode", "default", "-p"]
+    assert "⟐ Profiles: codex" in result.summary
+    assert "⟐ Profiles: no CLI flag for codex tools; gemini tools (ignored)" in result.summary
+
+    os.remove(os.path.join(os.path.dirname(codex), "argv.jsonl"))
+    run_consensus("code", "x = 1\n", file_path="f.py", config=config)
+    calls = [json.loads(line) for line in open(os.path.join(os.path.dirname(codex), "argv.jsonl"))]
+    efforts = [a for c in calls if "exec" in c["argv"] for a in c["argv"] if a.startswith("model_reasoning")]
+    assert efforts == ["model_reasoning_effort=medium", "model_reasoning_effort=high"]
+    assert all(not os.path.basename(c["cwd"]).startswith("concensus-") for c in calls)
@@ -0,0 +1,114 @@
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core import history, prescreen
+from core.consensus_engine import run_consensus
+from core.history import ModelCall, record_review
+
+RISKY = "lock = threading.Lock()\ncursor.execute(sql)\n"
+SAFE = "README wording tweak\n"
+
+
+def _config(tmp_path, **extra):
+    return {"state_dir": str(tmp_path / "state"), "models": ["gemini"], "cli_timeout": 10,
+            "prescreen_min_samples": 50, **extra}
+
+
+def _rows(n, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        risky = rng.random() < 0.3
+        content = RISKY if risky else SAFE
+        path = "src/db.py" if risky else "docs/guide.md"
+        features = prescreen.extract_features("code", path, content, {})
+        rows.append({"ts": i, "features": features, "label": int(risky and rng.random() < 0.9)})
+    return rows
+
+
+def test_extract_features():
+    features = prescreen.extract_features(
+        "code", "tests/test_db.py", "with lock:\n    os.system(cmd)\n", {"risk_sensitive_apis": ["os.system"]}
+    )
+    assert features["mode=code"] == 1.0
+    assert features["ext=.py"] == 1.0
+    assert features["dir=tests"] == 1.0
+    assert features["path=test"] == 1.0
+    assert features["api=os.system"] == 1.0
+    assert features["kw=lock"] == 1.0
+    assert "kw=sql" not in features
+
+
+def test_train_separates_risky_changes_on_holdout():
+    fit, test = prescreen.split_holdout(_rows(300), 0.2)
+    assert len(test) == 60 and test[0]["ts"] == 240
+    model = prescreen.train(fit, epochs=30)
+    safe = prescreen.extract_features("code", "docs/guide.md", SAFE, {})
+    risky = prescreen.extract_features("code", "src/db.py", RISKY, {})
+    assert model.predict(safe) < 0.05 < 0.5 < model.predict(risky)
+    metrics = prescreen.evaluate(model, test, 0.05)
+    assert metrics["recall"] == 1.0
+    assert metrics["missed_concern_rate"] == 0.0
+    assert 0.5 < metrics["skip_rate"] < 0.9
+
+
+def test_labeled_features_from_history(tmp_path):
+    config = _config(tmp_path)
+    record_review(config, content="a", mode="code", path="a.py", status="MAJORITY_AGREE", rounds=0,
+                  duration_ms=1, features={"x": 1.0}, calls=[
+                      ModelCall(round=0, model="gemini", success=True, verdict="APPROVE"),
+                      ModelCall(round=0, model="codex", success=True, verdict="CONCERNS"),
+                  ])
+    record_review(config, content="b", mode="code", path="b.py", status="FULL_CONSENSUS", rounds=0,
+                  duration_ms=1, features={"y": 1.0}, calls=[
+                      ModelCall(round=0, model="gemini", success=True, verdict="APPROVE"),
+                  ])
+    record_review(config, content="c", mode="code", path="c.py", status="FULL_CONSENSUS", rounds=0,
+                  duration_ms=1, calls=[ModelCall(round=0, model="gemini", success=True, verdict="APPROVE")])
+    conn = history.connect(config)
+    rows = history.labeled_features(conn)
+    conn.close()
+    assert [(r["features"], r["label"]) for r in rows] == [({"x": 1.0}, 1), ({"y": 1.0}, 0)]
+
+
+def test_train_from_history_requires_samples_and_saves_metrics(tmp_path):
+    config = _config(tmp_path)
+    with pytest.raises(ValueError):
+        prescreen.train_from_history(config)
+    for row in _rows(60):
+        verdict = "CONCERNS" if row["label"] else "APPROVE"
+        record_review(config, content=str(row["ts"]), mode="code", path="f.py", status="FULL_CONSENSUS",
+                      rounds=0, duration_ms=1, features=row["features"],
+                      calls=[ModelCall(round=0, model="gemini", success=True, verdict=verdict)])
+    model = prescreen.train_from_history(config, epochs=20)
+    assert model.samples == 60
+    assert model.metrics["holdout"] == 12
+    assert prescreen.load_model(config).metrics == model.metrics
+
+
+def test_engine_skips_predicted_approvals(tmp_path, fake_cli):
+    script = fake_cli("gemini", "print('VERDICT: APPROVE')\n")
+    calls = os.path.join(os.path.dirname(script), "calls")
+    fake_cli("codex", f"open({calls!r}, 'a').write('c')\nprint('VERDICT: APPROVE')\n")
+    config = _config(tmp_path, prescreen_enabled=True, models=["gemini", "codex"])
+    model = prescreen.train(_rows(300), epochs=30)
+    prescreen.save_model(config, model)
+
+    # A model without held-out metrics is never used.
+    run_consensus("code", SAFE, file_path="docs/guide.md", config=config)
+    assert os.path.exists(calls)
+    os.remove(calls)
+
+    model.metrics = prescreen.evaluate(model, _rows(50, seed=1), 0.05)
+    prescreen.save_model(config, model)
+    result = run_consensus("code", SAFE, file_path="docs/guide.md", config=config)
+    assert any("Pre-screen" in line and "skipped" in line for line in result.summary.splitlines())
+    assert not os.path.exists(calls)
+
+    result = run_consensus("code", RISKY, file_path="src/db.py", config=config)
+    assert not any("Pre-screen" in line and "skipped" in line for line in result.summary.splitlines())
+    assert os.path.exists(calls)
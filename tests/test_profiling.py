@@ -0,0 +1,55 @@
+import os
+import sys
+import json
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.cli import main
+from core.profiling import report, rotate
+
+DISPATCH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin", "hooks", "dispatch.py")
+
+
+def _profiled_run(tmp_path, profile_dir, event):
+    return subprocess.run(
+        [sys.executable, DISPATCH],
+        input=json.dumps({"hook_event_name": event, "session_id": "s1"}),
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+        env={**os.environ, "CONCENSUS_PROFILE": str(profile_dir)},
+        timeout=30,
+    )
+
+
+def test_profile_captures_and_report(tmp_path, capsys):
+    profile_dir = tmp_path / "profiles"
+    for event in ("Stop", "Stop", "UserPromptSubmit"):
+        result = _profiled_run(tmp_path, profile_dir, event)
+        assert result.returncode == 0
+        assert json.loads(result.stdout.strip().splitlines()[-1]) == {}
+
+    names = os.listdir(profile_dir)
+    assert len([n for n in names if n.endswith(".prof")]) == 3
+    assert len([n for n in names if n.endswith(".alloc")]) == 3
+
+    summary = report(str(profile_dir), limit=50)
+    assert summary["invocations"] == 3
+    assert any("dispatch.py" in f["function"] and "(_run)" in f["function"] for f in summary["functions"])
+    assert summary["allocations"]
+    assert report(str(profile_dir), event="Stop")["invocations"] == 2
+
+    assert main(["profile", "report", "--dir", str(profile_dir), "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["invocations"] == 3
+
+
+def test_rotate_removes_oldest_captures(tmp_path):
+    for i in range(5):
+        for ext in (".prof", ".alloc"):
+            path = tmp_path / f"{i}-Stop{ext}"
+            path.write_bytes(b"x" * 100)
+            os.utime(path, (1000 + i, 1000 + i))
+    assert rotate(str(tmp_path), max_files=3, max_mb=0) == 2
+    assert sorted(os.listdir(tmp_path))[0] == "2-Stop.alloc"
+    assert rotate(str(tmp_path), max_files=0, max_mb=300 / 1024 / 1024) == 2
+    assert sorted(os.listdir(tmp_path)) == ["4-Stop.alloc", "4-Stop.prof"]
@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import time
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core import review_cache
+from core.cache_server import make_server
+
+COUNTING_GEMINI = (
+    "import os, sys\n"
+    "if '--version' in sys.argv:\n"
+    "    sys.exit(print('1.0'))\n"
+    "path = os.path.join(os.path.dirname(sys.argv[0]), 'calls')\n"
+    "open(path, 'a').write('x')\n"
+    "print('VERDICT: APPROVE')\n"
+)
+
+
+@pytest.fixture
+def server(tmp_path):
+    httpd = make_server(port=0, directory=str(tmp_path / "server"), token="s3cret")
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def reset_backoff(monkeypatch):
+    monkeypatch.setattr(review_cache, "_remote_down_until", 0.0)
+    monkeypatch.setattr(review_cache, "_reported_versions", {})
+
+
+def _config(state_dir, **extra):
+    return {"state_dir": str(state_dir), "review_cache_enabled": True, "models": ["gemini"],
+            "cli_timeout": 10, **extra}
+
+
+def _versioned_gemini(version):
+    return f"import sys\nprint('gemini {version}' if '--version' in sys.argv else 'VERDICT: APPROVE')\n"
+
+
+def test_review_key_tracks_versions(tmp_path, fake_cli):
+    fake_cli("gemini", _versioned_gemini("1.0"))
+    config = _config(tmp_path)
+    key = review_cache.review_key("code", "x = 1", "/a/f.py", config)
+    assert key == review_cache.review_key("code", "x = 1", "/b/f.py", config)
+    assert key != review_cache.review_key("code", "x = 2", "/a/f.py", config)
+    assert key != review_cache.review_key("plan", "x = 1", "/a/f.py", config)
+    assert key != review_cache.review_key("code", "x = 1", "/a/f.py", config, tier="fast")
+    for extra in ({"review_cache_model_versions": ["gemini=2.5-pro"]}, {"symbol_context_enabled": True},
+                  {"prompt_token_budgets": ["code=500"]}):
+        assert key != review_cache.review_key("code", "x = 1", "/a/f.py", {**config, **extra})
+    assert list(review_cache._reported_versions.values()) == ["gemini 1.0"]
+    # Reinstalling the same version keeps the key; a new reported version changes it.
+    fake_cli("gemini", _versioned_gemini("1.0") + "# reinstalled\n")
+    assert key == review_cache.review_key("code", "x = 1", "/a/f.py", config)
+    fake_cli("gemini", _versioned_gemini("1.1"))
+    assert key != review_cache.review_key("code", "x = 1", "/a/f.py", config)
+
+
+def test_reported_versions_persist_across_processes(tmp_path, fake_cli):
+    probe = "import os, sys\nopen(os.path.join(os.path.dirname(sys.argv[0]), 'probes'), 'a').write('x')\n"
+    gemini = fake_cli("gemini", probe + "print('gemini 1.0')\n")
+    fake_cli("codex", probe + "print('codex 2.0')\n")
+    probes = os.path.join(os.path.dirname(gemini), "probes")
+    config = _config(tmp_path, models=["gemini", "codex"])
+    key = review_cache.review_key("code", "x = 1", "f.py", config)
+    assert open(probes).read() == "xx"
+    review_cache._reported_versions.clear()  # a new hook process
+    assert review_cache.review_key("code", "x = 1", "f.py", config) == key
+    assert open(probes).read() == "xx"
+    stored = json.load(open(tmp_path / review_cache.VERSIONS_FILE))["versions"]
+    assert sorted(v["version"] for v in stored.values()) == ["codex 2.0", "gemini 1.0"]
+
+
+def test_downgraded_review_is_not_stored(tmp_path, fake_cli):
+    from core.consensus_engine import run_consensus
+    from core.usage import record_usage
+
+    script = fake_cli("codex", COUNTING_GEMINI)
+    fake_cli("gemini", COUNTING_GEMINI)
+    calls = os.path.join(os.path.dirname(script), "calls")
+    config = _config(tmp_path / "state", models=["gemini", "codex"], routing_fast_model="codex",
+                     token_budget_session=1000)
+    record_usage(config, "s1", {"input_tokens": 900, "cached_tokens": 0, "output_tokens": 0})
+    first = run_consensus("code", "x = 1\n", file_path="f.py", config=config, session_id="s1")
+    assert "⟐ Budget: downgraded" in first.summary
+    full = run_consensus("code", "x = 1\n", file_path="f.py", config=config, session_id="s2")
+    assert "Cache:" not in full.summary
+    assert "⟐ Queried: gemini, codex" in full.summary
+    assert open(calls).read() == "xxx"
+
+
+def test_engine_serves_repeat_review_from_local_cache(tmp_path, fake_cli):
+    from core.consensus_engine import run_consensus, ConsensusStatus
+
+    script = fake_cli("gemini", COUNTING_GEMINI)
+    calls = os.path.join(os.path.dirname(script), "calls")
+    config = _config(tmp_path / "state")
+    first = run_consensus("code", "x = 1\n", file_path="f.py", config=config)
+    second = run_consensus("code", "x = 1\n", file_path="f.py", config=config)
+    assert open(calls).read() == "x"
+    assert second.status == first.status == ConsensusStatus.FULL_CONSENSUS
+    assert "⟐ Cache: local hit" in second.summary
+    assert second.responses == first.responses
+
+    run_consensus("code", "x = 2\n", file_path="f.py", config=config)
+    assert open(calls).read() == "xx"
+
+
+def test_remote_tier_shares_results_between_machines(tmp_path, fake_cli, server):
+    from core.consensus_engine import run_consensus
+
+    script = fake_cli("gemini", COUNTING_GEMINI)
+    calls = os.path.join(os.path.dirname(script), "calls")
+    shared = {"review_cache_url": server, "review_cache_token": "s3cret"}
+    run_consensus("code", "x = 1\n", file_path="f.py", config=_config(tmp_path / "a", **shared))
+    result = run_consensus("code", "x = 1\n", file_path="f.py", config=_config(tmp_path / "b", **shared))
+    assert open(calls).read() == "x"
+    assert "⟐ Cache: remote hit" in result.summary
+    again = run_consensus("code", "x = 1\n", file_path="f.py", config=_config(tmp_path / "b", **shared))
+    assert "⟐ Cache: local hit" in again.summary
+
+
+def test_unreachable_remote_falls_back_to_local(tmp_path):
+    config = _config(tmp_path, review_cache_url="http://127.0.0.1:9", review_cache_timeout=0.2)
+    key = "a" * 64
+    assert review_cache.lookup(config, key) is None
+    assert review_cache._remote_down_until > 0
+    review_cache.store(config, key, {"status": "FULL_CONSENSUS"})
+    entry, source = review_cache.lookup(config, key)
+    assert source == "local" and entry["status"] == "FULL_CONSENSUS"
+
+
+def test_server_enforces_token_and_ttl(server):
+    url = f"{server}/v1/reviews/{'b' * 64}"
+    request = urllib.request.Request(url, data=b"{}", method="PUT")
+    with pytest.raises(urllib.error.HTTPError) as err:
+        urllib.request.urlopen(request, timeout=5)
+    assert err.value.code == 401
+
+    request.add_header("Authorization", "Bearer s3cret")
+    request.add_header("X-Cache-TTL", "-5")
+    urllib.request.urlopen(request, timeout=5)
+    get = urllib.request.Request(url, headers={"Authorization": "Bearer s3cret"})
+    time.sleep(1.1)
+    with pytest.raises(urllib.error.HTTPError) as err:
+        urllib.request.urlopen(get, timeout=5)
+    assert err.value.code == 404
+
+    request.add_header("X-Cache-TTL", "60")
+    urllib.request.urlopen(request, timeout=5)
+    assert json.loads(urllib.request.urlopen(get, timeout=5).read()) == {}
+
+
+def test_server_rejects_bad_content_length(server):
+    import http.client
+    from urllib.parse import urlparse
+
+    address = urlparse(server)
+    for length in ("abc", "-1"):
+        conn = http.client.HTTPConnection(address.hostname, address.port, timeout=5)
+        conn.putrequest("PUT", f"/v1/reviews/{'c' * 64}")
+        conn.putheader("Authorization", "Bearer s3cret")
+        conn.putheader("Content-Length", length)
+        conn.endheaders()
+        assert conn.getresponse().status == 400
+        conn.close()
@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.review_ledger import plan_review, record_outcome, split_regions
+
+FILE = (
+    "import os\n"
+    "\n"
+    "def alpha():\n"
+    "    return 1\n"
+    "\n"
+    "\n"
+    "def beta():\n"
+    "    x = 2\n"
+    "\n"
+    "    return x\n"
+    "\n"
+    "class Gamma:\n"
+    "    pass\n"
+)
+# Records each prompt; approves unless the prompt mentions "danger".
+GEMINI = (
+    "import os, sys\n"
+    "prompt = sys.argv[-1]\n"
+    "with open(os.path.join(os.path.dirname(sys.argv[0]), 'prompts'), 'a') as f:\n"
+    "    f.write(prompt.replace('\\n', '\\\\n') + '\\n')\n"
+    "print('VERDICT: CONCERNS danger' if 'danger' in prompt else 'VERDICT: APPROVE')\n"
+)
+
+
+def _config(tmp_path, **extra):
+    return {"state_dir": str(tmp_path / "state"), "review_ledger_enabled": True,
+            "review_ledger_dependency_files": [str(tmp_path / "requirements.txt")],
+            "models": ["gemini"], "cli_timeout": 10, **extra}
+
+
+def test_split_regions_on_top_level_lines():
+    regions = split_regions(FILE)
+    assert [(r.start, r.end) for r in regions] == [(1, 2), (3, 6), (7, 11), (12, 14)]
+    assert regions[2].text.startswith("def beta():") and "return x" in regions[2].text
+    assert split_regions("fn main() {\n    go();\n\n}\n")[0].end == 5
+
+
+def test_plan_carries_forward_approved_regions(tmp_path):
+    config = _config(tmp_path)
+    path = str(tmp_path / "mod.py")
+    plan = plan_review(config, path, FILE)
+    assert len(plan.changed) == 4 and plan.context(FILE) == FILE
+    record_outcome(config, path, plan, approved=True)
+
+    edited = FILE.replace("x = 2", "x = 3")
+    plan = plan_review(config, path, edited)
+    assert [r.start for r in plan.changed] == [7]
+    context = plan.context(edited)
+    assert "3 of 4 top-level regions are unchanged" in context
+    assert "[lines 7-11]\ndef beta():" in context and "def alpha" not in context
+
+    record_outcome(config, path, plan, approved=False)
+    assert [r.start for r in plan_review(config, path, edited).changed] == [7]
+
+
+def test_ledger_resets_when_dependencies_change(tmp_path):
+    config = _config(tmp_path)
+    path = str(tmp_path / "mod.py")
+    record_outcome(config, path, plan_review(config, path, FILE), approved=True)
+    assert not plan_review(config, path, FILE).changed
+    (tmp_path / "requirements.txt").write_text("requests==2.0\n")
+    assert len(plan_review(config, path, FILE).changed) == 4
+
+
+def test_ledger_ttl_expires_approvals(tmp_path):
+    config = _config(tmp_path, review_ledger_ttl_days=1)
+    path = str(tmp_path / "mod.py")
+    record_outcome(config, path, plan_review(config, path, FILE), approved=True)
+    ledger_path = tmp_path / "state" / "review_ledger.json"
+    data = json.loads(ledger_path.read_text())
+    entry = data["files"][path]
+    entry["approved"] = {h: ts - 2 * 86400 for h, ts in entry["approved"].items()}
+    ledger_path.write_text(json.dumps(data))
+    assert len(plan_review(config, path, FILE).changed) == 4
+
+
+def test_engine_reviews_only_changed_regions(tmp_path, fake_cli):
+    from core.consensus_engine import run_consensus, ConsensusStatus
+
+    script = fake_cli("gemini", GEMINI)
+    prompts = os.path.join(os.path.dirname(script), "prompts")
+    config = _config(tmp_path)
+    path = str(tmp_path / "mod.py")
+
+    first = run_consensus("code", FILE, file_path=path, config=config, whole_file=True)
+    assert first.status == ConsensusStatus.FULL_CONSENSUS
+
+    unchanged = run_consensus("code", FILE, file_path=path, config=config, whole_file=True)
+    assert unchanged.status == ConsensusStatus.SKIPPED
+    assert "⟐ Ledger: 0 of 4 regions changed, 4 approval(s) carried forward" in unchanged.summary
+
+    edited = FILE.replace("x = 2", "x = danger()")
+    second = run_consensus("code", edited, file_path=path, config=config, whole_file=True)
+    assert "⟐ Ledger: 1 of 4 regions changed" in second.summary
+    last_prompt = open(prompts).read().splitlines()[-1]
+    assert "def beta" in last_prompt and "def alpha" not in last_prompt
+    assert len(plan_review(config, path, edited).changed) == 1
+
+    run_consensus("code", edited, file_path=path, config=config)
+    assert "def alpha" in open(prompts).read().splitlines()[-1]
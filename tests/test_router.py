@@ -0,0 +1,75 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.config import load_config
+from core.consensus_engine import ConsensusStatus, run_consensus
+from core.router import RouteDecision, apply_route, route_change, score_risk, tier_for_score
+
+
+def _config(**overrides):
+    config = load_config(config_dir="/nonexistent")
+    config["routing_enabled"] = True
+    config.update(overrides)
+    return config
+
+
+def test_route_disabled_by_default():
+    config = load_config(config_dir="/nonexistent")
+    assert route_change("/project/src/auth/login.py", "x = 1\n", config) is None
+
+
+def test_test_fixture_is_skipped():
+    decision = score_risk("/project/tests/fixtures/data.py", "x = 1\n" * 10, _config())
+    assert decision.tier == "skip"
+    assert any("fixtures" in r for r in decision.reasons)
+
+
+def test_plain_source_file_is_fast():
+    decision = score_risk("/project/src/utils.py", "def f():\n    return 1\n", _config())
+    assert decision.tier == "fast"
+    assert decision.score == 1
+
+
+def test_auth_module_gets_panel():
+    decision = score_risk("/project/src/auth/login.py", "def f():\n    return 1\n", _config())
+    assert decision.tier == "panel"
+
+
+def test_sensitive_api_escalates_to_debate():
+    content = "import subprocess\npassword = input()\nsubprocess.run(password, shell=True)\n"
+    decision = score_risk("/project/src/auth/login.py", content, _config())
+    assert decision.tier == "debate"
+    assert any("sensitive" in r for r in decision.reasons)
+
+
+def test_size_steps_add_points():
+    small = score_risk("/project/src/a.py", "x = 1\n" * 10, _config())
+    large = score_risk("/project/src/a.py", "x = 1\n" * 250, _config())
+    assert large.score - small.score == 2
+
+
+def test_tier_thresholds_from_config():
+    config = _config(routing_tiers=["fast=0", "panel=1", "debate=2"])
+    assert tier_for_score(-1, config) == "skip"
+    assert tier_for_score(0, config) == "fast"
+    assert tier_for_score(5, config) == "debate"
+
+
+def test_apply_route_tiers():
+    models = ["gemini", "codex"]
+    config = _config()
+    assert apply_route(None, models, 2, config) == (models, 2)
+    assert apply_route(RouteDecision("fast", 1), models, 2, config) == (["codex"], 0)
+    assert apply_route(RouteDecision("panel", 4), models, 2, config) == (models, 0)
+    assert apply_route(RouteDecision("debate", 6), models, 2, config) == (models, 2)
+    assert apply_route(RouteDecision("skip", -2), models, 2, config) == ([], 0)
+
+
+def test_run_consensus_skip_route_logs_reason():
+    route = RouteDecision("skip", -2, ["path **/tests/** -2"])
+    result = run_consensus("code", "x = 1\n", "tests/test_x.py", config={}, route=route)
+    assert result.status == ConsensusStatus.SKIPPED
+    assert "Route: skip" in result.summary
+    assert "**/tests/**" in result.summary
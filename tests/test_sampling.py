@@ -0,0 +1,59 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.sampling import sample_change, sampling_rate, sampling_report
+
+
+def _config(tmp_path, **extra):
+    return {"state_dir": str(tmp_path), "sampling_enabled": True, **extra}
+
+
+def test_rate_is_lowest_matching_entry():
+    config = {"sampling_path_rates": ["**/tests/**=0.2", "**/*.py=0.5"],
+              "sampling_mode_rates": ["code=0.8", "fast=0.1", "plan=bad"]}
+    assert sampling_rate("src/tests/test_a.py", "code", "", config) == 0.2
+    assert sampling_rate("src/a.py", "code", "", config) == 0.5
+    assert sampling_rate("src/a.py", "code", "fast", config) == 0.1
+    assert sampling_rate("README.md", "plan", "", {}) == 1.0
+
+
+def test_disabled_returns_none(tmp_path):
+    assert sample_change({"state_dir": str(tmp_path)}, "s", "a.py", "x") is None
+
+
+def test_decision_is_deterministic_per_event(tmp_path):
+    config = _config(tmp_path, sampling_path_rates=["**=0.5"], sampling_first_per_file=False,
+                     sampling_every_nth=0)
+    first = [sample_change(config, "s1", f"f{i}.py", "body").review for i in range(40)]
+    again = [sample_change(config, "s1", f"f{i}.py", "body").review for i in range(40)]
+    assert first == again
+    assert 5 < sum(first) < 35
+    report = sampling_report(config)[0]
+    assert report["changes"] == 40 and report["reviewed"] + report["sampled_out"] == 40
+
+
+def test_coverage_guarantees(tmp_path):
+    config = _config(tmp_path, sampling_path_rates=["**=0"], sampling_every_nth=4)
+    decisions = [sample_change(config, "s1", "a.py", f"v{i}") for i in range(8)]
+    assert [d.review for d in decisions] == [True, False, False, True, False, False, False, True]
+    assert decisions[0].reason == "first change to this file in the session"
+    assert decisions[3].sampled_out_since_review == 2
+    assert sample_change(config, "s2", "a.py", "v1").review
+
+
+def test_posttooluse_skips_sampled_out_edit(tmp_path, monkeypatch, capsys):
+    from hooks import posttooluse
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".claude").mkdir()
+    (tmp_path / ".claude" / "concensus.local.md").write_text(
+        "---\nsampling_enabled: true\nsampling_first_per_file: false\nsampling_every_nth: 0\n"
+        "sampling_path_rates:\n  - \"**=0\"\n---\n"
+    )
+    event = {"tool_name": "Write", "session_id": "s1",
+             "tool_input": {"file_path": "src/a.py", "content": "x = 1\n" * 10}}
+    assert json.loads(posttooluse.handle(event)) == {}
+    assert "⟐ Sampling: sampled out (rate 0, draw" in capsys.readouterr().err
+    assert sampling_report({"state_dir": ".claude/concensus"})[0]["sampled_out"] == 1
@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import fcntl
+import threading
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.singleflight import coalesce
+
+PLUGIN = os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin")
+KEY = "k" * 64
+
+
+def _config(tmp_path, **extra):
+    return {"state_dir": str(tmp_path), **extra}
+
+
+def test_concurrent_callers_share_one_run(tmp_path):
+    config = _config(tmp_path)
+    runs = []
+
+    def slow():
+        runs.append(1)
+        time.sleep(0.3)
+        return {"value": 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(coalesce(config, KEY, slow)))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+        time.sleep(0.02)
+    for t in threads:
+        t.join()
+    assert len(runs) == 1
+    assert sorted(role for _, role in results) == ["follower"] * 3 + ["leader"]
+    assert all(entry["value"] == 42 for entry, _ in results)
+
+
+def test_result_ttl(tmp_path):
+    config = _config(tmp_path, singleflight_result_ttl=0)
+    assert coalesce(config, KEY, lambda: {"n": 1}) == ({"n": 1}, "leader")
+    time.sleep(0.01)
+    assert coalesce(config, KEY, lambda: {"n": 2}) == ({"n": 2}, "leader")
+
+
+def test_crashed_leader_lock_is_released(tmp_path):
+    config = _config(tmp_path)
+    coalesce(config, KEY, lambda: {"n": 0})
+    os.remove(os.path.join(str(tmp_path), "inflight", f"{KEY}.result.json"))
+    lock_path = os.path.join(str(tmp_path), "inflight", f"{KEY}.lock")
+    leader = subprocess.Popen([sys.executable, "-c", (
+        "import fcntl, sys, time\n"
+        f"f = open({lock_path!r}, 'a'); fcntl.flock(f, fcntl.LOCK_EX)\n"
+        "print('locked', flush=True); time.sleep(60)\n"
+    )], stdout=subprocess.PIPE, text=True)
+    assert leader.stdout.readline().strip() == "locked"
+    threading.Timer(0.2, leader.kill).start()
+    started = time.monotonic()
+    entry, role = coalesce(config, KEY, lambda: {"n": 1})
+    leader.wait()
+    assert (entry, role) == ({"n": 1}, "leader")
+    assert time.monotonic() - started < 5
+
+
+def test_wait_timeout_runs_alone(tmp_path):
+    config = _config(tmp_path, singleflight_wait=0.2)
+    coalesce(config, KEY, lambda: {})
+    with open(os.path.join(str(tmp_path), "inflight", f"{KEY}.lock"), "a") as held:
+        fcntl.flock(held, fcntl.LOCK_EX)
+        assert coalesce(config, KEY, lambda: {"n": 1}) == ({"n": 1}, "timeout")
+
+
+def test_hook_processes_coalesce_identical_reviews(tmp_path, fake_cli):
+    script = fake_cli("gemini", (
+        "import os, sys, time\n"
+        "if '--version' in sys.argv:\n"
+        "    sys.exit(print('1.0'))\n"
+        "open(os.path.join(os.path.dirname(sys.argv[0]), 'calls'), 'a').write('x')\n"
+        "time.sleep(1)\n"
+        "print('VERDICT: APPROVE')\n"
+    ))
+    code = (
+        f"import sys; sys.path.insert(0, {PLUGIN!r})\n"
+        "from core.consensus_engine import run_consensus\n"
+        f"config = {{'state_dir': {str(tmp_path / 'state')!r}, 'singleflight_enabled': True,"
+        " 'models': ['gemini'], 'cli_timeout': 10}\n"
+        "print(run_consensus('code', 'x = 1\\n', file_path='f.py', config=config).summary)\n"
+    )
+    procs = [subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, text=True) for _ in range(3)]
+    outputs = [p.communicate(timeout=30)[0] for p in procs]
+    assert open(os.path.join(os.path.dirname(script), "calls")).read() == "x"
+    assert sum("⟐ Coalesced" in out for out in outputs) == 2
+    assert all("FULL_CONSENSUS" in out for out in outputs)
@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.speculation import (
+    speculation_key,
+    start_speculation,
+    claim_result,
+    discard_stale,
+    _read_json,
+    _paths,
+)
+
+CODEX_APPROVE = (
+    "import json\n"
+    "print(json.dumps({'type': 'item.completed', 'item': {'type': 'agent_message', 'text': 'VERDICT: APPROVE'}}))\n"
+)
+
+
+def _input(content="def f():\n    return 1\n", session_id="s1"):
+    return {
+        "session_id": session_id,
+        "tool_name": "Write",
+        "tool_input": {"file_path": "src/app.py", "content": content},
+    }
+
+
+def _ctx(input_data):
+    return {"mode": "code", "file_path": "src/app.py", "content": input_data["tool_input"]["content"]}
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    with open(f"/proc/{pid}/stat") as f:
+        return f.read().split()[2] != "Z"
+
+
+def test_speculation_key_depends_on_tool_input():
+    assert speculation_key(_input()) == speculation_key(_input(session_id="other"))
+    assert speculation_key(_input()) != speculation_key(_input(content="x = 2\n"))
+
+
+def test_claim_without_speculation_returns_none(tmp_path):
+    assert claim_result({"state_dir": str(tmp_path)}, _input(), timeout=1) is None
+
+
+def test_post_attaches_to_speculative_result(tmp_path, fake_cli, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fake_cli("gemini", "print('VERDICT: APPROVE')\n")
+    fake_cli("codex", CODEX_APPROVE)
+    config = {"state_dir": str(tmp_path / "state")}
+    input_data = _input()
+    key = start_speculation(config, input_data, _ctx(input_data))
+    result = claim_result(config, input_data, timeout=30)
+    assert result["status"] == "FULL_CONSENSUS"
+    assert "Result: FULL_CONSENSUS" in result["summary"]
+    assert not os.path.exists(_paths(config, key)["job"])
+
+
+def test_superseded_speculation_is_killed(tmp_path, fake_cli, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fake_cli("gemini", "import time\ntime.sleep(30)\n")
+    fake_cli("codex", "import time\ntime.sleep(30)\n")
+    config = {"state_dir": str(tmp_path / "state")}
+    first = _input()
+    key = start_speculation(config, first, _ctx(first))
+    pid = _read_json(_paths(config, key)["job"])["pid"]
+    second = _input(content="def f():\n    return 2\n")
+    start_speculation(config, second, _ctx(second))
+    deadline = time.monotonic() + 5
+    while _alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _alive(pid)
+    assert not os.path.exists(_paths(config, key)["job"])
+    assert discard_stale(config, session_id="s1") == 1
+
+
+FOLLOWUP_GEMINI = (
+    "import sys\n"
+    "print('C1: RESOLVED\\nVERDICT: APPROVE' if 'Open concerns:' in sys.argv[-1] else 'VERDICT: APPROVE')\n"
+)
+
+
+def _followup_project(tmp_path, monkeypatch, fake_cli):
+    from core.config import load_config
+    from core.followup import remember_concerns
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".claude").mkdir()
+    (tmp_path / ".claude" / "concensus.local.md").write_text(
+        "---\nmodels:\n  - gemini\ncli_timeout: 10\ndebate_rounds: 0\nfollowup_enabled: true\n"
+        "history_enabled: true\n---\n"
+    )
+    fake_cli("gemini", FOLLOWUP_GEMINI)
+    config = load_config()
+    concern = {"id": "C1", "text": "Missing null check", "model": "gemini"}
+    remember_concerns(config, "s1", "src/app.py", [concern])
+    return config, concern
+
+
+def _reviews(config):
+    from core.history import connect, recent_reviews
+
+    return recent_reviews(connect(config))
+
+
+def test_discarded_speculative_followup_changes_no_state(tmp_path, monkeypatch, fake_cli):
+    from core.followup import open_concerns
+
+    config, concern = _followup_project(tmp_path, monkeypatch, fake_cli)
+    rejected = _input()
+    key = start_speculation(config, rejected, _ctx(rejected))
+    deadline = time.monotonic() + 30
+    while not os.path.exists(_paths(config, key)["result"]) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert _read_json(_paths(config, key)["result"])["state_writes"]
+    # The tool call is rejected: Stop discards the job without claiming it.
+    assert discard_stale(config, session_id="s1") == 1
+    assert open_concerns(config, "s1", "src/app.py") == [concern]
+    assert _reviews(config) == []
+
+    landed = _input(content="def f(user):\n    return user and user.email\n")
+    start_speculation(config, landed, _ctx(landed))
+    result = claim_result(config, landed, timeout=30)
+    assert "1/1 resolved" in result["summary"]
+    assert open_concerns(config, "s1", "src/app.py") == []
+    assert len(_reviews(config)) == 1
@@ -0,0 +1,48 @@
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.consensus_engine import run_consensus
+from core.history import connect, recent_reviews
+from core.review_ledger import plan_review
+from core.state_writes import apply_state_writes
+from core.usage import current_usage
+
+CODE = "def alpha():\n    return 1\n\n\ndef beta():\n    return 2\n"
+GEMINI_WITH_USAGE = (
+    "import json\n"
+    "print(json.dumps({'response': 'VERDICT: APPROVE',"
+    " 'stats': {'models': {'m': {'tokens': {'prompt': 100, 'candidates': 10, 'cached': 0}}}}}))\n"
+)
+
+
+def _config(tmp_path):
+    return {"state_dir": str(tmp_path / "state"), "models": ["gemini"], "cli_timeout": 10,
+            "debate_rounds": 0, "history_enabled": True, "review_ledger_enabled": True,
+            "structured_output": True}
+
+
+def test_speculative_run_defers_every_write(tmp_path, fake_cli):
+    fake_cli("gemini", "print('VERDICT: APPROVE')\n")
+    config = _config(tmp_path)
+    path = str(tmp_path / "mod.py")
+    result = run_consensus("code", CODE, file_path=path, config=config, session_id="s",
+                           whole_file=True, speculative=True)
+    writes = json.loads(json.dumps(result.state_writes))
+    assert {w["write"] for w in writes} >= {"ledger", "history"}
+    assert recent_reviews(connect(config)) == []
+    assert len(plan_review(config, path, CODE).changed) == 2
+
+    assert apply_state_writes(config, writes + [{"write": "unknown", "args": {}}]) == len(writes)
+    assert len(recent_reviews(connect(config))) == 1
+    assert plan_review(config, path, CODE).changed == []
+
+
+def test_deferred_usage_counts_once_applied(tmp_path, fake_cli):
+    fake_cli("gemini", GEMINI_WITH_USAGE)
+    config = _config(tmp_path)
+    result = run_consensus("plan", "Plan: add a cache", config=config, session_id="s", speculative=True)
+    assert result.usage and current_usage(config, "s")["session"] == 0
+    apply_state_writes(config, result.state_writes)
+    assert current_usage(config, "s")["session"] == 110
@@ -114,3 +114,43 @@ def test_stop_hook_active_guard():
     # We verify the flag detection here conceptually; E2E tests verify the actual behavior
     input_data = {"stop_hook_active": True, "reason": "I recommend we use microservices architecture."}
     assert input_data.get("stop_hook_active", False) is True
+
+
+# --- changeset mode tests ---
+
+def test_review_changeset_empty_returns_none(tmp_path):
+    from hooks.stop import review_changeset
+    assert review_changeset("s1", {"state_dir": str(tmp_path)}) is None
+
+
+def test_review_changeset_single_message_and_clears(tmp_path, fake_cli):
+    from hooks.stop import review_changeset
+    from core.changeset import record_edit, load_changeset
+    config = {"state_dir": str(tmp_path), "models": ["unavailable"]}
+    record_edit(config, "s1", {"tool_name": "Write", "tool_input": {"file_path": "a.py", "content": "a = 1\n"}})
+    record_edit(config, "s1", {"tool_name": "Write", "tool_input": {"file_path": "b.py", "content": "b = 1\n"}})
+    parsed = json.loads(review_changeset("s1", config))
+    assert "CONSENSUS REVIEW - CHANGESET" in parsed["systemMessage"]
+    assert "a.py:" in parsed["systemMessage"]
+    assert "b.py:" in parsed["systemMessage"]
+    # No model answered, so nothing was reviewed and the journal stays.
+    assert list(load_changeset(config, "s1")) == ["a.py", "b.py"]
+    fake_cli("gemini", "print('VERDICT: APPROVE')\n")
+    review_changeset("s1", {**config, "models": ["gemini"], "cli_timeout": 10})
+    assert load_changeset(config, "s1") == {}
+
+
+def test_review_changeset_keeps_journal_when_review_fails(tmp_path, monkeypatch):
+    from hooks.stop import review_changeset
+    from core import consensus_engine
+    from core.changeset import record_edit, load_changeset
+    config = {"state_dir": str(tmp_path), "models": ["unavailable"]}
+    record_edit(config, "s1", {"tool_name": "Write", "tool_input": {"file_path": "a.py", "content": "a = 1\n"}})
+
+    def fail(**kwargs):
+        raise OSError("state dir not writable")
+
+    monkeypatch.setattr(consensus_engine, "run_consensus", fail)
+    with pytest.raises(OSError):
+        review_changeset("s1", config)
+    assert list(load_changeset(config, "s1")) == ["a.py"]
@@ -61,6 +61,17 @@ def test_should_skip_when_globally_disabled():
     assert should_trigger(input_data, config) is False
 
 
+def test_should_skip_without_enough_classifier_matches():
+    config = {"enabled": True, "subagent_consensus_enabled": True, "subagent_min_matches": 2}
+    plain = {"agent_type": "Explore", "last_assistant_message": "x" * 250}
+    assert should_trigger(plain, config) is False
+    findings = {
+        "agent_type": "Explore",
+        "last_assistant_message": "Our findings favor a monolith. " + "x" * 250,
+    }
+    assert should_trigger(findings, config) is True
+
+
 def test_format_hook_output():
     output = format_hook_output("Some consensus result")
     parsed = json.loads(output)
@@ -0,0 +1,133 @@
+import os
+import sys
+import time
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.symbol_index import (
+    parse_python,
+    parse_generic,
+    load_index,
+    save_index,
+    refresh_index,
+    build_symbol_context,
+    symbol_context_for_change,
+)
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "util.py").write_text(
+        'def parse_amount(text: str, default: int = 0) -> int:\n'
+        '    """Parse a currency amount in cents."""\n'
+        '    return int(text or default)\n'
+    )
+    (root / "src" / "api.js").write_text(
+        "// Send a request to the billing API\n"
+        "export async function charge(customer, amount) {\n"
+        "  return fetch(customer, amount);\n"
+        "}\n"
+    )
+    (root / "README.md").write_text("# docs\n")
+    return root
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {"state_dir": str(tmp_path / "state"), "skip_paths": ["*.md"]}
+
+
+def test_parse_python_defs_imports_calls():
+    parsed = parse_python(
+        "import os\n"
+        "class Store(Base):\n"
+        '    """Key-value store."""\n'
+        "    def get(self, key):\n"
+        "        return os.path.join(key)\n"
+    )
+    names = {d["qualname"]: d for d in parsed["defs"]}
+    assert names["Store"]["signature"] == "class Store(Base)"
+    assert names["Store"]["doc"] == "Key-value store."
+    assert names["Store.get"]["signature"] == "def get(self, key)"
+    assert "os" in parsed["imports"]
+    assert "join" in parsed["calls"]
+
+
+def test_parse_python_syntax_error_is_empty():
+    assert parse_python("def broken(:\n")["defs"] == []
+
+
+def test_parse_generic_js_with_comment_doc():
+    parsed = parse_generic(
+        "import x from 'lib';\n// Adds numbers\nfunction add(a, b) {\n  return a + b;\n}\n", ".js"
+    )
+    assert parsed["defs"][0]["name"] == "add"
+    assert parsed["defs"][0]["doc"] == "Adds numbers"
+    assert parsed["imports"] == ["lib"]
+
+
+def test_refresh_is_incremental_by_mtime(project, config):
+    index = load_index(config)
+    assert refresh_index(str(project), index, config) == 2
+    assert set(index["files"]) == {os.path.join("src", "util.py"), os.path.join("src", "api.js")}
+    assert refresh_index(str(project), index, config) == 0
+    util = project / "src" / "util.py"
+    util.write_text("def other():\n    pass\n")
+    os.utime(util, (time.time() + 10, time.time() + 10))
+    assert refresh_index(str(project), index, config) == 1
+    (project / "src" / "api.js").unlink()
+    assert refresh_index(str(project), index, config) == 1
+
+
+def test_refresh_stops_walking_at_max_files(tmp_path, config, monkeypatch):
+    for i in range(10):
+        (tmp_path / "tree" / f"d{i}").mkdir(parents=True)
+        (tmp_path / "tree" / f"d{i}" / "m.py").write_text("def f():\n    pass\n")
+    walked = []
+    real_walk = os.walk
+
+    def counting_walk(*args, **kwargs):
+        for entry in real_walk(*args, **kwargs):
+            walked.append(entry[0])
+            yield entry
+
+    monkeypatch.setattr(os, "walk", counting_walk)
+    index = load_index(config)
+    refresh_index(str(tmp_path / "tree"), index, {**config, "symbol_index_max_files": 2})
+    assert len(index["files"]) == 2
+    assert len(walked) <= 4
+
+
+def test_index_persists_on_disk(project, config):
+    index = load_index(config)
+    refresh_index(str(project), index, config)
+    save_index(config, index)
+    assert load_index(config)["files"] == index["files"]
+
+
+def test_build_symbol_context_only_referenced_symbols(project, config):
+    index = load_index(config)
+    refresh_index(str(project), index, config)
+    change = "from util import parse_amount\n\ndef total(items):\n    return sum(parse_amount(i) for i in items)\n"
+    context = build_symbol_context(change, str(project / "src" / "cart.py"), index)
+    assert "def parse_amount(text: str, default: int=0) -> int" in context
+    assert "Parse a currency amount in cents." in context
+    assert "charge" not in context
+
+
+def test_build_symbol_context_lists_callers(project, config):
+    index = load_index(config)
+    refresh_index(str(project), index, config)
+    change = "def fetch(customer, amount):\n    return customer\n"
+    context = build_symbol_context(change, str(project / "src" / "http.py"), index)
+    assert "fetch is called from: " in context
+    assert "api.js" in context
+
+
+def test_symbol_context_for_change_uses_project_dir(project, config, monkeypatch):
+    monkeypatch.setenv("CLAUDE_PROJECT_DIR", str(project))
+    context = symbol_context_for_change("x = parse_amount('1')\n", "src/main.py", config)
+    assert "parse_amount" in context
+    assert os.path.exists(os.path.join(config["state_dir"], "symbols.json"))
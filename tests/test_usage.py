@@ -0,0 +1,89 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.cli_runner import RunOptions, run_codex, run_gemini
+from core.history import ModelCall
+from core.usage import budget_status, current_usage, estimate_cost, record_usage, total_usage
+
+CODEX_WITH_USAGE = (
+    "import json\n"
+    "print(json.dumps({'type': 'item.completed', 'item': {'type': 'agent_message', 'text': 'VERDICT: APPROVE'}}))\n"
+    "print(json.dumps({'type': 'turn.completed', 'usage': {'input_tokens': 1200, "
+    "'cached_input_tokens': 1000, 'output_tokens': 80}}))\n"
+)
+GEMINI_STRUCTURED = (
+    "import json, sys\n"
+    "assert sys.argv[1:3] == ['--output-format', 'json'], sys.argv\n"
+    "print(json.dumps({'response': 'VERDICT: APPROVE', 'stats': {'models': {'gemini-2.5-pro': "
+    "{'tokens': {'prompt': 900, 'cached': 100, 'candidates': 40, 'thoughts': 60}}}}}))\n"
+)
+
+
+def test_codex_usage_parsed_from_turn_completed(fake_cli):
+    fake_cli("codex", CODEX_WITH_USAGE)
+    result = run_codex("p", timeout=10, options=RunOptions(max_stdout_bytes=4096))
+    assert result.output == "VERDICT: APPROVE"
+    assert (result.input_tokens, result.cached_tokens, result.output_tokens) == (1200, 1000, 80)
+
+
+def test_gemini_structured_output_parsed(fake_cli):
+    fake_cli("gemini", GEMINI_STRUCTURED)
+    result = run_gemini("p", timeout=10, options=RunOptions(structured_output=True))
+    assert result.output == "VERDICT: APPROVE"
+    assert (result.input_tokens, result.cached_tokens, result.output_tokens) == (900, 100, 100)
+
+
+def test_gemini_plain_output_has_no_usage(fake_cli):
+    fake_cli("gemini", "print('VERDICT: APPROVE')\n")
+    result = run_gemini("p", timeout=10)
+    assert result.output == "VERDICT: APPROVE"
+    assert result.input_tokens == 0
+
+
+def test_total_usage_and_cost():
+    calls = [
+        ModelCall(round=0, model="codex", success=True, input_tokens=1_000_000, cached_tokens=500_000,
+                  output_tokens=100_000),
+        ModelCall(round=1, model="gemini", success=True, input_tokens=10, output_tokens=5),
+    ]
+    assert total_usage(calls) == {"input_tokens": 1_000_010, "cached_tokens": 500_000, "output_tokens": 100_005}
+    assert estimate_cost(calls, {}) is None
+    cost = estimate_cost(calls, {"token_prices": ["codex=1.0/0.1/10"]})
+    assert round(cost, 4) == 0.5 + 0.05 + 1.0
+
+
+def test_budget_status_downgrades_then_exhausts(tmp_path):
+    config = {"state_dir": str(tmp_path), "token_budget_session": 1000}
+    assert budget_status(config, "s1")[0] == "ok"
+    record_usage(config, "s1", {"input_tokens": 700, "cached_tokens": 0, "output_tokens": 150})
+    assert budget_status(config, "s1") == ("downgrade", "session 850/1000 tokens")
+    assert budget_status(config, "s2")[0] == "ok"
+    record_usage(config, "s1", {"input_tokens": 100, "cached_tokens": 0, "output_tokens": 50})
+    assert budget_status(config, "s1")[0] == "exhausted"
+    assert current_usage(config, "s2") == {"session": 0, "hour": 1000, "day": 1000}
+
+
+def test_engine_skips_when_budget_exhausted(tmp_path):
+    from core.consensus_engine import run_consensus, ConsensusStatus
+
+    config = {"state_dir": str(tmp_path), "token_budget_day": 100, "models": ["gemini", "codex"]}
+    record_usage(config, "s1", {"input_tokens": 100, "cached_tokens": 0, "output_tokens": 0})
+    result = run_consensus("code", "x = 1\n", config=config, session_id="s1")
+    assert result.status == ConsensusStatus.SKIPPED
+    assert "⟐ Budget: exhausted (day 100/100 tokens)" in result.summary
+
+
+def test_engine_downgrades_and_records_tokens(tmp_path, fake_cli):
+    from core.consensus_engine import run_consensus
+
+    fake_cli("codex", CODEX_WITH_USAGE)
+    config = {"state_dir": str(tmp_path), "token_budget_session": 1000, "models": ["gemini", "codex"],
+              "routing_fast_model": "codex", "cli_timeout": 10}
+    record_usage(config, "s1", {"input_tokens": 900, "cached_tokens": 0, "output_tokens": 0})
+    result = run_consensus("code", "x = 1\n", config=config, session_id="s1")
+    assert "⟐ Budget: downgraded to fast tier (session 900/1000 tokens)" in result.summary
+    assert "⟐ Queried: codex" in result.summary
+    assert "⟐ Tokens (round 0): in 1200 (cached 1000) / out 80" in result.summary
+    assert result.usage["output_tokens"] == 80
+    assert current_usage(config, "s1")["session"] == 900 + 1280
@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import threading
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "plugin"))
+from core.cli_runner import RunOptions, run_gemini
+from core.worker_pool import WorkerPool, request_from_pool, serve
+
+STDIN_GEMINI = (
+    "import sys\n"
+    "if len(sys.argv) > 1:\n"
+    "    print('argv:' + sys.argv[-1])\n"
+    "else:\n"
+    "    print('stdin:' + sys.stdin.read())\n"
+)
+
+
+def test_pool_prewarms_and_serves_from_stdin(fake_cli):
+    fake_cli("gemini", STDIN_GEMINI)
+    pool = WorkerPool(["gemini"], RunOptions(pool_size=2))
+    pool.replenish()
+    assert len(pool.idle["gemini"]) == 2
+    result = pool.run("gemini", "VERDICT: APPROVE", timeout=10)
+    assert result.success is True
+    assert result.warm is True
+    assert result.output == "stdin:VERDICT: APPROVE"
+    pool.shutdown()
+
+
+def test_pool_cold_spawn_when_empty(fake_cli):
+    fake_cli("gemini", STDIN_GEMINI)
+    pool = WorkerPool(["gemini"], RunOptions(pool_size=0))
+    result = pool.run("gemini", "hello", timeout=10)
+    assert result.success is True
+    assert result.warm is False
+    pool.shutdown()
+
+
+def test_pool_evicts_idle_and_dead_workers(fake_cli):
+    fake_cli("gemini", STDIN_GEMINI)
+    pool = WorkerPool(["gemini"], RunOptions(pool_size=1, pool_idle_timeout=0))
+    pool.replenish()
+    time.sleep(0.05)
+    assert pool.evict() == 1
+    assert pool.idle["gemini"] == []
+
+
+def test_pool_health_check_skips_dead_worker(fake_cli):
+    fake_cli("gemini", STDIN_GEMINI)
+    pool = WorkerPool(["gemini"], RunOptions(pool_size=1))
+    pool.replenish()
+    pool.idle["gemini"][0].spawned.proc.kill()
+    pool.idle["gemini"][0].spawned.proc.wait()
+    assert pool.acquire("gemini") is None
+    pool.shutdown()
+
+
+def test_pool_daemon_round_trip(fake_cli, tmp_path):
+    fake_cli("gemini", STDIN_GEMINI)
+    socket_path = str(tmp_path / "pool.sock")
+    options = RunOptions(pool_socket=socket_path, pool_size=1, pool_max_requests=2)
+    server_thread = threading.Thread(target=serve, args=(socket_path, ["gemini"], options))
+    server_thread.start()
+    for _ in range(100):
+        if os.path.exists(socket_path):
+            break
+        time.sleep(0.02)
+    first = run_gemini("one", timeout=10, options=options)
+    second = request_from_pool(options, "gemini", "two", 10)
+    assert first.output == "stdin:one"
+    assert second.output == "stdin:two"
+    server_thread.join(10)
+    assert not server_thread.is_alive()  # recycled after pool_max_requests
+    assert not os.path.exists(socket_path)
+
+
+def test_request_without_daemon_falls_back(fake_cli, tmp_path, monkeypatch):
+    import core.worker_pool as worker_pool
+    started = []
+    monkeypatch.setattr(worker_pool, "start_pool_daemon", lambda options, models: started.append(models))
+    fake_cli("gemini", STDIN_GEMINI)
+    options = RunOptions(pool_socket=str(tmp_path / "pool.sock"))
+    result = run_gemini("direct", timeout=10, options=options)
+    assert result.output == "argv:direct"
+    assert started == [["gemini"]]